@@ -1,8 +1,52 @@
 """
 Clip Studio 模块
 视频生成相关功能
+
+导出的类按需加载：只使用 clip_studio.models 等轻量模块时不会导入生成器及其依赖
 """
 
-from .video_generator import BaseVideoGenerator, SVDGenerator
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    'BaseVideoGenerator': '.video_generator',
+    'SVDGenerator': '.video_generator',
+    'ClipHandle': '.tasks',
+    'TaskPoller': '.tasks',
+    'get_task_poller': '.tasks',
+    'ClipCache': '.cache',
+    'PipelineRegistry': '.pipeline_pool',
+    'get_pipeline_registry': '.pipeline_pool',
+    'MotionTemplateRegistry': '.motion_templates',
+    'get_motion_template_registry': '.motion_templates',
+    'JobJournal': '.journal',
+    'get_job_journal': '.journal',
+    'RateLimiter': '.rate_limit',
+    'get_rate_limit_stats': '.rate_limit',
+    'MetricsHook': '.metrics',
+    'PrometheusExporter': '.metrics',
+    'JsonLinesExporter': '.metrics',
+    'EpisodeAssembler': '.assembler',
+    'assemble_episode': '.assembler',
+    'HedgedHandle': '.hedging',
+    'get_provider_latency': '.hedging',
+}
+
+__all__ = ['BaseVideoGenerator', 'SVDGenerator', 'ClipHandle', 'TaskPoller',
+           'get_task_poller', 'ClipCache',
+           'PipelineRegistry', 'get_pipeline_registry', 'MotionTemplateRegistry',
+           'get_motion_template_registry', 'JobJournal', 'get_job_journal', 'RateLimiter',
+           'get_rate_limit_stats', 'MetricsHook', 'PrometheusExporter', 'JsonLinesExporter',
+           'EpisodeAssembler', 'assemble_episode', 'HedgedHandle', 'get_provider_latency']
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['BaseVideoGenerator', 'SVDGenerator']
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
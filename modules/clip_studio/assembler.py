@@ -0,0 +1,413 @@
+"""
+剧集拼接
+按场景编号顺序把每个场景的视频片段拼接成成片：编码参数一致的片段直接流复制（concat demuxer），
+只有参数不一致或短于场景时长的片段才并行重新编码，耗时取决于需要重新编码的片段数而不是成片总长度
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union, Mapping
+
+from .models import Script, Scene, ClipResult, AssemblyResult
+
+
+# ffprobe 的编码名称到 ffmpeg 编码器
+ENCODERS = {
+    'h264': 'libx264',
+    'hevc': 'libx265',
+    'mpeg4': 'mpeg4',
+    'vp9': 'libvpx-vp9',
+    'av1': 'libaom-av1',
+}
+
+# ffprobe 报告的 H.264 profile 到 libx264 的 -profile:v 参数
+H264_PROFILES = {
+    'Constrained Baseline': 'baseline',
+    'Baseline': 'baseline',
+    'Main': 'main',
+    'High': 'high',
+}
+
+# 片段的处理方式
+COPY = 'copy'  # 直接流复制
+TRIM = 'trim'  # 流复制并截断尾部
+REENCODE = 'reencode'  # 重新编码（转换格式、补足时长）
+
+ClipInput = Union[str, Path, ClipResult]
+
+
+class ClipInfo:
+    """ffprobe 得到的片段视频流参数"""
+
+    def __init__(
+        self,
+        path: str,
+        codec: str,
+        width: int,
+        height: int,
+        pix_fmt: str,
+        frame_rate: str,
+        time_base: str,
+        duration: float,
+        profile: Optional[str] = None,
+        level: Optional[int] = None
+    ):
+        self.path = path
+        self.codec = codec
+        self.width = width
+        self.height = height
+        self.pix_fmt = pix_fmt
+        self.frame_rate = frame_rate  # 'num/den'
+        self.time_base = time_base  # 'num/den'
+        self.duration = duration
+        self.profile = profile
+        self.level = level  # ffprobe 报告的 level（H.264 为 level×10，HEVC 为 level×30）
+
+    @property
+    def fps(self) -> float:
+        return float(Fraction(self.frame_rate)) if self.frame_rate else 0.0
+
+    @property
+    def signature(self) -> Tuple[Any, ...]:
+        """流复制拼接要求一致的参数"""
+        return (
+            self.codec, self.profile, self.level, self.width, self.height,
+            self.pix_fmt, self.frame_rate, self.time_base
+        )
+
+    @classmethod
+    def from_ffprobe(cls, path: str, data: Dict[str, Any]) -> 'ClipInfo':
+        """
+        从 ffprobe -of json 的输出构建
+
+        Args:
+            path: 片段路径
+            data: 解析后的 ffprobe 输出（包含 streams 与 format）
+
+        Returns:
+            ClipInfo 对象
+        """
+        streams = [s for s in data.get('streams', []) if s.get('codec_type') == 'video']
+        if not streams:
+            raise ValueError(f"片段中没有视频流: {path}")
+        stream = streams[0]
+        duration = stream.get('duration') or data.get('format', {}).get('duration')
+        if duration is None:
+            raise ValueError(f"无法获取片段时长: {path}")
+        return cls(
+            path=path,
+            codec=stream['codec_name'],
+            width=int(stream['width']),
+            height=int(stream['height']),
+            pix_fmt=stream.get('pix_fmt', ''),
+            frame_rate=stream.get('avg_frame_rate') or stream.get('r_frame_rate', ''),
+            time_base=stream.get('time_base', ''),
+            duration=float(duration),
+            profile=stream.get('profile'),
+            level=stream.get('level')
+        )
+
+
+class ClipPlan:
+    """单个场景片段的处理计划"""
+
+    def __init__(self, scene: Scene, info: ClipInfo, action: str, duration: float):
+        self.scene = scene
+        self.info = info
+        self.action = action
+        self.duration = duration  # 该场景在成片中的时长（秒）
+        self.source = info.path  # 拼接时使用的文件（截断/重新编码后替换为中间文件）
+
+
+def plan_assembly(
+    scenes: List[Scene],
+    infos: List[ClipInfo],
+    target: ClipInfo,
+    tolerance: Optional[float] = None
+) -> List[ClipPlan]:
+    """
+    决定每个片段的处理方式
+
+    - 编码参数与目标一致且时长相符（误差不超过 tolerance）：直接流复制
+    - 参数一致但长于场景时长：流复制并截断尾部（不需要解码）
+    - 参数不一致，或短于场景时长需要补帧：重新编码
+
+    Args:
+        scenes: 按播放顺序排列的场景
+        infos: 与 scenes 一一对应的片段参数
+        target: 目标编码参数
+        tolerance: 时长误差容忍（秒），默认半帧
+
+    Returns:
+        与 scenes 一一对应的处理计划
+    """
+    if tolerance is None:
+        tolerance = 0.5 / target.fps if target.fps else 0.02
+
+    plans = []
+    for scene, info in zip(scenes, infos):
+        # 场景时长为 0 表示保持片段原有时长
+        duration = scene.duration or info.duration
+        if info.signature != target.signature or info.duration < duration - tolerance:
+            action = REENCODE
+        elif info.duration > duration + tolerance:
+            action = TRIM
+        else:
+            action = COPY
+        plans.append(ClipPlan(scene, info, action, duration))
+    return plans
+
+
+def majority_target(infos: List[ClipInfo]) -> ClipInfo:
+    """以最多片段共有的编码参数作为目标，使尽可能多的片段可以直接流复制"""
+    counts = Counter(info.signature for info in infos)
+    signature, _ = counts.most_common(1)[0]
+    return next(info for info in infos if info.signature == signature)
+
+
+def _concat_escape(path: str) -> str:
+    return path.replace("'", "'\\''")
+
+
+class EpisodeAssembler:
+    """基于 ffmpeg 的剧集拼接器"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        target: Optional[Mapping[str, Any]] = None,
+        crf: int = 18,
+        preset: str = 'veryfast',
+        qscale: int = 2,
+        tolerance: Optional[float] = None,
+        ffmpeg: Optional[str] = None,
+        ffprobe: Optional[str] = None
+    ):
+        """
+        Args:
+            max_workers: 并行重新编码的片段数，默认 CPU 核数的一半
+            target: 指定目标编码参数（codec、width、height、pix_fmt、frame_rate、time_base、profile、level），
+                    未指定的字段取多数片段的参数
+            crf: 重新编码的质量（x264/x265/VP9/AV1 的 CRF）
+            preset: 重新编码的速度预设
+            qscale: MPEG-4（本地 OpenCV 写入的 mp4v）重新编码的量化参数 -q:v，越小质量越高
+            tolerance: 片段时长与场景时长的误差容忍（秒），默认半帧
+            ffmpeg: ffmpeg 可执行文件路径，默认在 PATH 中查找
+            ffprobe: ffprobe 可执行文件路径，默认在 PATH 中查找
+        """
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.target = dict(target or {})
+        self.crf = crf
+        self.preset = preset
+        self.qscale = qscale
+        self.tolerance = tolerance
+        self.ffmpeg = ffmpeg or shutil.which('ffmpeg')
+        self.ffprobe = ffprobe or shutil.which('ffprobe')
+        if self.ffmpeg is None or self.ffprobe is None:
+            raise RuntimeError("剧集拼接需要 ffmpeg 与 ffprobe，请先安装 ffmpeg")
+
+    def _run(self, args: List[str]) -> str:
+        result = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{Path(args[0]).name} 执行失败: {result.stderr.strip()[-500:]}")
+        return result.stdout
+
+    def probe(self, path: str) -> ClipInfo:
+        """
+        读取片段的视频流参数
+
+        Args:
+            path: 片段路径
+
+        Returns:
+            ClipInfo 对象
+        """
+        output = self._run([
+            self.ffprobe, '-v', 'error', '-select_streams', 'v:0',
+            '-show_streams', '-show_format', '-of', 'json', path
+        ])
+        return ClipInfo.from_ffprobe(path, json.loads(output))
+
+    def _target(self, infos: List[ClipInfo]) -> ClipInfo:
+        base = majority_target(infos)
+        fields = {
+            'path': '', 'codec': base.codec, 'width': base.width, 'height': base.height,
+            'pix_fmt': base.pix_fmt, 'frame_rate': base.frame_rate, 'time_base': base.time_base,
+            'duration': 0.0, 'profile': base.profile, 'level': base.level
+        }
+        fields.update({key: value for key, value in self.target.items() if key in fields})
+        if fields['codec'] not in ENCODERS:
+            raise ValueError(f"无法编码为 {fields['codec']}，请通过 target 指定其他编码")
+        return ClipInfo(**fields)
+
+    def _trim(self, plan: ClipPlan, output_path: Path) -> None:
+        """流复制并截断尾部（不解码）"""
+        self._run([
+            self.ffmpeg, '-y', '-loglevel', 'error', '-i', plan.info.path,
+            '-map', '0:v:0', '-c', 'copy', '-t', f"{plan.duration:.6f}", '-an', str(output_path)
+        ])
+
+    def _reencode(self, plan: ClipPlan, target: ClipInfo, output_path: Path, threads: int) -> None:
+        """按目标参数重新编码：缩放并补边到目标尺寸、统一帧率，不足场景时长时重复最后一帧"""
+        width, height = target.width, target.height
+        filters = [
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            'setsar=1',
+            f"fps={target.frame_rate}",
+            f"format={target.pix_fmt}",
+        ]
+        shortfall = plan.duration - plan.info.duration
+        if shortfall > 0:
+            filters.append(f"tpad=stop_mode=clone:stop_duration={shortfall:.6f}")
+
+        args = [
+            self.ffmpeg, '-y', '-loglevel', 'error', '-i', plan.info.path,
+            '-map', '0:v:0', '-vf', ','.join(filters), '-t', f"{plan.duration:.6f}",
+            '-c:v', ENCODERS[target.codec], '-threads', str(threads), '-an'
+        ]
+        if target.codec in ('h264', 'hevc'):
+            args += ['-crf', str(self.crf), '-preset', self.preset]
+        elif target.codec == 'mpeg4':
+            # 不指定质量时 ffmpeg 按默认码率（约 200 kb/s）编码，画质明显下降
+            args += ['-q:v', str(self.qscale)]
+        elif target.codec in ('vp9', 'av1'):
+            args += ['-crf', str(self.crf), '-b:v', '0']
+        if target.codec == 'h264' and target.profile in H264_PROFILES:
+            args += ['-profile:v', H264_PROFILES[target.profile]]
+        if target.level and target.level > 0:
+            # 与流复制的片段 level 一致，否则拼接后的文件在部分播放器上无法解码
+            if target.codec == 'h264':
+                args += ['-level:v', f"{target.level / 10:g}"]
+            elif target.codec == 'hevc':
+                args += ['-x265-params', f"level-idc={target.level / 30:g}"]
+        if target.time_base:
+            # 与其他片段的时间基一致，concat 流复制时时间戳才能对齐
+            args += ['-video_track_timescale', str(Fraction(target.time_base).denominator)]
+        args.append(str(output_path))
+        self._run(args)
+
+    def assemble(
+        self,
+        script: Script,
+        clips: Union[Mapping[int, ClipInput], List[ClipInput]],
+        output_path: str,
+        work_dir: Optional[str] = None
+    ) -> AssemblyResult:
+        """
+        按场景编号顺序拼接成片（仅视频流）
+
+        Args:
+            script: 剧本对象
+            clips: 场景编号到片段（路径或 generate_script_clips 返回的 ClipResult）的映射，
+                   或与 script.scenes 顺序一致的列表
+            output_path: 成片输出路径
+            work_dir: 中间文件目录，默认使用临时目录
+
+        Returns:
+            拼接结果（各场景的处理方式与耗时）
+        """
+        started = time.monotonic()
+        scenes = sorted(script.scenes, key=lambda scene: scene.scene_number)
+        if not scenes:
+            raise ValueError("剧本中没有场景")
+        if isinstance(clips, (list, tuple)):
+            if len(clips) != len(script.scenes):
+                raise ValueError(f"片段数量 ({len(clips)}) 与场景数量 ({len(script.scenes)}) 不一致")
+            clips = {scene.scene_number: clip for scene, clip in zip(script.scenes, clips)}
+
+        paths = []
+        for scene in scenes:
+            clip = clips.get(scene.scene_number)
+            if isinstance(clip, ClipResult):
+                if not clip.success:
+                    raise ValueError(f"场景 {scene.scene_number} 的片段生成失败: {clip.error}")
+                clip = clip.output_path
+            if clip is None or not Path(clip).exists():
+                raise ValueError(f"缺少场景 {scene.scene_number} 的视频片段")
+            paths.append(str(Path(clip).resolve()))
+
+        with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+            infos = list(executor.map(self.probe, paths))
+        target = self._target(infos)
+        plans = plan_assembly(scenes, infos, target, self.tolerance)
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            tmp_dir = Path(tmp)
+            pending = [plan for plan in plans if plan.action != COPY]
+            for plan in pending:
+                plan.source = str(tmp_dir / f"scene_{plan.scene.scene_number:04d}.mp4")
+
+            reencode_count = sum(plan.action == REENCODE for plan in pending)
+            threads = max(1, (os.cpu_count() or 1) // max(1, min(self.max_workers, reencode_count)))
+
+            def process(plan: ClipPlan) -> None:
+                if plan.action == TRIM:
+                    self._trim(plan, Path(plan.source))
+                else:
+                    self._reencode(plan, target, Path(plan.source), threads)
+
+            if pending:
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    # list() 取出结果，任一片段失败时抛出异常
+                    list(executor.map(process, pending))
+
+            list_path = tmp_dir / 'concat.txt'
+            list_path.write_text(
+                'ffconcat version 1.0\n' + ''.join(f"file '{_concat_escape(plan.source)}'\n" for plan in plans),
+                encoding='utf-8'
+            )
+            temp_output = output_path.with_name(
+                f".{output_path.stem}.{os.getpid()}.{uuid.uuid4().hex[:12]}.part{output_path.suffix}"
+            )
+            try:
+                self._run([
+                    self.ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                    '-i', str(list_path), '-map', '0:v:0', '-c', 'copy', '-an',
+                    '-movflags', '+faststart', '-f', 'mp4', str(temp_output)
+                ])
+                os.replace(temp_output, output_path)
+            finally:
+                if temp_output.exists():
+                    temp_output.unlink()
+
+        return AssemblyResult(
+            output_path=str(output_path),
+            duration=sum(plan.duration for plan in plans),
+            copied=[plan.scene.scene_number for plan in plans if plan.action == COPY],
+            trimmed=[plan.scene.scene_number for plan in plans if plan.action == TRIM],
+            reencoded=[plan.scene.scene_number for plan in plans if plan.action == REENCODE],
+            elapsed_seconds=time.monotonic() - started
+        )
+
+
+def assemble_episode(
+    script: Script,
+    clips: Union[Mapping[int, ClipInput], List[ClipInput]],
+    output_path: str,
+    **options: Any
+) -> AssemblyResult:
+    """
+    按场景顺序把片段拼接成成片（EpisodeAssembler 的便捷入口）
+
+    Args:
+        script: 剧本对象
+        clips: 场景编号到片段路径或 ClipResult 的映射，或与 script.scenes 顺序一致的列表
+        output_path: 成片输出路径
+        **options: EpisodeAssembler 的参数（max_workers、target、crf 等）
+
+    Returns:
+        拼接结果
+    """
+    return EpisodeAssembler(**options).assemble(script, clips, output_path)
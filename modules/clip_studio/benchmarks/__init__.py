@@ -0,0 +1,4 @@
+"""
+Clip Studio 性能基准
+在 modules 目录下运行，例如: python -m clip_studio.benchmarks.bench_preprocess
+"""
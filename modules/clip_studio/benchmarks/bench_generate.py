@@ -0,0 +1,303 @@
+"""
+生成流程负载基准
+对本地模拟提供商（不产生 API 费用）分别以 1 / 10 / 100 个并发片段运行 generate_clip 与
+generate_script_clips，测量吞吐、延迟分位数、CPU 与内存，以及各阶段耗时的分位数
+
+Stability 模拟服务器运行在子进程中，CPU 统计只包含生成器本身；
+Runway 使用注入的假 SDK，模拟服务器与生成器在同一进程中
+
+运行: python -m clip_studio.benchmarks.bench_generate [--concurrency 1,10,100] [--provider stability,runway]
+      [--queue-delay 1.0] [--failure-rate 0.05] [--throttle-rate 0.1] [--json results.json]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+import requests
+
+from .bench_preprocess import make_image
+from .mock_provider import (
+    MockTaskStore, MockStabilityServer, STATS_PATH, install_fake_runway, uninstall_fake_runway
+)
+from ..local_backend import MemorySampler, current_rss
+from ..metrics import PrometheusExporter
+from ..models import Script, Scene
+from ..video_generator import SVDGenerator
+
+
+APIS = ('generate_clip', 'generate_script_clips')
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """按最近秩计算分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def start_stability_server(options: Dict[str, Any]) -> Tuple[subprocess.Popen, str]:
+    """
+    在子进程中启动模拟 Stability 服务器
+
+    Returns:
+        (子进程, 服务器地址)
+    """
+    args = [sys.executable, '-m', 'clip_studio.benchmarks.mock_provider']
+    for key, value in options.items():
+        if value is not None:
+            args += [f"--{key.replace('_', '-')}", str(value)]
+    modules_dir = Path(__file__).resolve().parents[2]
+    process = subprocess.Popen(args, cwd=str(modules_dir), stdout=subprocess.PIPE, text=True)
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("模拟服务器启动失败")
+    return process, base_url
+
+
+def server_counters(base_url: str) -> Dict[str, int]:
+    return requests.get(f"{base_url}{STATS_PATH}", timeout=10).json()
+
+
+def make_generator(provider: str, base_url: str, api_key: str, exporter: PrometheusExporter,
+                   overrides: Dict[str, Any]) -> SVDGenerator:
+    config = {
+        'api_provider': provider,
+        'api_key': api_key,
+        'api_base_url': base_url,
+        'metrics_hooks': [exporter],
+        **overrides
+    }
+    return SVDGenerator(config)
+
+
+def run_generate_clip(generator: SVDGenerator, image, clips: int, concurrency: int,
+                      output_dir: Path) -> List[Dict[str, Any]]:
+    """并发调用 generate_clip，返回每个片段的耗时与错误"""
+    def one(index: int) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            generator.generate_clip(image, 'benchmark', str(output_dir / f"clip_{index:04d}.mp4"))
+            error = None
+        except Exception as e:
+            error = str(e)
+        return {'seconds': time.monotonic() - started, 'error': error}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(clips)))
+
+
+def run_generate_script_clips(generator: SVDGenerator, image, clips: int, concurrency: int,
+                              output_dir: Path) -> List[Dict[str, Any]]:
+    """以 clips 个场景调用 generate_script_clips，返回每个场景的耗时与错误"""
+    script = Script(
+        id='benchmark',
+        title='benchmark',
+        author='benchmark',
+        scenes=[
+            Scene(scene_number=i + 1, content='benchmark', dialogue='', vfx_suggestion='', duration=4)
+            for i in range(clips)
+        ]
+    )
+    results = generator.generate_script_clips(script, [image] * clips, str(output_dir), max_concurrency=concurrency)
+    return [{'seconds': r.elapsed_seconds, 'error': r.error} for r in results.values()]
+
+
+def measure(run_fn: Callable[[], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """执行一轮并记录墙钟时间、CPU 时间与峰值内存"""
+    rss_before = current_rss()
+    cpu_before = time.process_time()
+    started = time.perf_counter()
+    with MemorySampler() as sampler:
+        clips = run_fn()
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_before
+
+    latencies = [c['seconds'] for c in clips if c['error'] is None]
+    errors = [c['error'] for c in clips if c['error'] is not None]
+    return {
+        'clips': len(clips),
+        'succeeded': len(latencies),
+        'failed': len(errors),
+        'errors': sorted(set(errors))[:5],
+        'wall_seconds': wall,
+        'throughput_clips_per_second': len(latencies) / wall if wall > 0 else 0.0,
+        'latency_seconds': {
+            'mean': statistics.mean(latencies) if latencies else None,
+            'p50': percentile(latencies, 0.5),
+            'p90': percentile(latencies, 0.9),
+            'p99': percentile(latencies, 0.99),
+            'max': max(latencies) if latencies else None
+        },
+        'cpu_seconds': cpu,
+        'cpu_percent': 100 * cpu / wall if wall > 0 else 0.0,
+        'peak_rss_bytes': sampler.peak_rss,
+        'rss_growth_bytes': (sampler.peak_rss - rss_before) if sampler.peak_rss and rss_before else None
+    }
+
+
+def run(
+    providers: List[str],
+    apis: List[str],
+    levels: List[int],
+    clips: Optional[int] = None,
+    server_options: Optional[Dict[str, Any]] = None,
+    generator_overrides: Optional[Dict[str, Any]] = None,
+    repeat: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        providers: 'stability' / 'runway'
+        apis: 要测量的接口（见 APIS）
+        levels: 并发片段数列表
+        clips: 每轮片段数，None 表示 max(10, 并发数)
+        server_options: 模拟服务器参数（queue_delay、failure_rate、throttle_rate 等）
+        generator_overrides: 覆盖生成器配置（如关闭限流）
+        repeat: 每个组合重复次数
+
+    Returns:
+        每轮的结果列表
+    """
+    server_options = server_options or {}
+    generator_overrides = generator_overrides or {}
+    image = make_image((1024, 576))
+    results = []
+    run_index = 0
+
+    for provider in providers:
+        process = server = None
+        if provider == 'stability':
+            process, base_url = start_stability_server(server_options)
+        else:
+            store_keys = ('queue_delay', 'processing_delay', 'jitter', 'failure_rate', 'seed')
+            store = MockTaskStore(**{k: v for k, v in server_options.items() if k in store_keys and v is not None})
+            server = MockStabilityServer(
+                store,
+                throttle_rate=server_options.get('throttle_rate') or 0.0,
+                video_size=server_options.get('video_size') or 1024 * 1024,
+                seed=server_options.get('seed')
+            ).start()
+            install_fake_runway(server)
+            base_url = server.base_url
+
+        try:
+            for api in apis:
+                run_fn = run_generate_clip if api == 'generate_clip' else run_generate_script_clips
+                for concurrency in levels:
+                    count = clips or max(10, concurrency)
+                    for _ in range(repeat):
+                        run_index += 1
+                        exporter = PrometheusExporter()
+                        # 每轮使用不同的 API Key，避免进程级限流器的状态影响下一轮
+                        generator = make_generator(provider, base_url, f"bench-{run_index}", exporter,
+                                                   generator_overrides)
+                        before = server_counters(base_url) if server is None else dict(server.counters)
+                        with tempfile.TemporaryDirectory() as tmp:
+                            row = measure(lambda: run_fn(generator, image, count, concurrency, Path(tmp)))
+                        after = server_counters(base_url) if server is None else dict(server.counters)
+                        generator.close()
+
+                        row.update({
+                            'provider': provider,
+                            'api': api,
+                            'concurrency': concurrency,
+                            'server_requests': {key: after[key] - before.get(key, 0) for key in after},
+                            'phases': exporter.summary((0.5, 0.99))
+                        })
+                        results.append(row)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            if server is not None:
+                uninstall_fake_runway()
+                server.stop()
+    return results
+
+
+def _csv(value: str, cast=str) -> List:
+    return [cast(item.strip()) for item in value.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成流程负载基准（本地模拟提供商）')
+    parser.add_argument('--provider', default='stability,runway', help='提供商，逗号分隔')
+    parser.add_argument('--api', default=','.join(APIS), help='要测量的接口，逗号分隔')
+    parser.add_argument('--concurrency', default='1,10,100', help='并发片段数，逗号分隔')
+    parser.add_argument('--clips', type=int, default=None, help='每轮片段数，默认 max(10, 并发数)')
+    parser.add_argument('--repeat', type=int, default=1, help='每个组合重复次数')
+    parser.add_argument('--queue-delay', type=float, default=1.0, help='模拟任务排队时间（秒）')
+    parser.add_argument('--processing-delay', type=float, default=0.0, help='模拟任务生成时间（秒）')
+    parser.add_argument('--jitter', type=float, default=0.2, help='模拟时间抖动比例')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='模拟任务失败比例')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='模拟 429 比例')
+    parser.add_argument('--video-size', type=int, default=256 * 1024, help='模拟视频字节数')
+    parser.add_argument('--seed', type=int, default=0, help='模拟服务器随机种子')
+    parser.add_argument('--polling-initial-delay', type=float, default=None, help='覆盖轮询初始等待（秒）')
+    parser.add_argument('--no-rate-limit', action='store_true', help='关闭客户端限流')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    for api in _csv(args.api):
+        if api not in APIS:
+            parser.error(f"不支持的接口: {api}")
+
+    server_options = {
+        'queue_delay': args.queue_delay,
+        'processing_delay': args.processing_delay,
+        'jitter': args.jitter,
+        'failure_rate': args.failure_rate,
+        'throttle_rate': args.throttle_rate,
+        'video_size': args.video_size,
+        'seed': args.seed
+    }
+    overrides: Dict[str, Any] = {}
+    if args.polling_initial_delay is not None:
+        overrides['polling_initial_delay'] = args.polling_initial_delay
+    if args.no_rate_limit:
+        overrides.update(submit_rate_limit=None, submit_concurrency=None, poll_rate_limit=None)
+
+    results = run(
+        _csv(args.provider), _csv(args.api), _csv(args.concurrency, int), args.clips,
+        server_options, overrides, args.repeat
+    )
+
+    print(f"{'提供商':<10}{'接口':<24}{'并发':>6}{'成功/总数':>10}{'吞吐(片段/s)':>14}"
+          f"{'p50(s)':>9}{'p99(s)':>9}{'CPU(s)':>9}{'峰值内存(MB)':>14}")
+    for row in results:
+        latency = row['latency_seconds']
+        p50 = f"{latency['p50']:.2f}" if latency['p50'] is not None else '-'
+        p99 = f"{latency['p99']:.2f}" if latency['p99'] is not None else '-'
+        peak = f"{row['peak_rss_bytes'] / 1024 ** 2:.0f}" if row['peak_rss_bytes'] else '-'
+        print(f"{row['provider']:<10}{row['api']:<24}{row['concurrency']:>6}"
+              f"{row['succeeded']:>5}/{row['clips']:<4}{row['throughput_clips_per_second']:>14.2f}"
+              f"{p50:>9}{p99:>9}{row['cpu_seconds']:>9.2f}{peak:>14}")
+
+    if args.json_path:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'server_options': server_options,
+            'generator_overrides': overrides,
+            'results': results
+        }
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+导入耗时基准
+在全新的子进程中导入各入口模块，记录耗时以及被连带导入的重型依赖，防止导入变慢的回归
+
+运行: python -m clip_studio.benchmarks.bench_import [--repeat 5] [--max-ms 500] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+# (名称, 子进程中执行的代码)
+TARGETS = [
+    ('import clip_studio', 'import clip_studio'),
+    ('clip_studio.models', 'from clip_studio.models import Script'),
+    ('SVDGenerator', 'from clip_studio import SVDGenerator'),
+    ('SVDGenerator()', "from clip_studio import SVDGenerator; SVDGenerator({'api_key': 'x'})"),
+]
+
+# 仅 API 调用时不应被导入的模块
+HEAVY_MODULES = ['torch', 'numpy', 'requests', 'cv2', 'diffusers', 'transformers']
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(code: str) -> Dict[str, Any]:
+    """
+    在全新的解释器中执行代码并测量耗时
+
+    Args:
+        code: 要测量的导入语句
+
+    Returns:
+        {'seconds': 耗时, 'loaded': 被导入的重型模块列表}
+    """
+    modules_dir = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [modules_dir, env.get('PYTHONPATH')]))
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(code=code, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        repeat: 每项重复次数
+
+    Returns:
+        每个入口的结果列表
+    """
+    results = []
+    for name, code in TARGETS:
+        samples = [measure(code) for _ in range(repeat)]
+        results.append({
+            'target': name,
+            'import_ms': round(statistics.median(s['seconds'] for s in samples) * 1000, 1),
+            'heavy_modules': samples[0]['loaded'],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入耗时基准')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--max-ms', type=float, default=None, help='任一入口超过该耗时（毫秒）时以非零状态退出')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    print(f"{'入口':<20}{'耗时(ms)':>10}  重型依赖")
+    for row in results:
+        print(f"{row['target']:<20}{row['import_ms']:>10}  {', '.join(row['heavy_modules']) or '-'}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failures: List[str] = []
+    for row in results:
+        if row['heavy_modules']:
+            failures.append(f"{row['target']} 导入了 {', '.join(row['heavy_modules'])}")
+        if args.max_ms is not None and row['import_ms'] > args.max_ms:
+            failures.append(f"{row['target']} 耗时 {row['import_ms']} ms 超过 {args.max_ms} ms")
+    if failures:
+        print('\n'.join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
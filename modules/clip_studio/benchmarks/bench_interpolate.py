@@ -0,0 +1,108 @@
+"""
+插帧基准
+生成一段低帧率的合成视频，测量不同插帧方式与线程数下插值到目标帧率的处理速度（帧/秒）
+
+运行: python -m clip_studio.benchmarks.bench_interpolate [--size 1024x576] [--source-fps 6] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from ..interpolation import INTERPOLATION_METHODS, interpolate_video
+from ..video_writer import StreamingVideoWriter
+
+
+def make_video(path: Path, size: Tuple[int, int], fps: float, frames: int) -> None:
+    """写入一段平移渐变背景上移动方块的合成视频"""
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)
+    with StreamingVideoWriter(str(path), fps, size) as writer:
+        for i in range(frames):
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[...] = np.roll(gradient, i * 8).astype(np.uint8)[None, :, None]
+            x = (i * width // frames) % (width - height // 4)
+            frame[height // 3:height // 3 + height // 4, x:x + height // 4] = (255, 64, 0)
+            writer.write(frame)
+
+
+def run(
+    size: Tuple[int, int] = (1024, 576),
+    source_fps: float = 6,
+    target_fps: float = 24,
+    frames: int = 25,
+    workers: List[int] = None,
+    repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        size: 视频尺寸 (宽, 高)
+        source_fps: 源视频帧率
+        target_fps: 目标帧率
+        frames: 源视频帧数
+        workers: 要测试的线程数列表
+        repeat: 每项重复次数
+
+    Returns:
+        每种设置的结果列表
+    """
+    workers = workers or sorted({1, os.cpu_count() or 1})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / 'source.mp4'
+        make_video(source, size, source_fps, frames)
+        for method in INTERPOLATION_METHODS:
+            for count in workers:
+                samples = []
+                for _ in range(repeat):
+                    stats = interpolate_video(
+                        str(source), str(Path(tmp) / 'output.mp4'),
+                        target_fps=target_fps, method=method, workers=count
+                    )
+                    samples.append(stats['frames_per_second'])
+                results.append({
+                    'method': method,
+                    'workers': count,
+                    'size': f"{size[0]}x{size[1]}",
+                    'source_fps': source_fps,
+                    'target_fps': target_fps,
+                    'frames_out': stats['frames_out'],
+                    'frames_per_second': round(statistics.median(samples), 1)
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='插帧基准')
+    parser.add_argument('--size', default='1024x576', help='视频尺寸，如 1024x576')
+    parser.add_argument('--source-fps', type=float, default=6, help='源视频帧率')
+    parser.add_argument('--target-fps', type=float, default=24, help='目标帧率')
+    parser.add_argument('--frames', type=int, default=25, help='源视频帧数')
+    parser.add_argument('--workers', default=None, help='线程数，逗号分隔，默认 1 与 CPU 核数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    workers = [int(v) for v in args.workers.split(',')] if args.workers else None
+    results = run((width, height), args.source_fps, args.target_fps, args.frames, workers, args.repeat)
+
+    print(f"{'方式':<8}{'线程数':>8}{'输出帧数':>10}{'帧/秒':>10}")
+    for row in results:
+        print(f"{row['method']:<8}{row['workers']:>8}{row['frames_out']:>10}{row['frames_per_second']:>10}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+任务日志基准
+向任务日志写入大量历史记录后，测量记录提交、批量状态查询、分页与恢复认领的耗时
+
+运行: python -m clip_studio.benchmarks.bench_journal [--rows 100000] [--json results.json]
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+from ..journal import JobJournal, FETCHED, FAILED, PENDING, COMPLETE
+from ..tasks import ClipHandle
+
+
+def populate(path: Path, rows: int, pending: int = 20) -> None:
+    """
+    直接批量写入历史记录（绕过逐条提交，只用于准备数据）
+
+    Args:
+        path: 数据库路径
+        rows: 记录总数
+        pending: 其中未完成的记录数
+    """
+    now = time.time()
+    statuses = [FETCHED] * 9 + [FAILED]
+    records = []
+    for i in range(rows):
+        status = PENDING if i < pending // 2 else COMPLETE if i < pending else random.choice(statuses)
+        records.append((
+            'stability', f"task-{i}", status, f"/out/{i}.mp4", '{"seed": 1}', None,
+            None, None, 'other-host:1', now - rows + i, now - rows + i
+        ))
+    conn = sqlite3.connect(str(path))
+    conn.executemany('INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', records)
+    conn.commit()
+    conn.close()
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> float:
+    """返回多次调用耗时的中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def run(rows: int = 100000, repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        rows: 历史记录数
+        repeat: 每项重复次数
+
+    Returns:
+        每项操作的结果列表
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'jobs.db'
+        journal = JobJournal(str(path))
+        populate(path, rows)
+
+        task_ids = [f"task-{i}" for i in random.sample(range(rows), 1000)]
+        counter = iter(range(10 ** 9))
+
+        def submit():
+            handle = ClipHandle(f"new-{next(counter)}", 'stability', '/out/new.mp4', timeout=600)
+            journal.record_submit(handle)
+            handle._resolve(ClipHandle.COMPLETE, video_url='http://example/video.mp4')
+            journal.record_resolved(handle)
+
+        results = [
+            {'operation': 'record_submit + record_resolved', 'ms': time_call(submit, repeat * 20)},
+            {'operation': 'statuses (1000 ids)', 'ms': time_call(lambda: journal.statuses('stability', task_ids), repeat)},
+            {'operation': 'count_by_status', 'ms': time_call(journal.count_by_status, repeat)},
+            {'operation': 'list_jobs (pending, 100)', 'ms': time_call(lambda: journal.list_jobs(PENDING, 'stability'), repeat)},
+            {'operation': 'claim_unfinished', 'ms': time_call(lambda: journal.claim_unfinished('stability', stale_after=0), 1)},
+        ]
+        journal.close()
+    for row in results:
+        row['rows'] = rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='任务日志基准')
+    parser.add_argument('--rows', type=int, default=100000, help='历史记录数')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+
+    print(f"{'操作':<36}{'耗时(ms)':>12}")
+    for row in results:
+        print(f"{row['operation']:<36}{row['ms']:>12}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
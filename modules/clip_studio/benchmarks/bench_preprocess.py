@@ -0,0 +1,157 @@
+"""
+图片预处理微基准
+对比旧实现（整图 LANCZOS 缩放后裁剪）与当前 _load_image + _preprocess_image 的耗时，
+RAW 行只测内存中的缩放裁剪，PNG/JPEG 行包含从磁盘解码
+
+运行: python -m clip_studio.benchmarks.bench_preprocess [--repeat 5] [--json results.json]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..video_generator import SVDGenerator
+
+
+SIZES: List[Tuple[int, int]] = [
+    (1024, 576),   # 已是目标尺寸
+    (1920, 1080),  # 1080p
+    (3840, 2160),  # 4K
+    (7680, 4320),  # 8K
+    (3000, 4000),  # 竖版
+]
+
+
+def legacy_preprocess(image: Image.Image, image_size: Tuple[int, int]) -> Image.Image:
+    """旧实现：先整图缩放再居中裁剪"""
+    target_width, target_height = image_size
+    current_width, current_height = image.size
+    target_ratio = target_width / target_height
+    current_ratio = current_width / current_height
+
+    if current_ratio > target_ratio:
+        new_height = target_height
+        new_width = int(current_width * (target_height / current_height))
+    else:
+        new_width = target_width
+        new_height = int(current_height * (target_width / current_width))
+
+    resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    left = (new_width - target_width) // 2
+    top = (new_height - target_height) // 2
+    return resized_image.crop((left, top, left + target_width, top + target_height))
+
+
+def legacy_load(path: Path, image_size: Tuple[int, int]) -> Image.Image:
+    """旧实现：完整解码后预处理"""
+    return legacy_preprocess(Image.open(path).convert('RGB'), image_size)
+
+
+def make_image(size: Tuple[int, int]) -> Image.Image:
+    """生成带渐变与噪声的测试图，避免纯色图被编码器过度压缩"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None, None]
+    noise = rng.integers(0, 32, (height, width, 3), dtype=np.uint8)
+    pixels = ((x + y) / 2 + noise).clip(0, 255).astype(np.uint8)
+    return Image.fromarray(pixels, 'RGB')
+
+
+def time_call(fn, repeat: int) -> float:
+    """返回多次调用的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def make_row(size, fmt: str, legacy_fn, fast_fn, repeat: int) -> Dict[str, Any]:
+    """测量一组旧/新实现并对比结果"""
+    legacy_ms = time_call(legacy_fn, repeat)
+    fast_ms = time_call(fast_fn, repeat)
+    # 画质对比：与旧实现结果的平均绝对误差（0-255）
+    diff = np.abs(
+        np.asarray(legacy_fn(), dtype=np.int16) - np.asarray(fast_fn(), dtype=np.int16)
+    )
+    return {
+        'size': f"{size[0]}x{size[1]}",
+        'format': fmt,
+        'legacy_ms': round(legacy_ms, 2),
+        'fast_ms': round(fast_ms, 2),
+        'speedup': round(legacy_ms / max(fast_ms, 0.01), 1),
+        'mean_abs_diff': round(float(diff.mean()), 3)
+    }
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        repeat: 每项重复次数
+
+    Returns:
+        每个尺寸/格式的结果列表
+    """
+    generator = SVDGenerator(config={'device': 'cpu'})
+    image_size = generator.config['image_size']
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in SIZES:
+            image = make_image(size)
+
+            # 仅缩放裁剪（图片已在内存中解码）
+            results.append(make_row(
+                size, 'RAW',
+                lambda: legacy_preprocess(image, image_size),
+                lambda: generator._preprocess_image(image),
+                repeat
+            ))
+
+            # 从磁盘解码 + 缩放裁剪
+            for fmt in ('PNG', 'JPEG'):
+                path = Path(tmp_dir) / f"{size[0]}x{size[1]}.{fmt.lower()}"
+                image.save(path, format=fmt, quality=95)
+                results.append(make_row(
+                    size, fmt,
+                    lambda: legacy_load(path, image_size),
+                    lambda: generator._preprocess_image(generator._load_image(str(path))),
+                    repeat
+                ))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图片预处理微基准')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    print(f"{'尺寸':<12}{'格式':<6}{'旧实现(ms)':>12}{'新实现(ms)':>12}{'加速比':>8}{'像素差':>8}")
+    for row in results:
+        print(
+            f"{row['size']:<12}{row['format']:<6}{row['legacy_ms']:>12}"
+            f"{row['fast_ms']:>12}{row['speedup']:>8}{row['mean_abs_diff']:>8}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+批量预处理基准
+对比逐张 _prepare_upload 与 preprocess_batch（线程池 / 进程池、不同并发数）处理一批分镜图的吞吐（张/秒）
+
+运行: python -m clip_studio.benchmarks.bench_preprocess_batch [--images 32] [--size 3840x2160] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from ..video_generator import SVDGenerator
+from .bench_preprocess import make_image
+
+
+def run(
+    images: int = 32,
+    size: Tuple[int, int] = (3840, 2160),
+    workers: List[int] = None,
+    repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        images: 每批图片数
+        size: 原图尺寸 (宽, 高)
+        workers: 要测试的并发数列表
+        repeat: 每项重复次数
+
+    Returns:
+        每种设置的结果列表
+    """
+    cores = os.cpu_count() or 1
+    workers = workers or sorted({1, 2, cores} & set(range(1, cores + 1)))
+    generator = SVDGenerator({'api_provider': 'stability', 'api_key': 'benchmark'})
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = make_image(size)
+        paths = []
+        for index in range(images):
+            # PNG 与 JPEG 各占一半，覆盖两种解码路径
+            path = Path(tmp) / (f'{index}.jpg' if index % 2 else f'{index}.png')
+            if index % 2:
+                image.save(path, quality=95)
+            else:
+                image.save(path, compress_level=1)
+            paths.append(path)
+
+        def measure(name: str, count: int, fn) -> None:
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - started)
+            seconds = statistics.median(samples)
+            results.append({
+                'executor': name,
+                'workers': count,
+                'images': images,
+                'seconds': round(seconds, 3),
+                'images_per_second': round(images / seconds, 1)
+            })
+
+        measure('sequential', 1, lambda: [generator._prepare_upload(path) for path in paths])
+        for kind in ('thread', 'process'):
+            for count in workers:
+                measure(kind, count, lambda: generator.preprocess_batch(paths, executor=kind, max_workers=count))
+
+    generator.close()
+    baseline = results[0]['images_per_second']
+    for row in results:
+        row['speedup'] = round(row['images_per_second'] / baseline, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量预处理基准')
+    parser.add_argument('--images', type=int, default=32, help='每批图片数')
+    parser.add_argument('--size', default='3840x2160', help='原图尺寸，如 3840x2160')
+    parser.add_argument('--workers', default=None, help='并发数，逗号分隔，默认 1、2 与 CPU 核数')
+    parser.add_argument('--repeat', type=int, default=3, help='每项重复次数')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    workers = [int(v) for v in args.workers.split(',')] if args.workers else None
+    results = run(args.images, (width, height), workers, args.repeat)
+
+    print(f"{'方式':<12}{'并发数':>8}{'耗时(s)':>10}{'张/秒':>10}{'加速比':>8}")
+    for row in results:
+        print(
+            f"{row['executor']:<12}{row['workers']:>8}{row['seconds']:>10}"
+            f"{row['images_per_second']:>10}{row['speedup']:>8}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
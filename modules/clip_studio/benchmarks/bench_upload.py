@@ -0,0 +1,74 @@
+"""
+上传编码基准
+对比不同上传编码设置的编码耗时与请求体大小，便于选择提供商接受的最快配置
+
+运行: python -m clip_studio.benchmarks.bench_upload [--repeat 5] [--json results.json]
+"""
+
+import argparse
+import base64
+import json
+import statistics
+from typing import Dict, Any, List
+
+from .bench_preprocess import make_image
+from ..upload import UploadEncoder
+
+
+SETTINGS: List[Dict[str, Any]] = [
+    {'format': 'png', 'png_compress_level': 1},
+    {'format': 'png', 'png_compress_level': 6},
+    {'format': 'png', 'png_compress_level': 9},
+    {'format': 'webp', 'webp_method': 0},
+    {'format': 'webp', 'webp_method': 4},
+    {'format': 'jpeg', 'jpeg_quality': 95},
+]
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    """
+    执行基准测试
+
+    Args:
+        repeat: 每项重复次数
+
+    Returns:
+        每种编码设置的结果列表
+    """
+    image = make_image((1024, 576))
+    results = []
+    for setting in SETTINGS:
+        encoder = UploadEncoder(**setting)
+        encoded = [encoder.encode(image) for _ in range(repeat)]
+        size = encoded[0].size
+        results.append({
+            'setting': ' '.join(f"{key}={value}" for key, value in setting.items()),
+            'encode_ms': round(statistics.median(e.encode_seconds for e in encoded) * 1000, 2),
+            'multipart_bytes': size,
+            'json_bytes': len(base64.b64encode(encoded[0].data)),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='上传编码基准')
+    parser.add_argument('--repeat', type=int, default=5, help='每项重复次数')
+    parser.add_argument('--json', dest='json_path', default=None, help='结果输出的 JSON 文件')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    print(f"{'设置':<36}{'编码(ms)':>10}{'multipart(B)':>14}{'json(B)':>12}")
+    for row in results:
+        print(
+            f"{row['setting']:<36}{row['encode_ms']:>10}"
+            f"{row['multipart_bytes']:>14}{row['json_bytes']:>12}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
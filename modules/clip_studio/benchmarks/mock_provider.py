@@ -0,0 +1,337 @@
+"""
+本地模拟的视频生成提供商（仅用于基准测试，不产生 API 费用）
+MockStabilityServer 用标准库 HTTP 服务器模拟 Stability 的提交、结果查询与视频下载接口；
+install_fake_runway 注入一个同名的假 runway 模块，任务与视频由同一个服务器提供。
+排队时间、失败率与 429 比例均可配置
+
+单独运行: python -m clip_studio.benchmarks.mock_provider [--queue-delay 1.0] [--throttle-rate 0.1]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import types
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Dict, Any
+
+
+SUBMIT_PATH = '/v2alpha/generation/image-to-video'
+RESULT_PREFIX = SUBMIT_PATH + '/result/'
+VIDEO_PREFIX = '/videos/'
+STATS_PATH = '/_mock/stats'  # 服务器计数（提交、查询、下载、429 次数）
+
+
+class MockTaskStore:
+    """模拟提供商的任务表：按配置的排队时间完成，按失败率失败"""
+
+    def __init__(
+        self,
+        queue_delay: float = 1.0,
+        processing_delay: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            queue_delay: 任务排队时间（秒）
+            processing_delay: 排队结束后的生成时间（秒）
+            jitter: 两段时间的随机抖动比例（0.2 表示 ±20%）
+            failure_rate: 任务失败的比例 0-1
+            seed: 随机种子（可复现的失败与抖动）
+        """
+        self.queue_delay = queue_delay
+        self.processing_delay = processing_delay
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _scaled(self, seconds: float) -> float:
+        return seconds * (1 + self._random.uniform(-self.jitter, self.jitter)) if self.jitter else seconds
+
+    def create(self) -> str:
+        """创建任务并返回任务 ID"""
+        now = time.monotonic()
+        with self._lock:
+            task_id = f"mock-{next(self._ids)}"
+            started = now + self._scaled(self.queue_delay)
+            self._tasks[task_id] = {
+                'started': started,
+                'finished': started + self._scaled(self.processing_delay),
+                'failed': self._random.random() < self.failure_rate
+            }
+        return task_id
+
+    def state(self, task_id: str) -> Optional[str]:
+        """
+        任务当前状态
+
+        Returns:
+            'queued'、'running'、'complete'、'failed'，任务不存在时返回 None
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        now = time.monotonic()
+        if now < task['started']:
+            return 'queued'
+        if now < task['finished']:
+            return 'running'
+        return 'failed' if task['failed'] else 'complete'
+
+
+class MockStabilityServer:
+    """模拟 Stability 图生视频接口的本地 HTTP 服务器"""
+
+    def __init__(
+        self,
+        store: Optional[MockTaskStore] = None,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.5,
+        video_size: int = 1024 * 1024,
+        api_key: Optional[str] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            store: 任务表，默认使用无排队、不失败的任务表
+            throttle_rate: 以 429 拒绝提交与查询请求的比例 0-1
+            retry_after: 429 响应的 Retry-After（秒）
+            video_size: 返回视频的字节数
+            api_key: 要求的 API Key，None 表示不校验
+            seed: 随机种子
+        """
+        self.store = store or MockTaskStore(queue_delay=0.0)
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.video = bytes(range(256)) * (video_size // 256) + bytes(video_size % 256)
+        self.api_key = api_key
+        self.counters = {'submit': 0, 'poll': 0, 'download': 0, 'throttled': 0, 'unauthorized': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """服务器地址，作为生成器的 api_base_url"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def video_url(self, task_id: str) -> str:
+        return f"{self.base_url}{VIDEO_PREFIX}{task_id}.mp4"
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _throttled(self) -> bool:
+        if not self.throttle_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    def start(self) -> 'MockStabilityServer':
+        """在后台线程启动服务器（随机端口）"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, code: int, body: bytes, content_type: str = 'application/json',
+                      headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _json(self, code: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+                self._send(code, json.dumps(payload).encode('utf-8'), headers=headers)
+
+            def _reject(self) -> bool:
+                """校验 API Key 并按比例返回 429，已响应时返回 True"""
+                if server.api_key is not None and self.headers.get('Authorization') != f"Bearer {server.api_key}":
+                    server._count('unauthorized')
+                    self._json(401, {'errors': ['unauthorized']})
+                    return True
+                if server._throttled():
+                    server._count('throttled')
+                    self._json(429, {'errors': ['rate limited']}, {'Retry-After': str(server.retry_after)})
+                    return True
+                return False
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                self.rfile.read(length)
+                if self.path != SUBMIT_PATH:
+                    self._json(404, {'errors': ['not found']})
+                    return
+                if self._reject():
+                    return
+                server._count('submit')
+                self._json(200, {'id': server.store.create()})
+
+            def do_GET(self):
+                if self.path == STATS_PATH:
+                    with server._lock:
+                        self._json(200, dict(server.counters))
+                    return
+                if self.path.startswith(VIDEO_PREFIX):
+                    server._count('download')
+                    self._send(200, server.video, 'video/mp4')
+                    return
+                if not self.path.startswith(RESULT_PREFIX):
+                    self._json(404, {'errors': ['not found']})
+                    return
+                if self._reject():
+                    return
+                server._count('poll')
+                task_id = self.path[len(RESULT_PREFIX):]
+                state = server.store.state(task_id)
+                if state is None:
+                    self._json(404, {'errors': [f'task {task_id} not found']})
+                elif state == 'complete':
+                    self._json(200, {'id': task_id, 'status': 'complete', 'video_url': server.video_url(task_id)})
+                elif state == 'failed':
+                    self._json(200, {'id': task_id, 'status': 'failed', 'error': 'mock failure'})
+                else:
+                    self._json(202, {'id': task_id, 'status': 'in-progress'})
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-stability', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务器"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'MockStabilityServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+class RateLimitError(Exception):
+    """假 SDK 在请求被限流时抛出的异常（对应 HTTP 429）"""
+
+    status_code = 429
+
+
+class _FakeRunwayClient:
+    """与生成器使用到的 Runway SDK 接口一致的假客户端"""
+
+    # Runway 的任务状态（生成器按小写比较）
+    STATES = {'queued': 'pending', 'running': 'running', 'complete': 'succeeded', 'failed': 'failed'}
+
+    def __init__(self, server: MockStabilityServer, latency: float, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._server = server
+        self._latency = latency
+        self.files = types.SimpleNamespace(upload=self._upload)
+        self.generate = types.SimpleNamespace(create=self._create)
+        self.tasks = types.SimpleNamespace(get=self._get)
+
+    def _call(self, name: str) -> None:
+        # 模拟一次网络往返，按服务器配置的比例限流
+        if self._latency:
+            time.sleep(self._latency)
+        if self._server._throttled():
+            self._server._count('throttled')
+            raise RateLimitError("429 Too Many Requests")
+        self._server._count(name)
+
+    def _upload(self, data: bytes) -> Dict[str, Any]:
+        self._call('submit')
+        return {'id': f"file-{len(data)}"}
+
+    def _create(self, **kwargs) -> Dict[str, Any]:
+        self._call('submit')
+        return {'id': self._server.store.create()}
+
+    def _get(self, task_id: str) -> Dict[str, Any]:
+        self._call('poll')
+        state = self._server.store.state(task_id)
+        if state is None:
+            raise KeyError(f"task {task_id} not found")
+        task = {'id': task_id, 'status': self.STATES[state]}
+        if state == 'complete':
+            task['output'] = {'video_url': self._server.video_url(task_id)}
+        elif state == 'failed':
+            task['error'] = 'mock failure'
+        return task
+
+
+def install_fake_runway(server: MockStabilityServer, latency: float = 0.005) -> types.ModuleType:
+    """
+    注入假的 runway 模块（替换 sys.modules 中的同名模块）
+
+    Args:
+        server: 提供任务表与视频下载的模拟服务器
+        latency: 每次 SDK 调用模拟的网络延迟（秒）
+
+    Returns:
+        注入的模块，用 uninstall_fake_runway 移除
+    """
+    module = types.ModuleType('runway')
+    module.Runway = lambda api_key=None: _FakeRunwayClient(server, latency, api_key)
+    module.RateLimitError = RateLimitError
+    module.__fake__ = True
+    sys.modules['runway'] = module
+    return module
+
+
+def uninstall_fake_runway() -> None:
+    """移除注入的假 runway 模块"""
+    module = sys.modules.get('runway')
+    if module is not None and getattr(module, '__fake__', False):
+        del sys.modules['runway']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟 Stability 图生视频接口的本地服务器')
+    parser.add_argument('--queue-delay', type=float, default=1.0, help='任务排队时间（秒）')
+    parser.add_argument('--processing-delay', type=float, default=0.0, help='任务生成时间（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='时间抖动比例')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='任务失败比例')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='返回 429 的请求比例')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='429 的 Retry-After（秒）')
+    parser.add_argument('--video-size', type=int, default=1024 * 1024, help='视频字节数')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    args = parser.parse_args()
+
+    store = MockTaskStore(args.queue_delay, args.processing_delay, args.jitter, args.failure_rate, args.seed)
+    server = MockStabilityServer(store, args.throttle_rate, args.retry_after, args.video_size, seed=args.seed)
+    server.start()
+    # 第一行输出服务器地址，供启动它的进程读取
+    print(server.base_url, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
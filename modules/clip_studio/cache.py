@@ -0,0 +1,208 @@
+"""
+视频片段结果缓存
+以输入图片内容与生成参数的哈希为键，命中时直接复用已生成的 MP4
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+
+def link_or_copy(source_path: str, output_path: str) -> str:
+    """
+    将已有视频放到输出路径（优先硬链接，跨设备时复制）
+
+    Args:
+        source_path: 源文件路径
+        output_path: 输出路径
+
+    Returns:
+        输出路径
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.exists():
+        if output_path.samefile(source_path):
+            return str(output_path)
+        output_path.unlink()
+    try:
+        os.link(source_path, output_path)
+    except OSError:
+        shutil.copy2(source_path, output_path)
+    return str(output_path)
+
+
+class ClipCache:
+    """基于内容寻址的磁盘缓存，按总大小进行 LRU 淘汰"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 10 * 1024 ** 3):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节），默认 10GB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, _, size in self._scan())
+
+    @staticmethod
+    def make_key(image_id: bytes, params: Dict[str, Any]) -> str:
+        """
+        计算缓存键
+
+        Args:
+            image_id: 标识输入图片内容的字节（预处理后的像素或源图片摘要），
+                      不应使用上传编码后的字节，否则调整编码参数会使缓存全部失效
+            params: 影响生成结果的参数（provider、motion_bucket_id、noise_aug_strength、
+                    steps、guidance_scale、seed 等）
+
+        Returns:
+            十六进制 SHA-256 字符串
+        """
+        digest = hashlib.sha256()
+        digest.update(image_id)
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.mp4"
+
+    def _scan(self):
+        """遍历缓存文件，返回 (路径, 修改时间, 大小) 列表"""
+        entries = []
+        for path in self.cache_dir.glob('*/*.mp4'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[Path]:
+        """
+        查询缓存，命中时刷新其最近使用时间
+
+        Args:
+            key: 缓存键
+            count_miss: 未命中时是否计入 misses（同一请求之后还会再查询时传 False，避免重复计数）
+
+        Returns:
+            缓存文件路径，未命中返回 None
+        """
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if count_miss:
+                with self._lock:
+                    self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def materialize(self, key: str, output_path: str, count_miss: bool = True) -> Optional[str]:
+        """
+        将缓存结果放到输出路径（优先硬链接，跨设备时复制）
+
+        Args:
+            key: 缓存键
+            output_path: 输出视频路径
+            count_miss: 未命中时是否计入 misses，见 get
+
+        Returns:
+            输出路径，未命中返回 None
+        """
+        cached = self.get(key, count_miss)
+        if cached is None:
+            return None
+        return link_or_copy(cached, output_path)
+
+    def put(self, key: str, source_path: str) -> Path:
+        """
+        将生成好的视频写入缓存（原子替换），必要时淘汰最久未使用的条目
+
+        Args:
+            key: 缓存键
+            source_path: 已生成的视频路径
+
+        Returns:
+            缓存文件路径
+        """
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        old_size = path.stat().st_size if path.exists() else 0
+
+        tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(source_path, tmp_path)
+        except OSError:
+            shutil.copy2(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        os.utime(path)
+
+        with self._lock:
+            self._total_bytes += path.stat().st_size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def _evict(self) -> None:
+        """按最近使用时间淘汰，直到总大小低于上限（调用方持有锁）"""
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计信息"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+_shared_caches: Dict[Tuple[str, int], ClipCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_clip_cache(cache_dir: str, max_bytes: int = 10 * 1024 ** 3) -> ClipCache:
+    """
+    获取进程内共享的缓存实例（避免每个生成器重复扫描缓存目录）
+
+    Args:
+        cache_dir: 缓存目录
+        max_bytes: 缓存总大小上限（字节）
+
+    Returns:
+        ClipCache 实例
+    """
+    key = (str(Path(cache_dir).resolve()), max_bytes)
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ClipCache(cache_dir, max_bytes)
+            _shared_caches[key] = cache
+        return cache
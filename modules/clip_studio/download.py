@@ -0,0 +1,241 @@
+"""
+视频下载
+写入临时文件后原子重命名，断线后用 HTTP Range 续传，完成前校验长度/校验和，
+大文件可按区间并行下载
+"""
+
+import base64
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+import requests
+
+
+class DownloadStats:
+    """单次下载的统计信息"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.bytes = 0
+        self.seconds = 0.0
+        self.resumes = 0  # 断线续传次数
+        self.parts = 1  # 并行区间数
+        self.verified = False  # 是否通过了校验和校验
+
+    @property
+    def throughput(self) -> float:
+        """下载吞吐（字节/秒）"""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'bytes': self.bytes,
+            'seconds': self.seconds,
+            'throughput': self.throughput,
+            'resumes': self.resumes,
+            'parts': self.parts,
+            'verified': self.verified
+        }
+
+
+_CONTENT_RANGE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+def _total_size(response: requests.Response) -> Optional[int]:
+    """从 Content-Range 或 Content-Length 中解析文件总大小"""
+    match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+    if match and match.group(3) != '*':
+        return int(match.group(3))
+    if response.status_code == 200 and 'Content-Length' in response.headers:
+        return int(response.headers['Content-Length'])
+    return None
+
+
+def _fetch_range(
+    session: requests.Session,
+    url: str,
+    path: Path,
+    start: int,
+    end: Optional[int],
+    chunk_size: int,
+    max_retries: int,
+    timeout: float,
+    stats: DownloadStats,
+    lock: threading.Lock,
+    etag: Optional[str] = None
+) -> Tuple[Optional[int], Dict[str, str]]:
+    """
+    下载 [start, end] 区间写入文件对应位置，断线后从已写入的位置续传
+
+    Returns:
+        (文件总大小, 最后一次响应头)
+    """
+    offset = start
+    attempt = 0
+    total = None
+    headers_seen: Dict[str, str] = {}
+    with open(path, 'r+b') as f:
+        while True:
+            headers = {}
+            if offset > 0 or end is not None:
+                headers['Range'] = f"bytes={offset}-{'' if end is None else end}"
+                if etag:
+                    headers['If-Range'] = etag
+            try:
+                with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                    if response.status_code == 416 and offset > start:
+                        # 断线前已经写完全部内容
+                        return total, headers_seen
+                    response.raise_for_status()
+                    headers_seen = dict(response.headers)
+                    etag = etag or response.headers.get('ETag')
+                    total = _total_size(response) or total
+                    if response.status_code == 200:
+                        if start > 0 or end is not None:
+                            raise RuntimeError("服务端不支持区间下载")
+                        # 服务端不支持续传（或资源已变化），从头重新下载，已计入的字节数作废
+                        with lock:
+                            stats.bytes -= offset
+                        offset = 0
+                        f.truncate(0)
+                    f.seek(offset)
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        offset += len(chunk)
+                        with lock:
+                            stats.bytes += len(chunk)
+                return total, headers_seen
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.Timeout) as e:
+                attempt += 1
+                if attempt > max_retries:
+                    raise RuntimeError(f"下载中断且重试 {max_retries} 次后仍失败: {str(e)}")
+                with lock:
+                    stats.resumes += 1
+                time.sleep(min(2 ** attempt * 0.5, 8))
+
+
+def _probe(session: requests.Session, url: str, timeout: float) -> Tuple[Optional[int], bool, Optional[str]]:
+    """请求第一个字节，探测文件大小、是否支持 Range 以及 ETag"""
+    with session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        supports_range = response.status_code == 206
+        return _total_size(response), supports_range, response.headers.get('ETag')
+
+
+def _verify(path: Path, size: Optional[int], headers: Dict[str, str], expected_sha256: Optional[str]) -> bool:
+    """
+    校验下载结果
+
+    Returns:
+        是否进行了校验和比对
+    """
+    actual_size = path.stat().st_size
+    if size is not None and actual_size != size:
+        raise RuntimeError(f"下载文件不完整: 期望 {size} 字节，实际 {actual_size} 字节")
+
+    content_md5 = headers.get('Content-MD5')
+    if not expected_sha256 and not content_md5:
+        return False
+
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(block)
+            md5.update(block)
+    if expected_sha256 and sha256.hexdigest() != expected_sha256.lower():
+        raise RuntimeError("下载文件校验失败: SHA-256 不匹配")
+    if content_md5 and base64.b64encode(md5.digest()).decode('ascii') != content_md5:
+        raise RuntimeError("下载文件校验失败: Content-MD5 不匹配")
+    return True
+
+
+def download_file(
+    session: requests.Session,
+    url: str,
+    output_path: Path,
+    chunk_size: int = 1024 * 1024,
+    max_retries: int = 3,
+    timeout: float = 300,
+    expected_sha256: Optional[str] = None,
+    parallel_threshold: Optional[int] = None,
+    parallel_parts: int = 4
+) -> DownloadStats:
+    """
+    下载文件到 output_path
+
+    先写入同目录下的 .part 临时文件（每次下载独立命名，同一输出路径的并发下载互不干扰），
+    校验通过后原子重命名，失败时不会留下截断的文件。
+
+    Args:
+        session: HTTP 会话
+        url: 下载地址
+        output_path: 输出路径
+        chunk_size: 读取块大小（字节）
+        max_retries: 断线续传的最大重试次数
+        timeout: 单次请求超时（秒）
+        expected_sha256: 期望的 SHA-256（可选）
+        parallel_threshold: 文件大小超过该值（字节）且服务端支持 Range 时并行分段下载，None 表示关闭
+        parallel_parts: 并行分段数
+
+    Returns:
+        DownloadStats 下载统计
+    """
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.{uuid.uuid4().hex[:12]}.part")
+    stats = DownloadStats(url)
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    tmp_path.write_bytes(b'')
+    try:
+        size, supports_range, etag = (None, False, None)
+        if parallel_threshold is not None:
+            size, supports_range, etag = _probe(session, url, timeout)
+
+        if supports_range and size is not None and size >= parallel_threshold and parallel_parts > 1:
+            with open(tmp_path, 'r+b') as f:
+                f.truncate(size)
+            part_size = -(-size // parallel_parts)
+            ranges: List[Tuple[int, int]] = [
+                (start, min(start + part_size, size) - 1)
+                for start in range(0, size, part_size)
+            ]
+            stats.parts = len(ranges)
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                results = list(executor.map(
+                    lambda r: _fetch_range(
+                        session, url, tmp_path, r[0], r[1],
+                        chunk_size, max_retries, timeout, stats, lock, etag
+                    ),
+                    ranges
+                ))
+            headers = results[0][1]
+            headers.pop('Content-MD5', None)  # 区间响应的 MD5 只对应部分内容
+        else:
+            total, headers = _fetch_range(
+                session, url, tmp_path, 0, None,
+                chunk_size, max_retries, timeout, stats, lock
+            )
+            size = total if total is not None else size
+            if stats.resumes:
+                headers.pop('Content-MD5', None)
+
+        stats.verified = _verify(tmp_path, size, headers, expected_sha256)
+        os.replace(tmp_path, output_path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        stats.seconds = time.perf_counter() - started
+
+    return stats
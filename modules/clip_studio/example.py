@@ -1,8 +1,11 @@
 """
 视频生成器使用示例
+
+在 modules 目录下运行: python -m clip_studio.example
 """
 
-from video_generator import SVDGenerator
+from .models import Script, Scene
+from .video_generator import SVDGenerator
 
 # 示例1：使用动效模板
 def example_with_template():
@@ -68,9 +71,42 @@ def example_get_template():
     
     # 获取特定模板的配置
     template = generator.get_motion_template('Cinematic Slow')
-    print(f"Cinematic Slow 模板配置: {template}")
+    print(f"Cinematic Slow 模板配置: {dict(template)}")
     # 输出: {'motion_bucket_id': 20, 'noise_aug_strength': 0.02, 'description': '...'}
 
+# 示例4：并发生成整个剧本的所有场景
+def example_script_batch():
+    config = {
+        'api_provider': 'stability',
+        'api_key': 'your-api-key-here'
+    }
+    generator = SVDGenerator(config=config)
+    
+    script = Script(
+        id='script-001',
+        title='赛博剑客的觉醒',
+        author='AI Writer',
+        scenes=[
+            Scene(scene_number=1, content='赛博剑客站在霓虹街头', dialogue='...',
+                  vfx_suggestion='推镜头', duration=5.0),
+            Scene(scene_number=2, content='剑客拔刀', dialogue='...',
+                  vfx_suggestion='快速切换', duration=3.0),
+        ]
+    )
+    
+    results = generator.generate_script_clips(
+        script=script,
+        images={1: 'path/to/scene_1.jpg', 2: 'path/to/scene_2.jpg'},
+        output_dir='output/script-001',
+        max_concurrency=8,
+        template_names={2: 'High Action'}
+    )
+    for scene_number, result in results.items():
+        if result.success:
+            print(f"场景 {scene_number} 生成成功: {result.output_path}")
+        else:
+            print(f"场景 {scene_number} 生成失败: {result.error}")
+
 if __name__ == '__main__':
     print("=== 示例1: 使用动效模板 ===")
     example_with_template()
@@ -80,3 +116,6 @@ if __name__ == '__main__':
     
     print("\n=== 示例3: 获取模板配置 ===")
     example_get_template()
+    
+    print("\n=== 示例4: 并发生成整个剧本 ===")
+    example_script_batch()
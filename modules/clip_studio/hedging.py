@@ -0,0 +1,309 @@
+"""
+对冲请求（hedged requests）
+主提供商的任务超过其耗时分位数仍未完成时，把同一请求提交给备用提供商，先完成的一方胜出，
+落败的一方不再轮询（两家 API 均未提供取消接口，已产生的费用无法撤回，由花费上限约束）；
+各提供商的耗时直方图在进程内共享，对冲阈值随其分位数自适应
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
+
+from .metrics import LatencyHistogram
+from .scheduler import TimerScheduler, get_timer_scheduler
+from .tasks import ClipHandle
+
+
+# 远程生成耗时的分桶上界（秒），比默认分桶更细，分位数估算更准确
+HEDGE_BUCKETS = (
+    1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 40.0, 50.0, 60.0, 75.0, 90.0,
+    120.0, 150.0, 180.0, 240.0, 300.0, 450.0, 600.0, float('inf')
+)
+
+
+class ProviderLatency:
+    """
+    各提供商远程任务耗时（提交到完成）的直方图
+
+    每个提供商保留当前与上一个窗口两个直方图，当前窗口满 window 个样本后轮换，
+    分位数按两个窗口合并计算，提供商排队时间变化后阈值能跟着变化。
+    对冲落败被放弃的任务只知道耗时不短于已等待的时间，按该时间记录为删失样本（耗时下限）。
+    """
+
+    def __init__(self, window: int = 500):
+        """
+        Args:
+            window: 每个窗口的样本数
+        """
+        self.window = window
+        self._histograms: Dict[str, Tuple[LatencyHistogram, Optional[LatencyHistogram]]] = {}
+        self._censored: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, provider: str, seconds: float, censored: bool = False) -> None:
+        """
+        记录一个任务耗时
+
+        Args:
+            provider: API 提供商
+            seconds: 提交到完成的耗时（秒）
+            censored: 是否为删失样本（任务被放弃，实际耗时不短于 seconds）
+        """
+        with self._lock:
+            if censored:
+                self._censored[provider] = self._censored.get(provider, 0) + 1
+            current, previous = self._histograms.get(provider) or (LatencyHistogram(HEDGE_BUCKETS), None)
+            if current.count >= self.window:
+                current, previous = LatencyHistogram(HEDGE_BUCKETS), current
+            current.observe(seconds)
+            self._histograms[provider] = (current, previous)
+
+    def _merged(self, provider: str) -> LatencyHistogram:
+        merged = LatencyHistogram(HEDGE_BUCKETS)
+        with self._lock:
+            for histogram in self._histograms.get(provider) or ():
+                if histogram is None:
+                    continue
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+        return merged
+
+    def quantile(self, provider: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """
+        估算提供商耗时的分位数
+
+        Args:
+            provider: API 提供商
+            q: 分位数，0-1
+            min_samples: 最少样本数，不足时返回 None
+
+        Returns:
+            估算值（秒）或 None
+        """
+        merged = self._merged(provider)
+        if merged.count < max(1, min_samples):
+            return None
+        return merged.quantile(q)
+
+    def stats(self, quantiles: Tuple[float, ...] = (0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Any]]:
+        """
+        各提供商的耗时摘要（样本数、平均值与分位数）
+
+        Returns:
+            提供商到摘要的映射
+        """
+        with self._lock:
+            providers = sorted(self._histograms)
+        result = {}
+        for provider in providers:
+            merged = self._merged(provider)
+            result[provider] = {
+                'count': merged.count,
+                'censored': self._censored.get(provider, 0),
+                'mean': merged.sum / merged.count if merged.count else None,
+                **{f'p{int(q * 100)}': merged.quantile(q) for q in quantiles}
+            }
+        return result
+
+
+class HedgeBudget:
+    """对冲请求的花费上限：对冲数不超过主请求数的 max_ratio 倍加 burst，且总数不超过 max_requests"""
+
+    def __init__(self, max_ratio: float = 0.1, burst: int = 2, max_requests: Optional[int] = None):
+        """
+        Args:
+            max_ratio: 对冲请求占主请求的比例上限
+            burst: 比例上限之外允许的额外对冲数（请求数较少时也能对冲）
+            max_requests: 对冲请求总数上限，None 表示只受比例限制
+        """
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.max_requests = max_requests
+        self.requests = 0
+        self.hedges = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """记录一个可能被对冲的主请求"""
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self) -> bool:
+        """
+        申请一次对冲
+
+        Returns:
+            是否在花费上限之内（是则计入已用额度）
+        """
+        with self._lock:
+            allowed = self.hedges < self.requests * self.max_ratio + self.burst
+            if self.max_requests is not None:
+                allowed = allowed and self.hedges < self.max_requests
+            if allowed:
+                self.hedges += 1
+            else:
+                self.rejected += 1
+            return allowed
+
+    def release(self) -> None:
+        """退还额度（对冲请求提交失败，没有产生费用）"""
+        with self._lock:
+            self.hedges = max(0, self.hedges - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """额度使用情况"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'rejected': self.rejected,
+                'hedge_ratio': self.hedges / self.requests if self.requests else 0.0
+            }
+
+
+class HedgedHandle(ClipHandle):
+    """
+    对冲任务句柄：包装主提供商的任务，触发对冲后再加入备用提供商的任务，
+    任一任务成功即以其结果结束（provider、task_id 改为胜出的一方），全部失败才失败
+    """
+
+    def __init__(self, primary: ClipHandle):
+        """
+        Args:
+            primary: 主提供商的任务句柄
+        """
+        super().__init__(
+            task_id=primary.task_id,
+            provider=primary.provider,
+            output_path=primary.output_path,
+            timeout=float('inf'),
+            params=primary.params
+        )
+        # 由内部任务各自的轮询器跟踪，本句柄只汇总结果
+        self.pollable = False
+        self.submitted_at = primary.submitted_at
+        self.cache_key = primary.cache_key
+        self.upload_stats = primary.upload_stats
+        self.timings = primary.timings
+        self.primary = primary
+        self.hedge: Optional[ClipHandle] = None
+        self.winner: Optional[ClipHandle] = None
+        self.hedged_at: Optional[float] = None  # 触发对冲时主任务已等待的时间（秒）
+        self._launching = False
+        primary.add_done_callback(self._on_attempt_done)
+
+    @property
+    def poll_count(self) -> int:
+        """主任务与对冲任务的轮询次数之和"""
+        return sum(h.strategy.polls for h in (self.primary, self.hedge) if h is not None)
+
+    def begin_hedge(self) -> bool:
+        """
+        准备提交对冲请求
+
+        Returns:
+            主任务是否仍未结束（否则无需对冲）
+        """
+        with self._lock:
+            if self.done or self.primary.done:
+                return False
+            self._launching = True
+            self.hedged_at = self.primary.elapsed
+            self.primary.hedged = True
+            return True
+
+    def attach(self, hedge: Optional[ClipHandle]) -> None:
+        """
+        加入对冲任务（hedge 为 None 表示提交失败）
+
+        Args:
+            hedge: 备用提供商的任务句柄
+        """
+        with self._lock:
+            self._launching = False
+            self.hedge = hedge
+            settled = self.done or self.winner is not None
+        if hedge is not None and settled:
+            # 提交期间主任务已经胜出：对冲任务立即放弃，不再轮询
+            hedge.cancelled = True
+            hedge._resolve(ClipHandle.FAILED, error=f"已取消：对冲请求由 {self.provider} 先完成")
+        elif hedge is not None:
+            hedge.add_done_callback(self._on_attempt_done)
+        else:
+            # 提交失败时主任务可能已经失败，在这里收尾
+            self._on_attempt_done(self.primary)
+
+    def _on_attempt_done(self, attempt: ClipHandle) -> None:
+        if not attempt.done:
+            return
+        with self._lock:
+            if self.done or self.winner is not None:
+                return
+            attempts = [h for h in (self.primary, self.hedge) if h is not None]
+            if attempt.status == ClipHandle.COMPLETE:
+                self.winner = attempt
+            elif self._launching or not all(h.done for h in attempts):
+                # 还有任务在进行，等待它的结果
+                return
+        if self.winner is None:
+            errors = '；'.join(f"{h.provider}: {h.error}" for h in attempts)
+            self._resolve(ClipHandle.FAILED, error=errors if len(attempts) > 1 else attempt.error)
+            return
+
+        for loser in attempts:
+            if loser is not attempt and not loser.done:
+                loser.cancelled = True
+                loser._resolve(ClipHandle.FAILED, error=f"已取消：对冲请求由 {attempt.provider} 先完成")
+        self.task_id = attempt.task_id
+        self.provider = attempt.provider
+        self._resolve(ClipHandle.COMPLETE, video_url=attempt.video_url)
+
+
+_provider_latency: Optional[ProviderLatency] = None
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_shared_lock = threading.Lock()
+
+
+def get_provider_latency() -> ProviderLatency:
+    """
+    获取进程内共享的提供商耗时直方图
+
+    Returns:
+        ProviderLatency 实例
+    """
+    global _provider_latency
+    with _shared_lock:
+        if _provider_latency is None:
+            _provider_latency = ProviderLatency()
+        return _provider_latency
+
+
+def get_hedge_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """
+    获取提交对冲请求的共享线程池（提交包含上传与限流等待，不在定时线程中执行）
+
+    首次创建时的参数生效，之后直接复用。
+
+    Args:
+        max_workers: 同时提交的对冲请求上限
+
+    Returns:
+        ThreadPoolExecutor 实例
+    """
+    global _hedge_executor
+    with _shared_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='clip-hedge-submit')
+        return _hedge_executor
+
+
+def get_hedge_scheduler() -> TimerScheduler:
+    """
+    获取触发对冲检查的定时器（与其他定时任务共用进程内的定时线程）
+
+    Returns:
+        TimerScheduler 实例
+    """
+    return get_timer_scheduler()
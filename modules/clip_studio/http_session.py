@@ -0,0 +1,51 @@
+"""
+HTTP 连接池
+复用 TCP/TLS 连接（keep-alive），避免每次提交、轮询、下载都重新握手
+"""
+
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+_shared_sessions: Dict[int, requests.Session] = {}
+_shared_lock = threading.Lock()
+
+
+def create_session(pool_size: int = 16) -> requests.Session:
+    """
+    创建带连接池的 HTTP 会话
+
+    Args:
+        pool_size: 每个主机保持的最大连接数
+
+    Returns:
+        requests.Session 对象
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_shared_session(pool_size: int = 16) -> requests.Session:
+    """
+    获取进程内共享的 HTTP 会话（按连接池大小区分）
+
+    Args:
+        pool_size: 每个主机保持的最大连接数
+
+    Returns:
+        共享的 requests.Session 对象
+    """
+    session = _shared_sessions.get(pool_size)
+    if session is None:
+        with _shared_lock:
+            session = _shared_sessions.get(pool_size)
+            if session is None:
+                session = create_session(pool_size)
+                _shared_sessions[pool_size] = session
+    return session
@@ -0,0 +1,213 @@
+"""
+CPU 插帧
+把帧率较低的片段插值到目标帧率：逐帧读取、按时间位置在相邻两帧之间插值（NumPy 线性混合或 OpenCV 光流），
+相邻帧对在线程池中并行处理，按顺序流式写入，内存中只保留有限的帧
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from .segments import iter_video_frames
+from .video_writer import StreamingVideoWriter
+
+
+INTERPOLATION_METHODS = ('blend', 'flow')
+
+
+def video_fps(path: str) -> float:
+    """
+    读取视频帧率
+
+    Args:
+        path: 视频路径
+
+    Returns:
+        帧率，无法读取时返回 0
+    """
+    import cv2
+
+    capture = cv2.VideoCapture(str(path))
+    try:
+        return capture.get(cv2.CAP_PROP_FPS) or 0.0
+    finally:
+        capture.release()
+
+
+def blend_frames(a: np.ndarray, b: np.ndarray, weights: List[float]) -> List[np.ndarray]:
+    """
+    线性混合两帧（整数定点运算，避免浮点转换）
+
+    Args:
+        a: 前一帧 RGB uint8
+        b: 后一帧 RGB uint8
+        weights: 各插值帧中后一帧的权重 0-1
+
+    Returns:
+        插值帧列表
+    """
+    a16 = a.astype(np.uint16)
+    b16 = b.astype(np.uint16)
+    frames = []
+    for weight in weights:
+        w = int(round(weight * 256))
+        if w <= 0:
+            frames.append(a)
+        elif w >= 256:
+            frames.append(b)
+        else:
+            frames.append(((a16 * (256 - w) + b16 * w + 128) >> 8).astype(np.uint8))
+    return frames
+
+
+def flow_frames(a: np.ndarray, b: np.ndarray, weights: List[float]) -> List[np.ndarray]:
+    """
+    基于 Farneback 光流的运动补偿插值：两帧分别沿光流变形到中间时刻后混合
+
+    Args:
+        a: 前一帧 RGB uint8
+        b: 后一帧 RGB uint8
+        weights: 各插值帧中后一帧的权重 0-1
+
+    Returns:
+        插值帧列表
+    """
+    import cv2
+
+    if all(w <= 0 for w in weights):
+        return [a] * len(weights)
+    gray_a = cv2.cvtColor(a, cv2.COLOR_RGB2GRAY)
+    gray_b = cv2.cvtColor(b, cv2.COLOR_RGB2GRAY)
+    flow = cv2.calcOpticalFlowFarneback(gray_a, gray_b, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+
+    height, width = gray_a.shape
+    grid_x, grid_y = np.meshgrid(np.arange(width, dtype=np.float32), np.arange(height, dtype=np.float32))
+    frames = []
+    for weight in weights:
+        if weight <= 0:
+            frames.append(a)
+            continue
+        # 中间时刻的像素来自前一帧 x - w·F 与后一帧 x + (1-w)·F
+        warped_a = cv2.remap(a, grid_x - weight * flow[..., 0], grid_y - weight * flow[..., 1],
+                             cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        warped_b = cv2.remap(b, grid_x + (1 - weight) * flow[..., 0], grid_y + (1 - weight) * flow[..., 1],
+                             cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        frames.extend(blend_frames(warped_a, warped_b, [weight]))
+    return frames
+
+
+_INTERPOLATORS = {
+    'blend': blend_frames,
+    'flow': flow_frames,
+}
+
+
+def interpolate_video(
+    input_path: str,
+    output_path: str,
+    target_fps: Optional[float] = None,
+    factor: Optional[float] = None,
+    method: str = 'blend',
+    workers: Optional[int] = None,
+    backend: str = 'auto'
+) -> Dict[str, Any]:
+    """
+    把视频插值到目标帧率（时长不变）
+
+    Args:
+        input_path: 输入视频路径
+        output_path: 输出视频路径（可以与输入相同，完成后原子替换）
+        target_fps: 目标帧率
+        factor: 插帧倍数，提供时目标帧率为原帧率乘以该倍数（优先于 target_fps）
+        method: 'blend'（线性混合，最快）或 'flow'（光流运动补偿，画质更好）
+        workers: 并行处理的线程数，默认 CPU 核数
+        backend: 视频写入后端
+
+    Returns:
+        统计信息：原帧率、输出帧率、输入/输出帧数、耗时与处理速度（帧/秒）
+    """
+    if method not in _INTERPOLATORS:
+        raise ValueError(f"不支持的插帧方式: {method}，可选: {', '.join(INTERPOLATION_METHODS)}")
+    source_fps = video_fps(input_path)
+    if source_fps <= 0:
+        raise RuntimeError(f"无法读取视频帧率: {input_path}")
+    if factor is not None:
+        if factor < 1:
+            raise ValueError(f"插帧倍数必须不小于 1，当前为 {factor}")
+        target_fps = source_fps * factor
+    if target_fps is None:
+        raise ValueError("请提供 target_fps 或 factor")
+
+    stats = {
+        'method': method,
+        'source_fps': source_fps,
+        'output_fps': target_fps,
+        'frames_in': 0,
+        'frames_out': 0,
+        'seconds': 0.0,
+        'frames_per_second': 0.0,
+        'skipped': target_fps <= source_fps
+    }
+    if stats['skipped']:
+        return stats
+
+    interpolate = _INTERPOLATORS[method]
+    ratio = source_fps / target_fps  # 每个输出帧在源视频中前进的帧数
+    started = time.perf_counter()
+    workers = workers or (os.cpu_count() or 1)
+    # 按顺序写出的待处理帧对上限，控制内存占用
+    max_pending = workers * 2
+    pending: deque = deque()
+    writer: Optional[StreamingVideoWriter] = None
+    next_output = 0  # 下一个输出帧的序号
+
+    def drain(limit: int) -> None:
+        while len(pending) > limit:
+            for frame in pending.popleft().result():
+                writer.write(frame)
+                stats['frames_out'] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            previous = None
+            for index, frame in enumerate(iter_video_frames(input_path)):
+                stats['frames_in'] += 1
+                if writer is None:
+                    writer = StreamingVideoWriter(
+                        output_path, target_fps, (frame.shape[1], frame.shape[0]), backend=backend
+                    )
+                if previous is not None:
+                    # 源位置落在 [index-1, index) 的输出帧由这一对插值得到
+                    weights = []
+                    while next_output * ratio < index:
+                        weights.append(next_output * ratio - (index - 1))
+                        next_output += 1
+                    if weights:
+                        pending.append(executor.submit(interpolate, previous, frame, weights))
+                        drain(max_pending)
+                previous = frame
+
+            if writer is None:
+                raise RuntimeError(f"视频中没有可读取的帧: {input_path}")
+            drain(0)
+            # 末尾：补足与原视频等长的帧数（保持最后一帧）
+            total = max(next_output + 1, round(stats['frames_in'] * target_fps / source_fps))
+            while next_output < total:
+                writer.write(previous)
+                stats['frames_out'] += 1
+                next_output += 1
+        writer.close()
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        if writer is not None:
+            writer.abort()
+        raise
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['frames_per_second'] = stats['frames_out'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    return stats
@@ -0,0 +1,401 @@
+"""
+任务日志
+用 SQLite 持久化记录每个远程任务的参数、提供商、任务 ID、状态与输出路径，
+进程重启后可以找回未完成的任务继续轮询和下载，而不是重新付费生成
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+
+from .tasks import ClipHandle
+
+
+# 日志中的任务状态
+PENDING = 'pending'  # 已提交，等待远程完成
+COMPLETE = 'complete'  # 远程已完成，尚未下载
+FETCHED = 'fetched'  # 已下载到输出路径
+FAILED = 'failed'  # 失败
+
+UNFINISHED = (PENDING, COMPLETE)
+
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    provider TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    cache_key TEXT,
+    video_url TEXT,
+    error TEXT,
+    owner TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (provider, task_id)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, provider, updated_at);
+"""
+
+# SQLite 单条语句的参数个数有上限，批量查询按此分块
+_QUERY_CHUNK = 500
+
+
+# 每次进程启动生成的随机标记：容器重启后主机名与 PID 往往不变（常为 PID 1），
+# 只靠主机名:PID 无法区分重启前后的进程
+_BOOT_TOKEN = uuid.uuid4().hex[:12]
+
+
+def process_owner() -> str:
+    """当前进程的标识（主机名:PID:启动标记），用于认领待恢复的任务"""
+    return f"{socket.gethostname()}:{os.getpid()}:{_BOOT_TOKEN}"
+
+
+def _owner_alive(owner: str) -> bool:
+    """
+    判断记录任务的进程是否仍在运行
+
+    只能检查本机进程；其他主机的进程一律视为存活，由心跳超时判断是否接管。
+    PID 与当前进程相同但启动标记不同（含旧版没有启动标记的记录）说明是重启前的进程，视为已退出。
+    """
+    parts = owner.split(':')
+    if len(parts) >= 3 and not parts[-2].isdigit() and parts[-1].isdigit():
+        # 旧版格式（主机名:PID），主机名中含有冒号
+        parts = [':'.join(parts[:-1]), parts[-1]]
+    elif len(parts) >= 3:
+        parts = [':'.join(parts[:-2]), parts[-2], parts[-1]]
+    if len(parts) < 2:
+        return True
+    host, pid = parts[0], parts[1]
+    if host != socket.gethostname() or not pid.isdigit() or os.name == 'nt':
+        return True
+    if int(pid) == os.getpid():
+        return owner == process_owner()
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobJournal:
+    """基于 SQLite 的任务日志（WAL 模式，可被多个进程同时读写）"""
+
+    def __init__(self, path: str):
+        """
+        打开（或创建）任务日志
+
+        Args:
+            path: SQLite 数据库文件路径
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._heartbeats: Dict[tuple, float] = {}  # (provider, task_id) -> 上次心跳时间
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version > _SCHEMA_VERSION:
+                raise RuntimeError(f"任务日志版本 {version} 高于当前支持的版本 {_SCHEMA_VERSION}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f'PRAGMA user_version={_SCHEMA_VERSION}')
+            self._conn.commit()
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def record_submit(self, handle: ClipHandle) -> None:
+        """
+        记录已提交的远程任务
+
+        Args:
+            handle: submit_clip 返回的任务句柄
+        """
+        now = time.time()
+        self._execute(
+            """
+            INSERT OR REPLACE INTO jobs
+                (provider, task_id, status, output_path, params, cache_key, owner, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                handle.provider, handle.task_id, PENDING, str(handle.output_path),
+                json.dumps(handle.params, sort_keys=True, default=str),
+                handle.cache_key, process_owner(), now, now
+            )
+        )
+
+    def record_resolved(self, handle: ClipHandle) -> None:
+        """
+        记录远程任务的结束状态（可直接作为 ClipHandle 的完成回调）
+
+        Args:
+            handle: 已结束的任务句柄
+        """
+        status = COMPLETE if handle.status == ClipHandle.COMPLETE else FAILED
+        with self._lock:
+            self._heartbeats.pop((handle.provider, handle.task_id), None)
+        self._execute(
+            """
+            UPDATE jobs SET status = ?, video_url = ?, error = ?, updated_at = ?
+            WHERE provider = ? AND task_id = ? AND status != ?
+            """,
+            (status, handle.video_url, handle.error, time.time(), handle.provider, handle.task_id, FETCHED)
+        )
+
+    def record_fetched(self, handle: ClipHandle) -> None:
+        """
+        记录视频已下载到输出路径
+
+        Args:
+            handle: 已下载的任务句柄
+        """
+        self._execute(
+            """
+            UPDATE jobs SET status = ?, output_path = ?, error = NULL, updated_at = ?
+            WHERE provider = ? AND task_id = ?
+            """,
+            (FETCHED, str(handle.output_path), time.time(), handle.provider, handle.task_id)
+        )
+
+    def record_fetch_error(self, handle: ClipHandle, error: str) -> None:
+        """
+        记录下载失败（状态保持为 complete，重启后会重新下载）
+
+        Args:
+            handle: 任务句柄
+            error: 错误信息
+        """
+        self._execute(
+            "UPDATE jobs SET error = ?, updated_at = ? WHERE provider = ? AND task_id = ?",
+            (error, time.time(), handle.provider, handle.task_id)
+        )
+
+    def heartbeat(self, handles: Iterable[ClipHandle], min_interval: float = 0.0) -> int:
+        """
+        刷新本进程仍在轮询的任务的更新时间，其他进程据此判断任务有人处理（由轮询循环调用）
+
+        Args:
+            handles: 正在轮询的任务句柄
+            min_interval: 同一任务两次心跳的最小间隔（秒），避免每次轮询都写库
+
+        Returns:
+            更新的记录数
+        """
+        now = time.time()
+        due: Dict[str, List[str]] = {}
+        with self._lock:
+            for handle in handles:
+                key = (handle.provider, handle.task_id)
+                if handle.done or now - self._heartbeats.get(key, 0.0) < min_interval:
+                    continue
+                self._heartbeats[key] = now
+                due.setdefault(handle.provider, []).append(handle.task_id)
+
+        owner = process_owner()
+        updated = 0
+        for provider, task_ids in due.items():
+            for start in range(0, len(task_ids), _QUERY_CHUNK):
+                chunk = task_ids[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                updated += self._execute(
+                    f"""
+                    UPDATE jobs SET updated_at = ?
+                    WHERE owner = ? AND provider = ? AND status = ? AND task_id IN ({placeholders})
+                    """,
+                    (now, owner, provider, PENDING, *chunk)
+                )
+        return updated
+
+    def get(self, provider: str, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询单个任务
+
+        Args:
+            provider: API 提供商
+            task_id: 远程任务 ID
+
+        Returns:
+            任务记录，不存在时返回 None
+        """
+        rows = self._query("SELECT * FROM jobs WHERE provider = ? AND task_id = ?", (provider, task_id))
+        return self._to_dict(rows[0]) if rows else None
+
+    def statuses(self, provider: str, task_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        批量查询任务状态（按主键分块查询）
+
+        Args:
+            provider: API 提供商
+            task_ids: 远程任务 ID 列表
+
+        Returns:
+            任务 ID 到状态的映射，不存在的任务不出现在结果中
+        """
+        task_ids = list(task_ids)
+        result: Dict[str, str] = {}
+        for start in range(0, len(task_ids), _QUERY_CHUNK):
+            chunk = task_ids[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._query(
+                f"SELECT task_id, status FROM jobs WHERE provider = ? AND task_id IN ({placeholders})",
+                (provider, *chunk)
+            )
+            result.update((row['task_id'], row['status']) for row in rows)
+        return result
+
+    def count_by_status(self, provider: Optional[str] = None) -> Dict[str, int]:
+        """
+        按状态统计任务数量
+
+        Args:
+            provider: 只统计该提供商，None 表示全部
+
+        Returns:
+            状态到数量的映射
+        """
+        if provider is None:
+            rows = self._query("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        else:
+            rows = self._query(
+                "SELECT status, COUNT(*) AS n FROM jobs WHERE provider = ? GROUP BY status",
+                (provider,)
+            )
+        return {row['status']: row['n'] for row in rows}
+
+    def list_jobs(
+        self,
+        status: str,
+        provider: Optional[str] = None,
+        limit: int = 100,
+        updated_after: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        按状态分页列出任务（按更新时间升序，使用上一页最后一条的 updated_at 翻页）
+
+        Args:
+            status: 任务状态
+            provider: 只列出该提供商，None 表示全部
+            limit: 每页数量
+            updated_after: 只返回更新时间晚于该值的任务
+
+        Returns:
+            任务记录列表
+        """
+        sql = "SELECT * FROM jobs WHERE status = ?"
+        params: List[Any] = [status]
+        if provider is not None:
+            sql += " AND provider = ?"
+            params.append(provider)
+        sql += " AND updated_at > ? ORDER BY updated_at LIMIT ?"
+        params.extend([updated_after, limit])
+        return [self._to_dict(row) for row in self._query(sql, params)]
+
+    def claim_unfinished(self, provider: str, stale_after: float = 300) -> List[Dict[str, Any]]:
+        """
+        认领需要恢复的未完成任务
+
+        记录者进程已退出、或超过 stale_after 秒没有心跳的任务会被当前进程接管；
+        认领使用比较并交换，多个进程同时恢复时每个任务只会被一个进程接管。
+
+        Args:
+            provider: API 提供商
+            stale_after: 任务记录多久没有心跳后视为无人处理（秒）
+
+        Returns:
+            本进程认领到的任务记录
+        """
+        owner = process_owner()
+        now = time.time()
+        claimed = []
+        for status in UNFINISHED:
+            for row in self._query(
+                "SELECT * FROM jobs WHERE status = ? AND provider = ?", (status, provider)
+            ):
+                previous = row['owner']
+                if previous == owner:
+                    continue
+                if previous and _owner_alive(previous) and now - row['updated_at'] < stale_after:
+                    continue
+                updated = self._execute(
+                    """
+                    UPDATE jobs SET owner = ?, updated_at = ?
+                    WHERE provider = ? AND task_id = ? AND owner IS ? AND status = ?
+                    """,
+                    (owner, now, provider, row['task_id'], previous, status)
+                )
+                if updated:
+                    claimed.append(self._to_dict(row))
+        return claimed
+
+    def prune(self, older_than: float, statuses: Iterable[str] = (FETCHED, FAILED)) -> int:
+        """
+        删除已结束且超过指定时间未更新的任务记录
+
+        Args:
+            older_than: 保留时间（秒）
+            statuses: 要清理的状态
+
+        Returns:
+            删除的记录数
+        """
+        statuses = list(statuses)
+        placeholders = ','.join('?' * len(statuses))
+        return self._execute(
+            f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+            (*statuses, time.time() - older_than)
+        )
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+_journals: Dict[str, JobJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_job_journal(path: str) -> JobJournal:
+    """
+    获取进程内共享的任务日志实例
+
+    Args:
+        path: SQLite 数据库文件路径
+
+    Returns:
+        JobJournal 实例
+    """
+    key = str(Path(path).resolve())
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            journal = JobJournal(key)
+            _journals[key] = journal
+        return journal
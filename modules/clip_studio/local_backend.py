@@ -0,0 +1,255 @@
+"""
+本地推理后端
+在进程内运行 StableVideoDiffusionPipeline，免去网络排队与按次 API 费用
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union, Iterator
+
+from PIL import Image
+
+from .video_writer import StreamingVideoWriter
+
+
+# 显存/内存模式
+MEMORY_MODES = ('full', 'model_offload', 'sequential_offload')
+
+
+def resolve_memory_mode(memory_mode: str, device: str) -> str:
+    """
+    解析内存模式，'auto' 在 CUDA 上使用模型级 CPU 卸载，在 CPU 上全部常驻
+
+    Args:
+        memory_mode: 'auto'、'full'、'model_offload' 或 'sequential_offload'
+        device: 推理设备
+
+    Returns:
+        实际使用的内存模式
+    """
+    if memory_mode == 'auto':
+        return 'model_offload' if device == 'cuda' else 'full'
+    if memory_mode not in MEMORY_MODES:
+        available = ', '.join(('auto',) + MEMORY_MODES)
+        raise ValueError(f"不支持的内存模式 '{memory_mode}'。可用模式: {available}")
+    if memory_mode != 'full' and device == 'cpu':
+        raise ValueError(f"内存模式 '{memory_mode}' 需要 GPU 设备，CPU 推理请使用 'full'")
+    return memory_mode
+
+
+def apply_memory_mode(
+    pipe,
+    memory_mode: str,
+    device: str,
+    attention_slicing: Union[None, str, int] = None,
+    channels_last: bool = False
+):
+    """
+    按内存模式放置 pipeline 并应用省内存/提速选项
+
+    Args:
+        pipe: StableVideoDiffusionPipeline 实例
+        memory_mode: 已解析的内存模式
+        device: 推理设备
+        attention_slicing: 注意力切片大小（'auto'、'max' 或整数），None 表示关闭
+        channels_last: UNet 是否使用 channels_last 内存布局
+
+    Returns:
+        处理后的 pipeline
+    """
+    if channels_last:
+        import torch
+        # 时序 UNet 中含有 5 维权重，只对 2D 卷积切换内存布局
+        for module in pipe.unet.modules():
+            if isinstance(module, torch.nn.Conv2d):
+                module.to(memory_format=torch.channels_last)
+
+    if memory_mode == 'model_offload':
+        pipe.enable_model_cpu_offload()
+    elif memory_mode == 'sequential_offload':
+        pipe.enable_sequential_cpu_offload()
+    else:
+        pipe = pipe.to(device)
+
+    if attention_slicing is not None:
+        pipe.enable_attention_slicing(attention_slicing)
+    return pipe
+
+
+def current_rss() -> Optional[int]:
+    """
+    当前进程常驻内存（字节），无法获取时返回 None
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+class MemorySampler:
+    """后台线程定期采样常驻内存，记录推理期间的峰值"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak_rss = current_rss()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is not None and (self.peak_rss is None or rss > self.peak_rss):
+            self.peak_rss = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> 'MemorySampler':
+        self._thread = threading.Thread(target=self._run, name='clip-memory-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def iter_decoded_frames(pipe, latents, decode_chunk_size: int) -> Iterator:
+    """
+    分块解码潜变量，逐帧产出 RGB uint8 数组
+
+    与 pipeline 内置的 decode_latents 相同的解码方式，但每次只在内存中保留一个块的帧。
+
+    Args:
+        pipe: StableVideoDiffusionPipeline 实例
+        latents: output_type='latent' 返回的潜变量 [batch, frames, channels, h, w]
+        decode_chunk_size: 每次解码的帧数
+
+    Returns:
+        逐帧产出 (高, 宽, 3) 的 numpy 数组
+    """
+    import inspect
+    import torch
+
+    vae = pipe.vae
+    latents = latents[0] / vae.config.scaling_factor
+    accepts_num_frames = 'num_frames' in inspect.signature(vae.forward).parameters
+
+    with torch.no_grad():
+        for start in range(0, latents.shape[0], decode_chunk_size):
+            chunk = latents[start:start + decode_chunk_size].to(device=pipe._execution_device, dtype=vae.dtype)
+            decode_kwargs = {'num_frames': chunk.shape[0]} if accepts_num_frames else {}
+            decoded = vae.decode(chunk, **decode_kwargs).sample
+            decoded = (decoded.float() / 2 + 0.5).clamp(0, 1)
+            decoded = (decoded * 255).round().to(torch.uint8).permute(0, 2, 3, 1).cpu().numpy()
+            del chunk
+            for frame in decoded:
+                yield frame
+
+
+def run_local_inference(
+    pipe,
+    image: Image.Image,
+    output_path: Path,
+    num_frames: int,
+    num_inference_steps: int,
+    motion_bucket_id: int,
+    noise_aug_strength: float,
+    seed: int,
+    fps: int,
+    decode_chunk_size: Optional[int] = None,
+    video_writer: str = 'auto'
+) -> Dict[str, Any]:
+    """
+    使用已加载的 SVD pipeline 生成视频并写入 output_path
+
+    Args:
+        pipe: StableVideoDiffusionPipeline 实例
+        image: 预处理后的输入图片（尺寸即输出尺寸）
+        output_path: 输出视频路径
+        num_frames: 生成帧数
+        num_inference_steps: 推理步数
+        motion_bucket_id: 运动强度
+        noise_aug_strength: 噪声增强强度
+        seed: 随机种子
+        fps: 输出视频帧率
+        decode_chunk_size: VAE 每次解码的帧数，越小越省内存，默认 8
+        video_writer: 视频写入后端，'auto'、'opencv' 或 'ffmpeg'
+
+    Returns:
+        推理统计：output_path、每步耗时 step_seconds（从第二步起）、
+        第一步耗时 first_step_seconds（含图片编码与条件计算）、总耗时 total_seconds、
+        峰值常驻内存 peak_rss_bytes、峰值显存 peak_cuda_allocated_bytes
+    """
+    import torch
+
+    width, height = image.size
+    # 使用 CPU 随机数生成器，保证同一 seed 在不同设备上结果一致
+    generator = torch.Generator(device='cpu').manual_seed(seed)
+
+    use_cuda = torch.cuda.is_available()
+    if use_cuda:
+        torch.cuda.reset_peak_memory_stats()
+
+    # 只记录每步结束的时刻：第一次回调之前还包含图片编码与条件计算，不计入每步耗时
+    step_ends: List[float] = []
+
+    def on_step_end(pipeline, step, timestep, callback_kwargs):
+        step_ends.append(time.perf_counter())
+        return callback_kwargs
+
+    # fp16 的 VAE 配置了 force_upcast 时，pipeline 编码输入图片前会把 VAE 升到 fp32，
+    # 部分 diffusers 版本只在非 latent 输出时转回，出错时也不会转回；pipeline 在进程内共享，这里总是恢复原精度
+    vae_dtype = pipe.vae.dtype
+
+    def restore_vae_dtype():
+        if pipe.vae.dtype != vae_dtype:
+            pipe.vae.to(dtype=vae_dtype)
+
+    started = time.perf_counter()
+    try:
+        with MemorySampler() as sampler:
+            # 只做去噪，解码由下面分块进行，解码出的帧直接送入编码线程
+            latents = pipe(
+                image,
+                height=height,
+                width=width,
+                num_frames=num_frames,
+                num_inference_steps=num_inference_steps,
+                motion_bucket_id=motion_bucket_id,
+                noise_aug_strength=noise_aug_strength,
+                generator=generator,
+                output_type='latent',
+                callback_on_step_end=on_step_end
+            ).frames
+            denoise_seconds = time.perf_counter() - started
+            # 与内置解码一致：以原精度解码
+            restore_vae_dtype()
+
+            # 写入器先写临时文件，成功后原子重命名，避免中断时留下不完整的视频
+            with StreamingVideoWriter(output_path, fps, (width, height), backend=video_writer) as writer:
+                writer.write_all(iter_decoded_frames(pipe, latents, decode_chunk_size or 8))
+            del latents
+    finally:
+        restore_vae_dtype()
+    total_seconds = time.perf_counter() - started
+
+    return {
+        'output_path': str(output_path),
+        'step_seconds': [end - previous for previous, end in zip(step_ends, step_ends[1:])],
+        'first_step_seconds': step_ends[0] - started if step_ends else None,
+        'denoise_seconds': denoise_seconds,
+        'decode_seconds': total_seconds - denoise_seconds,
+        'total_seconds': total_seconds,
+        'peak_rss_bytes': sampler.peak_rss,
+        'peak_cuda_allocated_bytes': torch.cuda.max_memory_allocated() if use_cuda else None
+    }
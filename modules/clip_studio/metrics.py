@@ -0,0 +1,326 @@
+"""
+耗时与计数指标
+生成流程在各阶段（加载、预处理、编码、提交、排队、生成、下载、插帧、总计）结束时上报耗时，
+并累计轮询、重试、错误次数；指标通过可插拔的回调（MetricsHook）导出，
+内置 Prometheus 文本格式与 JSON Lines 两种导出器
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable, IO, Tuple, Union
+
+
+# 生成流程的阶段
+PHASES = ('load', 'preprocess', 'encode', 'submit', 'queue', 'generation', 'download', 'interpolate', 'total')
+
+# 耗时直方图的默认分桶上界（秒），覆盖毫秒级的编码到数分钟的远程生成
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+    10.0, 20.0, 30.0, 60.0, 120.0, 300.0, 600.0, math.inf
+)
+
+Labels = Dict[str, str]
+
+
+class MetricsHook:
+    """指标回调接口，子类按需覆盖；回调在产生指标的线程中同步调用，应尽快返回"""
+
+    def on_phase(self, phase: str, seconds: float, labels: Labels) -> None:
+        """
+        某个阶段结束
+
+        Args:
+            phase: 阶段名称（见 PHASES）
+            seconds: 耗时（秒）
+            labels: 标签（至少包含 provider）
+        """
+
+    def on_counter(self, name: str, amount: float, labels: Labels) -> None:
+        """
+        计数器增加
+
+        Args:
+            name: 计数器名称（如 polls、retries、errors、download_bytes）
+            amount: 增量
+            labels: 标签（至少包含 provider）
+        """
+
+    def on_clip(self, record: Dict[str, Any]) -> None:
+        """
+        一个片段结束（下载完成或失败），record 包含该片段各阶段耗时与结果
+
+        Args:
+            record: 片段记录
+        """
+
+
+class Metrics:
+    """把指标分发给已注册的回调；没有回调时所有调用直接返回"""
+
+    def __init__(self, hooks: Optional[Iterable[MetricsHook]] = None):
+        """
+        Args:
+            hooks: 初始回调列表
+        """
+        self._hooks: Tuple[MetricsHook, ...] = tuple(hooks or ())
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """是否注册了回调"""
+        return bool(self._hooks)
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        """注册回调"""
+        with self._lock:
+            self._hooks = self._hooks + (hook,)
+
+    def remove_hook(self, hook: MetricsHook) -> None:
+        """移除回调"""
+        with self._lock:
+            self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    def _dispatch(self, method: str, *args) -> None:
+        for hook in self._hooks:
+            try:
+                getattr(hook, method)(*args)
+            except Exception as e:
+                # 指标回调出错不能影响生成流程
+                print(f"指标回调 {type(hook).__name__}.{method} 出错: {str(e)}")
+
+    def phase(self, phase: str, seconds: float, **labels: str) -> None:
+        """上报阶段耗时"""
+        if self._hooks:
+            self._dispatch('on_phase', phase, seconds, labels)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """累加计数器"""
+        if self._hooks:
+            self._dispatch('on_counter', name, amount, labels)
+
+    def clip(self, record: Dict[str, Any]) -> None:
+        """上报片段记录，并把其中的各阶段耗时作为 phase 指标上报"""
+        if not self._hooks:
+            return
+        labels = {'provider': record['provider']}
+        for phase, seconds in record['phases'].items():
+            self._dispatch('on_phase', phase, seconds, labels)
+        self._dispatch('on_clip', record)
+
+
+class LatencyHistogram:
+    """固定分桶的耗时直方图，可估算分位数"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            buckets: 递增的分桶上界，最后一个应为 inf
+        """
+        self.buckets = tuple(buckets)
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """记录一个样本（调用方负责加锁）"""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        按分桶线性插值估算分位数（与 Prometheus histogram_quantile 的算法一致）
+
+        Args:
+            q: 分位数，0-1
+
+        Returns:
+            估算值（秒），没有样本时返回 None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for bound, n in zip(self.buckets, self.counts):
+            if n and cumulative + n >= rank:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / n
+            cumulative += n
+            if bound != math.inf:
+                lower = bound
+        return lower
+
+
+def _label_key(labels: Labels) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(items: Iterable[Tuple[str, str]]) -> str:
+    pairs = []
+    for key, value in items:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+class PrometheusExporter(MetricsHook):
+    """在内存中聚合指标，按 Prometheus 文本格式输出"""
+
+    def __init__(self, namespace: str = 'clip_studio', buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Args:
+            namespace: 指标名前缀
+            buckets: 阶段耗时直方图的分桶上界（秒）
+        """
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._phases: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], LatencyHistogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def on_phase(self, phase: str, seconds: float, labels: Labels) -> None:
+        key = (phase, _label_key(labels))
+        with self._lock:
+            histogram = self._phases.get(key)
+            if histogram is None:
+                histogram = self._phases[key] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def on_counter(self, name: str, amount: float, labels: Labels) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def quantile(self, phase: str, q: float, provider: Optional[str] = None) -> Optional[float]:
+        """
+        估算某阶段耗时的分位数
+
+        Args:
+            phase: 阶段名称
+            q: 分位数，0-1（如 0.5、0.99）
+            provider: 只统计该提供商，None 表示合并所有提供商
+
+        Returns:
+            估算值（秒），没有样本时返回 None
+        """
+        merged = LatencyHistogram(self.buckets)
+        with self._lock:
+            for (name, labels), histogram in self._phases.items():
+                if name != phase or (provider is not None and dict(labels).get('provider') != provider):
+                    continue
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+        return merged.quantile(q)
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.99)) -> Dict[str, Dict[str, Any]]:
+        """
+        各阶段耗时摘要（样本数、平均值与分位数，合并所有提供商）
+
+        Returns:
+            阶段名称到摘要的映射
+        """
+        with self._lock:
+            phases = sorted({name for name, _ in self._phases})
+        result = {}
+        for phase in phases:
+            with self._lock:
+                histograms = [h for (name, _), h in self._phases.items() if name == phase]
+                count = sum(h.count for h in histograms)
+                total = sum(h.sum for h in histograms)
+            result[phase] = {
+                'count': count,
+                'mean': total / count if count else None,
+                **{f'p{int(q * 100)}': self.quantile(phase, q) for q in quantiles}
+            }
+        return result
+
+    def render(self) -> str:
+        """
+        输出 Prometheus 文本格式（text/plain; version=0.0.4）
+
+        Returns:
+            指标文本
+        """
+        ns = self.namespace
+        lines: List[str] = []
+        with self._lock:
+            if self._phases:
+                name = f'{ns}_phase_seconds'
+                lines.append(f'# HELP {name} Time spent in each clip generation phase.')
+                lines.append(f'# TYPE {name} histogram')
+                for (phase, labels), histogram in sorted(self._phases.items()):
+                    base = (('phase', phase),) + labels
+                    cumulative = 0
+                    for bound, n in zip(histogram.buckets, histogram.counts):
+                        cumulative += n
+                        bucket_labels = _format_labels(base + (('le', _format_bound(bound)),))
+                        lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(base)} {histogram.sum!r}')
+                    lines.append(f'{name}_count{_format_labels(base)} {histogram.count}')
+
+            for counter in sorted({counter for counter, _ in self._counters}):
+                name = f'{ns}_{counter}_total'
+                lines.append(f'# TYPE {name} counter')
+                for (key, labels), value in sorted(self._counters.items()):
+                    if key == counter:
+                        lines.append(f'{name}{_format_labels(labels)} {value!r}')
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def write(self, path: Union[str, Path]) -> None:
+        """
+        原子地写入文本文件（可供 node_exporter 的 textfile collector 采集）
+
+        Args:
+            path: 输出文件路径
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        temp_path.write_text(self.render(), encoding='utf-8')
+        os.replace(temp_path, path)
+
+
+class JsonLinesExporter(MetricsHook):
+    """每个片段结束时写一行 JSON（包含各阶段耗时、轮询次数与结果），便于离线计算分位数"""
+
+    def __init__(self, path_or_stream: Union[str, Path, IO[str]]):
+        """
+        Args:
+            path_or_stream: 输出文件路径（追加写入）或文本流
+        """
+        if isinstance(path_or_stream, (str, Path)):
+            path = Path(path_or_stream)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._stream = open(path, 'a', encoding='utf-8')
+            self._owns_stream = True
+        else:
+            self._stream = path_or_stream
+            self._owns_stream = False
+        self._lock = threading.Lock()
+
+    def on_clip(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stream.write(line + '\n')
+            self._stream.flush()
+
+    def close(self) -> None:
+        """关闭输出文件（传入的文本流不会被关闭）"""
+        with self._lock:
+            if self._owns_stream and not self._stream.closed:
+                self._stream.close()
@@ -72,3 +72,42 @@ class UpdateScriptInput(BaseModel):
     title: Optional[str] = Field(None, description="剧本标题")
     author: Optional[str] = Field(None, description="作者")
     scenes: Optional[List[Scene]] = Field(None, description="场景数组")
+
+
+class ClipResult(BaseModel):
+    """单个场景视频片段的生成结果"""
+    
+    scene_number: int = Field(..., description="场景编号")
+    output_path: Optional[str] = Field(None, description="输出视频路径（失败时为空）")
+    error: Optional[str] = Field(None, description="错误信息（成功时为空）")
+    elapsed_seconds: float = Field(0.0, ge=0, description="从提交到完成的耗时（秒）")
+    
+    @property
+    def success(self) -> bool:
+        """是否生成成功"""
+        return self.error is None and self.output_path is not None
+
+
+class AssemblyResult(BaseModel):
+    """剧集拼接结果"""
+    
+    output_path: str = Field(..., description="成片路径")
+    duration: float = Field(0.0, ge=0, description="成片时长（秒）")
+    copied: List[int] = Field(default_factory=list, description="直接流复制的场景编号")
+    trimmed: List[int] = Field(default_factory=list, description="流复制并截断到场景时长的场景编号")
+    reencoded: List[int] = Field(default_factory=list, description="重新编码的场景编号")
+    elapsed_seconds: float = Field(0.0, ge=0, description="拼接总耗时（秒）")
+
+
+class MotionTemplate(BaseModel):
+    """动效模板（motion_config.json 中的一项）"""
+    
+    motion_bucket_id: int = Field(..., ge=0, le=255, description="运动强度")
+    noise_aug_strength: float = Field(0.05, ge=0, le=1, description="噪声增强强度")
+    description: Optional[str] = Field(None, description="模板说明")
+    aliases: List[str] = Field(default_factory=list, description="模板别名（查找时不区分大小写）")
+    
+    class Config:
+        frozen = True
+        # 保留未知字段（注释、界面元数据、旧版本的字段等），已有的配置文件照常加载
+        extra = 'allow'
@@ -0,0 +1,202 @@
+"""
+动效模板注册表
+进程内共享，每个配置文件只解析一次，文件修改（mtime/大小变化）后自动重新加载；
+模板经过结构校验后以只读映射保存，查找无需复制，支持别名与不区分大小写的名称
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple
+
+from pydantic import ValidationError
+
+from .models import MotionTemplate
+
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / 'motion_config.json'
+
+# 配置文件不存在时使用的默认模板
+DEFAULT_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "High Action": {
+        "motion_bucket_id": 127,
+        "noise_aug_strength": 0.1
+    },
+    "Cinematic Slow": {
+        "motion_bucket_id": 20,
+        "noise_aug_strength": 0.02
+    }
+}
+
+
+def _normalize(name: str) -> str:
+    return ' '.join(name.split()).casefold()
+
+
+class TemplateSnapshot:
+    """某一时刻的模板集合（不可变）"""
+
+    def __init__(self, raw: Dict[str, Any]):
+        """
+        Args:
+            raw: 配置文件解析出的原始字典
+
+        Raises:
+            ValueError: 模板结构不合法或名称/别名冲突
+        """
+        if not isinstance(raw, dict):
+            raise ValueError("动效配置文件格式错误: 顶层必须是以模板名称为键的对象")
+
+        templates: Dict[str, Mapping[str, Any]] = {}
+        index: Dict[str, str] = {}
+        for name, value in raw.items():
+            try:
+                template = MotionTemplate.model_validate(value)
+            except ValidationError as e:
+                raise ValueError(f"动效模板 '{name}' 格式错误: {str(e)}")
+
+            data = template.model_dump(exclude_none=True)
+            if not data['aliases']:
+                del data['aliases']
+            else:
+                data['aliases'] = tuple(data['aliases'])
+            templates[name] = MappingProxyType(data)
+
+            for key in (name, *template.aliases):
+                normalized = _normalize(key)
+                if index.get(normalized, name) != name:
+                    raise ValueError(f"动效模板名称或别名 '{key}' 与模板 '{index[normalized]}' 冲突")
+                index[normalized] = name
+
+        self.templates: Mapping[str, Mapping[str, Any]] = MappingProxyType(templates)
+        self.index: Mapping[str, str] = MappingProxyType(index)
+
+    def resolve_name(self, template_name: str) -> str:
+        if template_name in self.templates:
+            return template_name
+        name = self.index.get(_normalize(template_name))
+        if name is None:
+            available = ', '.join(self.templates.keys())
+            raise ValueError(
+                f"动效模板 '{template_name}' 不存在。可用模板: {available}"
+            )
+        return name
+
+
+class MotionTemplateRegistry:
+    """动效模板注册表，读取无锁，重新加载时整体替换快照"""
+
+    def __init__(self, config_path: Optional[str] = None, check_interval: float = 1.0):
+        """
+        Args:
+            config_path: 配置文件路径，默认使用模块目录下的 motion_config.json
+            check_interval: 检查文件是否变化的最小间隔（秒），0 表示每次查找都检查
+        """
+        self.config_path = Path(config_path) if config_path is not None else DEFAULT_CONFIG_PATH
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        # 配置文件的 (mtime_ns, size)，文件不存在时为 None；首次加载失败直接抛出异常
+        self._seen_signature = self._signature()
+        self._snapshot = self._load(self._seen_signature)
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature: Optional[Tuple[int, int]]) -> TemplateSnapshot:
+        if signature is None:
+            return TemplateSnapshot(DEFAULT_TEMPLATES)
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"动效配置文件格式错误: {str(e)}")
+        except Exception as e:
+            raise RuntimeError(f"加载动效配置文件失败: {str(e)}")
+        return TemplateSnapshot(raw)
+
+    def _current(self) -> TemplateSnapshot:
+        """返回当前快照，必要时检查文件并重新加载"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            self._checked_at = now
+            signature = self._signature()
+            if signature != self._seen_signature:
+                self._seen_signature = signature
+                try:
+                    self._snapshot = self._load(signature)
+                    self.reloads += 1
+                except (ValueError, RuntimeError) as e:
+                    # 文件被改坏时继续使用上一次有效的模板
+                    print(f"动效配置重新加载失败，继续使用原有模板: {str(e)}")
+            return self._snapshot
+
+    def resolve_name(self, template_name: str) -> str:
+        """
+        将名称或别名（不区分大小写）解析为模板的规范名称
+
+        Args:
+            template_name: 模板名称或别名
+
+        Returns:
+            规范名称
+
+        Raises:
+            ValueError: 模板不存在
+        """
+        return self._current().resolve_name(template_name)
+
+    def get(self, template_name: str) -> Mapping[str, Any]:
+        """
+        获取模板（只读映射，不复制）
+
+        Args:
+            template_name: 模板名称或别名
+
+        Returns:
+            模板配置
+        """
+        snapshot = self._current()
+        return snapshot.templates[snapshot.resolve_name(template_name)]
+
+    @property
+    def templates(self) -> Mapping[str, Mapping[str, Any]]:
+        """所有模板（只读映射）"""
+        return self._current().templates
+
+
+_registries: Dict[str, MotionTemplateRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_motion_template_registry(config_path: Optional[str] = None) -> MotionTemplateRegistry:
+    """
+    获取进程内共享的动效模板注册表（每个配置文件一个实例）
+
+    Args:
+        config_path: 配置文件路径，None 表示默认路径
+
+    Returns:
+        MotionTemplateRegistry 实例
+    """
+    path = Path(config_path) if config_path is not None else DEFAULT_CONFIG_PATH
+    key = str(path.resolve())
+    registry = _registries.get(key)
+    if registry is None:
+        with _registries_lock:
+            registry = _registries.get(key)
+            if registry is None:
+                registry = MotionTemplateRegistry(path)
+                _registries[key] = registry
+    return registry
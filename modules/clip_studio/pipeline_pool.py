@@ -0,0 +1,217 @@
+"""
+进程级模型注册表
+按 (model_path, device, dtype, variant, 内存选项) 共享已加载的 SVD pipeline，
+首次使用时加载一次，引用计数归零且空闲超时后释放
+"""
+
+import gc
+import sys
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Tuple
+
+from .scheduler import get_timer_scheduler
+
+
+# (model_path, device, dtype, variant, 内存选项)
+PipelineKey = Tuple[str, str, str, Optional[str], str]
+
+
+class PooledPipeline:
+    """注册表中的一个 pipeline 条目"""
+
+    def __init__(self, key: PipelineKey):
+        self.key = key
+        self.pipe = None
+        self.refcount = 0
+        self.acquires = 0
+        self.pinned = False
+        self.load_seconds: Optional[float] = None
+        self.last_used = time.monotonic()
+        # pipeline 内部状态（如 scheduler）不是线程安全的，推理时需持有该锁
+        self.lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._load_error: Optional[BaseException] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'loaded': self.pipe is not None,
+            'refcount': self.refcount,
+            'acquires': self.acquires,
+            'pinned': self.pinned,
+            'load_seconds': self.load_seconds,
+            'idle_seconds': time.monotonic() - self.last_used if self.refcount == 0 else 0.0
+        }
+
+
+class PipelineRegistry:
+    """进程内共享的 pipeline 注册表"""
+
+    def __init__(self, idle_timeout: float = 600):
+        """
+        Args:
+            idle_timeout: 引用计数归零后保留的时间（秒），超时后释放
+        """
+        self.idle_timeout = idle_timeout
+        self.loads = 0
+        self.evictions = 0
+        self.total_load_seconds = 0.0
+        self._entries: Dict[PipelineKey, PooledPipeline] = {}
+        self._lock = threading.Lock()
+        self._timer_pending = False  # 是否已在共享定时器中安排了淘汰检查
+
+    def acquire(self, key: PipelineKey, loader: Callable[[], Any]) -> PooledPipeline:
+        """
+        获取 pipeline（未加载时调用 loader 加载一次），引用计数加一
+
+        并发获取同一个 key 时只有一个线程执行加载，其余线程等待复用结果。
+
+        Args:
+            key: (model_path, device, dtype, variant, 内存选项)
+            loader: 无参加载函数，返回 pipeline 实例
+
+        Returns:
+            PooledPipeline 条目，使用完毕后需调用 release
+        """
+        self.evict_idle()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = PooledPipeline(key)
+                self._entries[key] = entry
+            entry.refcount += 1
+            entry.acquires += 1
+
+        try:
+            with entry._load_lock:
+                if entry.pipe is None:
+                    started = time.perf_counter()
+                    entry.pipe = loader()
+                    entry.load_seconds = time.perf_counter() - started
+                    with self._lock:
+                        self.loads += 1
+                        self.total_load_seconds += entry.load_seconds
+        except BaseException:
+            self.release(key)
+            raise
+
+        return entry
+
+    def release(self, key: PipelineKey) -> None:
+        """
+        释放一次引用
+
+        引用计数归零后在共享定时器中安排淘汰检查，不再使用模型的进程也能按时释放显存。
+
+        Args:
+            key: (model_path, device, dtype, variant, 内存选项)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refcount = max(0, entry.refcount - 1)
+            entry.last_used = time.monotonic()
+            idle = entry.refcount == 0 and not entry.pinned
+        self.evict_idle()
+        if idle:
+            self._schedule_eviction()
+
+    def _schedule_eviction(self) -> None:
+        """为最早到期的空闲条目安排一次淘汰检查（同一时刻最多只有一个待触发的检查）"""
+        with self._lock:
+            if self._timer_pending:
+                return
+            deadlines = [
+                entry.last_used + self.idle_timeout for entry in self._entries.values()
+                if entry.refcount == 0 and not entry.pinned
+            ]
+            if not deadlines:
+                return
+            self._timer_pending = True
+        get_timer_scheduler().schedule(min(deadlines), self._on_eviction_timer)
+
+    def _on_eviction_timer(self) -> None:
+        """定时器回调：淘汰到期条目，并为剩余的空闲条目安排下一次检查"""
+        with self._lock:
+            self._timer_pending = False
+        self.evict_idle()
+        self._schedule_eviction()
+
+    def warmup(self, key: PipelineKey, loader: Callable[[], Any], pin: bool = False) -> PooledPipeline:
+        """
+        服务启动时预先加载 pipeline
+
+        Args:
+            key: (model_path, device, dtype, variant, 内存选项)
+            loader: 无参加载函数
+            pin: 是否常驻（不参与空闲淘汰）
+
+        Returns:
+            PooledPipeline 条目
+        """
+        entry = self.acquire(key, loader)
+        entry.pinned = entry.pinned or pin
+        self.release(key)
+        return entry
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        释放引用计数为零且空闲超时的 pipeline
+
+        Args:
+            now: 当前时间（time.monotonic），默认取当前值
+
+        Returns:
+            本次释放的数量
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [
+                key for key, entry in self._entries.items()
+                if entry.refcount == 0 and not entry.pinned
+                and now - entry.last_used >= self.idle_timeout
+            ]
+            for key in expired:
+                del self._entries[key]
+            self.evictions += len(expired)
+
+        if expired:
+            gc.collect()
+            # 已加载过 pipeline 的进程必然已导入 torch；未导入时无需（也不应在定时线程中）导入
+            torch = sys.modules.get('torch')
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        """注册表统计信息（加载次数、冷启动耗时、每个条目的引用计数等）"""
+        with self._lock:
+            return {
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'total_load_seconds': self.total_load_seconds,
+                'entries': {
+                    '|'.join(str(part) for part in key): entry.stats()
+                    for key, entry in self._entries.items()
+                }
+            }
+
+
+_registry: Optional[PipelineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_pipeline_registry() -> PipelineRegistry:
+    """
+    获取进程级 pipeline 注册表
+
+    Returns:
+        PipelineRegistry 单例
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PipelineRegistry()
+    return _registry
@@ -0,0 +1,200 @@
+"""
+轮询策略
+决定每次查询任务状态之间的等待时间，可替换
+"""
+
+from abc import ABC, abstractmethod
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Union
+import random
+import time
+
+
+class PollingStrategy(ABC):
+    """轮询策略基类，每个任务持有一个独立实例"""
+
+    def __init__(self):
+        self.polls = 0  # 已执行的轮询次数，便于调优
+
+    @abstractmethod
+    def first_delay(self) -> float:
+        """
+        提交后到第一次查询的等待时间
+
+        Returns:
+            等待秒数
+        """
+        pass
+
+    @abstractmethod
+    def _delay_after(self, status: Dict[str, Any]) -> float:
+        """根据本次查询结果计算下一次等待时间"""
+        pass
+
+    def next_delay(self, status: Optional[Dict[str, Any]] = None) -> float:
+        """
+        记录一次轮询并返回下一次查询前的等待时间
+
+        服务端给出的 retry_after 优先于策略自身的计算结果。
+
+        Args:
+            status: 本次查询返回的状态信息
+
+        Returns:
+            等待秒数
+        """
+        self.polls += 1
+        status = status or {}
+        retry_after = parse_retry_after(status.get('retry_after'))
+        if retry_after is not None:
+            return retry_after
+        return self._delay_after(status)
+
+
+class FixedIntervalPolling(PollingStrategy):
+    """固定间隔轮询（原有行为）"""
+
+    def __init__(self, interval: float = 3.0):
+        """
+        Args:
+            interval: 轮询间隔（秒）
+        """
+        super().__init__()
+        self.interval = interval
+
+    def first_delay(self) -> float:
+        return self.interval
+
+    def _delay_after(self, status: Dict[str, Any]) -> float:
+        return self.interval
+
+
+class BackoffPolling(PollingStrategy):
+    """指数退避 + 抖动轮询，支持预计耗时提示与排队位置"""
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_interval: float = 15.0,
+        factor: float = 1.5,
+        jitter: float = 0.2,
+        expected_duration: Optional[float] = None,
+        seconds_per_queue_position: float = 2.0
+    ):
+        """
+        Args:
+            initial_delay: 初始等待时间（秒）
+            max_interval: 最大轮询间隔（秒）
+            factor: 退避倍数
+            jitter: 抖动比例，0.2 表示 ±20%
+            expected_duration: 预计任务耗时（秒），提供时第一次查询推迟到接近完成时
+            seconds_per_queue_position: 排队中每个位置对应的等待时间（秒）
+        """
+        super().__init__()
+        self.initial_delay = initial_delay
+        self.max_interval = max_interval
+        self.factor = factor
+        self.jitter = jitter
+        self.expected_duration = expected_duration
+        self.seconds_per_queue_position = seconds_per_queue_position
+
+    def _jittered(self, delay: float) -> float:
+        if self.jitter <= 0:
+            return delay
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def first_delay(self) -> float:
+        if self.expected_duration:
+            # 在预计完成时间的 80% 处第一次查询，之后进入退避
+            return max(self.initial_delay, self._jittered(self.expected_duration * 0.8))
+        return self._jittered(self.initial_delay)
+
+    def _delay_after(self, status: Dict[str, Any]) -> float:
+        queue_position = status.get('queue_position', status.get('queuePosition'))
+        if isinstance(queue_position, (int, float)) and queue_position > 0:
+            delay = min(self.max_interval, queue_position * self.seconds_per_queue_position)
+            return self._jittered(max(self.initial_delay, delay))
+
+        delay = min(self.max_interval, self.initial_delay * self.factor ** self.polls)
+        return self._jittered(delay)
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """
+    解析 Retry-After 值（秒数或 HTTP 日期）
+
+    Args:
+        value: 响应头或状态字段中的原始值
+
+    Returns:
+        等待秒数，无法解析时返回 None
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def estimate_expected_duration(
+    steps: int,
+    num_frames: int,
+    seconds_per_frame_step: Optional[float]
+) -> Optional[float]:
+    """
+    根据推理步数与帧数估算任务耗时
+
+    Args:
+        steps: 推理步数
+        num_frames: 帧数
+        seconds_per_frame_step: 每帧每步的耗时（秒），为 None 时不估算
+
+    Returns:
+        预计耗时（秒），无法估算时返回 None
+    """
+    if not seconds_per_frame_step:
+        return None
+    return steps * num_frames * seconds_per_frame_step
+
+
+PollingStrategyFactory = Callable[[Optional[float]], PollingStrategy]
+
+
+def create_polling_strategy(
+    config: Dict[str, Any],
+    expected_duration: Optional[float] = None
+) -> PollingStrategy:
+    """
+    根据配置创建轮询策略实例
+
+    config['polling_strategy'] 可以是 'backoff'、'fixed'，
+    或接收 expected_duration 并返回 PollingStrategy 的可调用对象。
+
+    Args:
+        config: 生成器配置字典
+        expected_duration: 预计任务耗时（秒）
+
+    Returns:
+        轮询策略实例
+    """
+    strategy: Union[str, PollingStrategyFactory] = config.get('polling_strategy', 'backoff')
+
+    if callable(strategy):
+        return strategy(expected_duration)
+    if strategy == 'fixed':
+        return FixedIntervalPolling(config.get('polling_interval', 3))
+    if strategy == 'backoff':
+        return BackoffPolling(
+            initial_delay=config.get('polling_initial_delay', 1.0),
+            max_interval=config.get('polling_max_interval', 15.0),
+            factor=config.get('polling_backoff_factor', 1.5),
+            jitter=config.get('polling_jitter', 0.2),
+            expected_duration=expected_duration
+        )
+    raise ValueError(f"不支持的轮询策略: {strategy}")
@@ -0,0 +1,247 @@
+"""
+提供商限流
+按 (提供商, API Key, 调用类型) 在进程内共享令牌桶 + 并发上限，
+遇到 429 或限流响应头时整体暂停，并记录排队深度与等待耗时
+"""
+
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Mapping, Tuple, Iterator
+
+from .polling import parse_retry_after
+
+
+class RateLimiter:
+    """令牌桶限流器，可同时限制并发数"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            rate: 每秒允许的请求数，None 表示不限速
+            burst: 令牌桶容量（允许的突发请求数），默认等于 rate
+            concurrency: 同时进行的请求数上限，None 表示不限制
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate or 1))
+        self.concurrency = concurrency
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+
+        # 统计
+        self.waiting = 0  # 当前排队等待的请求数
+        self.in_flight = 0  # 当前进行中的请求数
+        self.acquired = 0
+        self.throttled = 0  # 收到 429 的次数
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        等待直到允许发出一个请求（需与 release 配对调用）
+
+        Returns:
+            本次等待的秒数
+        """
+        started = time.monotonic()
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._blocked_until > now:
+                        timeout = self._blocked_until - now
+                    elif self.concurrency and self.in_flight >= self.concurrency:
+                        timeout = None  # 等待 release 唤醒
+                    elif self.rate and self._tokens < 1:
+                        timeout = (1 - self._tokens) / self.rate
+                    else:
+                        break
+                    self._cond.wait(timeout)
+                if self.rate:
+                    self._tokens -= 1
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+            waited = time.monotonic() - started
+            self.acquired += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    def release(self) -> None:
+        """请求结束，归还并发名额"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[float]:
+        """
+        上下文管理器形式的 acquire / release
+
+        Returns:
+            本次等待的秒数
+        """
+        waited = self.acquire()
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def penalize(self, delay: float) -> None:
+        """
+        收到 429 后暂停所有请求
+
+        Args:
+            delay: 暂停秒数
+        """
+        with self._cond:
+            now = time.monotonic()
+            self.throttled += 1
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        根据限流响应头调整：剩余额度为 0 时暂停到额度重置
+
+        支持 X-RateLimit-Remaining / X-RateLimit-Reset 与 RateLimit-Remaining / RateLimit-Reset，
+        Reset 可以是剩余秒数或 Unix 时间戳。
+
+        Args:
+            headers: 响应头
+        """
+        remaining = _header(headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            if float(remaining) > 0:
+                return
+        except ValueError:
+            return
+
+        reset = _header(headers, 'X-RateLimit-Reset', 'RateLimit-Reset')
+        try:
+            delay = float(reset) if reset is not None else 1.0
+        except ValueError:
+            return
+        if delay > 1e9:
+            delay -= time.time()
+        if delay > 0:
+            with self._cond:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """限流统计（排队深度、进行中请求数、等待耗时、429 次数等）"""
+        with self._cond:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'concurrency': self.concurrency,
+                'waiting': self.waiting,
+                'in_flight': self.in_flight,
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'total_wait_seconds': self.total_wait_seconds,
+                'avg_wait_seconds': self.total_wait_seconds / self.acquired if self.acquired else 0.0,
+                'max_wait_seconds': self.max_wait_seconds,
+                'blocked_for': max(0.0, self._blocked_until - time.monotonic())
+            }
+
+
+def _header(headers: Mapping[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def throttle_delay(headers: Mapping[str, str], attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    计算 429 之后的等待时间：优先使用 Retry-After，否则指数退避加抖动
+
+    Args:
+        headers: 429 响应头
+        attempt: 第几次重试（从 1 开始）
+        base: 退避基数（秒）
+        cap: 最长等待（秒）
+
+    Returns:
+        等待秒数
+    """
+    retry_after = parse_retry_after(headers.get('Retry-After'))
+    if retry_after is not None:
+        return min(cap, retry_after)
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(1.0, 1.5)
+
+
+LimiterKey = Tuple[str, str, str]
+
+_limiters: Dict[LimiterKey, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    api_key: Optional[str],
+    kind: str,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+    concurrency: Optional[int] = None
+) -> RateLimiter:
+    """
+    获取进程内共享的限流器（同一提供商、同一 API Key、同一调用类型共用一个）
+
+    首次创建时的参数生效，之后同一键的调用直接复用。
+
+    Args:
+        provider: API 提供商
+        api_key: API 密钥（只保存其哈希）
+        kind: 调用类型，'submit' 或 'poll'
+        rate: 每秒请求数
+        burst: 突发请求数
+        concurrency: 并发上限
+
+    Returns:
+        RateLimiter 实例
+    """
+    key_hash = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16]
+    key = (provider, key_hash, kind)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(rate, burst, concurrency)
+            _limiters[key] = limiter
+        return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    所有限流器的统计信息
+
+    Returns:
+        以 '提供商|Key 哈希|调用类型' 为键的统计字典
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {'|'.join(key): limiter.stats() for key, limiter in limiters.items()}
@@ -0,0 +1,71 @@
+"""
+进程内共享的定时器
+单个后台线程按时间触发回调（对冲检查、空闲 pipeline 淘汰等），而不是每个定时任务占用一个休眠线程
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional, List, Callable, Tuple
+
+
+class TimerScheduler:
+    """单个后台线程按时间触发回调，没有待触发的回调时线程退出"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, when: float, callback: Callable[[], None]) -> None:
+        """
+        在 time.monotonic() 到达 when 时调用 callback（在调度线程中执行，应尽快返回）
+
+        Args:
+            when: 触发时刻
+            callback: 无参回调
+        """
+        with self._cond:
+            heapq.heappush(self._heap, (when, next(self._counter), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='clip-timer', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self) -> None:
+        """调度循环，没有待触发的回调时线程退出"""
+        while True:
+            with self._cond:
+                while True:
+                    if not self._heap:
+                        self._thread = None
+                        return
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                _, _, callback = heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception as e:
+                print(f"定时任务执行失败: {str(e)}")
+
+
+_scheduler: Optional[TimerScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_timer_scheduler() -> TimerScheduler:
+    """
+    获取进程内共享的定时器
+
+    Returns:
+        TimerScheduler 实例
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = TimerScheduler()
+        return _scheduler
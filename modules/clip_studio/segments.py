@@ -0,0 +1,156 @@
+"""
+场景分段
+单次生成只有 num_frames 帧（默认 25 帧，24fps 下约 1 秒），按 Scene.duration 计算场景需要的段数；
+后一段以前一段的最后一帧作为输入图片接续生成，拼接时去掉重复的首帧并截断到场景时长
+"""
+
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+import numpy as np
+
+from .video_writer import StreamingVideoWriter
+
+
+def plan_segments(duration: float, fps: float, num_frames: int) -> List[int]:
+    """
+    计算场景需要的段数及每段保留的帧数
+
+    第一段保留全部帧；之后每段的首帧与上一段的末帧相同，只保留其余 num_frames - 1 帧。
+
+    Args:
+        duration: 场景时长（秒），0 表示只生成一段
+        fps: 帧率
+        num_frames: 每次生成的帧数
+
+    Returns:
+        每段保留的帧数列表，总和等于场景时长对应的帧数
+    """
+    if num_frames < 2:
+        raise ValueError(f"分段生成要求 num_frames 至少为 2，当前为 {num_frames}")
+    total = round(duration * fps)
+    if total <= num_frames:
+        return [max(1, total) if duration > 0 else num_frames]
+
+    step = num_frames - 1
+    extra = math.ceil((total - num_frames) / step)
+    segments = [num_frames] + [step] * extra
+    segments[-1] -= sum(segments) - total
+    return segments
+
+
+def chain_key(image_bytes: bytes, params: Dict[str, Any]) -> str:
+    """
+    分段链的标识（输入图片与生成参数的哈希），用于命名各段的中间文件，重试时复用已完成的段
+
+    Args:
+        image_bytes: 场景首段的输入图片
+        params: 影响生成结果的参数
+
+    Returns:
+        十六进制哈希
+    """
+    digest = hashlib.sha256(image_bytes)
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def iter_video_frames(path: str) -> Iterator[np.ndarray]:
+    """
+    逐帧读取视频
+
+    Args:
+        path: 视频路径
+
+    Returns:
+        RGB uint8 数组 (高, 宽, 3) 的迭代器
+    """
+    try:
+        import cv2
+    except ImportError:
+        raise ImportError("分段生成需要 OpenCV 读取视频: pip install opencv-python")
+
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        raise RuntimeError(f"无法打开视频文件: {path}")
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    finally:
+        capture.release()
+
+
+def last_frame(path: str) -> np.ndarray:
+    """
+    读取视频的最后一帧（顺序解码，片段只有几十帧）
+
+    Args:
+        path: 视频路径
+
+    Returns:
+        RGB uint8 数组
+    """
+    frame = None
+    for frame in iter_video_frames(path):
+        pass
+    if frame is None:
+        raise RuntimeError(f"视频中没有可读取的帧: {path}")
+    return frame
+
+
+def join_segments(
+    paths: List[str],
+    keep: List[int],
+    output_path: str,
+    fps: float,
+    backend: str = 'auto'
+) -> Tuple[int, float]:
+    """
+    拼接同一场景的各段：后续段去掉与上一段末帧重复的首帧，每段最多保留 keep[i] 帧
+
+    Args:
+        paths: 各段视频路径
+        keep: 每段保留的帧数（plan_segments 的结果）
+        output_path: 输出路径
+        fps: 输出帧率
+        backend: 视频写入后端
+
+    Returns:
+        (写入的帧数, 时长秒数)
+    """
+    writer: Optional[StreamingVideoWriter] = None
+    try:
+        for index, (path, count) in enumerate(zip(paths, keep)):
+            frames = iter_video_frames(path)
+            if index > 0:
+                next(frames, None)
+            for position, frame in enumerate(frames):
+                if position >= count:
+                    break
+                if writer is None:
+                    writer = StreamingVideoWriter(
+                        output_path, fps, (frame.shape[1], frame.shape[0]), backend=backend
+                    )
+                elif (frame.shape[1], frame.shape[0]) != writer.frame_size:
+                    import cv2
+                    frame = cv2.resize(frame, writer.frame_size, interpolation=cv2.INTER_AREA)
+                writer.write(frame)
+        if writer is None:
+            raise RuntimeError("分段视频中没有可读取的帧")
+        writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    return writer.frames_written, writer.frames_written / fps
+
+
+def segment_paths(segment_dir: Path, key: str, count: int) -> List[Path]:
+    """分段链各段中间文件的路径"""
+    return [segment_dir / key / f"segment_{index:03d}.mp4" for index in range(count)]
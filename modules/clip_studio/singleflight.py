@@ -0,0 +1,160 @@
+"""
+相同请求去重（single-flight）
+以与结果缓存相同的请求哈希为键，同一时间只提交一个远程任务，重复的调用等待并共享它的结果；
+可选地用文件锁在多个进程之间去重（需配合共享的 cache_dir 传递结果）
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+from .tasks import ClipHandle
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class Flight:
+    """一次进行中的请求：领头调用者提交任务后，等待者拿到同一个句柄"""
+
+    def __init__(self):
+        self.handle: Optional[ClipHandle] = None
+        self.followers = 0
+        self._submitted = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[ClipHandle]:
+        """
+        等待领头调用者提交完成
+
+        Returns:
+            领头任务的句柄，提交失败或超时返回 None
+        """
+        self._submitted.wait(timeout)
+        return self.handle
+
+
+class SingleFlight:
+    """进程内的进行中请求表"""
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Tuple[bool, Flight]:
+        """
+        认领请求
+
+        Args:
+            key: 请求哈希
+
+        Returns:
+            (是否为领头调用者, Flight)；领头调用者需随后调用 submitted 或 failed
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not (flight.handle is not None and flight.handle.done):
+                flight.followers += 1
+                self.followers += 1
+                return False, flight
+            flight = Flight()
+            self._flights[key] = flight
+            self.leaders += 1
+            return True, flight
+
+    def submitted(self, key: str, flight: Flight, handle: ClipHandle) -> None:
+        """领头调用者提交成功，唤醒等待者；任务结束后移出进行中表"""
+        flight.handle = handle
+        flight._submitted.set()
+        handle.add_done_callback(lambda _: self._discard(key, flight))
+
+    def failed(self, key: str, flight: Flight) -> None:
+        """领头调用者提交失败，等待者将重新认领"""
+        self._discard(key, flight)
+        flight._submitted.set()
+
+    def _discard(self, key: str, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """去重统计（领头请求数、被合并的重复请求数、进行中的请求数）"""
+        with self._lock:
+            return {
+                'leaders': self.leaders,
+                'followers': self.followers,
+                'in_flight': len(self._flights)
+            }
+
+
+class FileLock:
+    """基于 flock 的跨进程互斥锁（进程退出时由系统自动释放）"""
+
+    def __init__(self, path: Path):
+        if fcntl is None:
+            raise ImportError("跨进程去重需要 fcntl（仅支持 POSIX 系统），请不要设置 single_flight_lock_dir")
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float, poll_interval: float = 0.2) -> bool:
+        """
+        获取锁
+
+        Args:
+            timeout: 最长等待时间（秒）
+            poll_interval: 重试间隔（秒）
+
+        Returns:
+            是否需要等待（其他进程正在处理同一请求）
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise RuntimeError(f"等待其他进程生成相同请求超时（{int(timeout)} 秒）")
+                waited = True
+                time.sleep(poll_interval)
+        with self._lock:
+            self._fd = fd
+        return waited
+
+    def release(self) -> None:
+        """释放锁（可重复调用）"""
+        with self._lock:
+            fd, self._fd = self._fd, None
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    获取进程级的进行中请求表
+
+    Returns:
+        SingleFlight 单例
+    """
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -0,0 +1,288 @@
+"""
+远程生成任务句柄与多路复用轮询器
+一个后台线程在每个周期内检查所有未完成的任务，而不是每个任务占用一个休眠线程
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+from .polling import PollingStrategy, FixedIntervalPolling
+
+
+class ClipHandle:
+    """远程视频生成任务句柄（由 submit_clip 返回）"""
+
+    PENDING = 'pending'
+    COMPLETE = 'complete'
+    FAILED = 'failed'
+
+    def __init__(
+        self,
+        task_id: str,
+        provider: str,
+        output_path: str,
+        timeout: float,
+        params: Optional[Dict[str, Any]] = None,
+        strategy: Optional[PollingStrategy] = None
+    ):
+        """
+        初始化任务句柄
+
+        Args:
+            task_id: 远程任务 ID
+            provider: API 提供商（'stability' 或 'runway'）
+            output_path: 视频输出路径
+            timeout: 任务超时时间（秒）
+            params: 提交时使用的生成参数
+            strategy: 轮询策略，默认每 3 秒查询一次
+        """
+        self.task_id = task_id
+        self.provider = provider
+        self.output_path = output_path
+        self.params = params or {}
+        self.status = self.PENDING
+        self.video_url: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cache_key: Optional[str] = None  # 结果缓存键（启用缓存时）
+        self.cached = False  # 是否直接命中缓存
+        self.cancelled = False  # 是否被放弃（对冲请求中落败的一方）
+        self.hedged = False  # 是否因等待超过对冲阈值而触发了对冲（对冲请求的主任务）
+        self.pollable = True  # 是否需要轮询远程状态（本地推理任务为 False）
+        self.poll_fn: Optional[Callable[['ClipHandle'], Any]] = None  # 查询单个任务状态的函数（由提交该任务的生成器设置）
+        self.upload_stats: Dict[str, Any] = {}  # 上传编码统计（格式、体积、编码耗时）
+        self.download_stats: Dict[str, Any] = {}  # 下载统计（字节数、耗时、吞吐）
+        self.inference_stats: Dict[str, Any] = {}  # 本地推理统计（每步耗时、峰值内存）
+        self.interpolation_stats: Dict[str, Any] = {}  # 插帧统计（原帧率、输出帧率、处理速度）
+        self.interpolate = True  # 下载后是否按配置插帧
+        self.timings: Dict[str, float] = {}  # 各阶段耗时（秒），见 metrics.PHASES
+        self.leader: Optional['ClipHandle'] = None  # 合并重复请求时跟随的领头任务
+        self.flight_lock = None  # 跨进程去重持有的文件锁，视频写入缓存后释放
+        self.strategy = strategy or FixedIntervalPolling()
+        self.submitted_at = time.monotonic()
+        self.started_at = self.submitted_at  # 开始处理请求的时刻（含图片加载与编码，由 submit_clip 设置）
+        self.completed_at: Optional[float] = None
+        self.deadline = self.submitted_at + timeout
+        self.next_poll_at = self.submitted_at + self.strategy.first_delay()
+        self._done = threading.Event()
+        self._callbacks: List[Callable[['ClipHandle'], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        """任务是否已结束（成功或失败）"""
+        return self._done.is_set()
+
+    @property
+    def poll_count(self) -> int:
+        """已执行的轮询次数"""
+        return self.strategy.polls
+
+    @property
+    def elapsed(self) -> float:
+        """从提交到结束（或当前）的耗时（秒）"""
+        end = self.completed_at if self.completed_at is not None else time.monotonic()
+        return end - self.submitted_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        阻塞等待任务结束
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            任务是否已结束
+        """
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, callback: Callable[['ClipHandle'], None]) -> None:
+        """
+        注册任务结束回调，如果任务已结束则立即调用
+
+        Args:
+            callback: 回调函数，参数为当前句柄
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _resolve(
+        self,
+        status: str,
+        video_url: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """将任务标记为结束并触发回调"""
+        with self._lock:
+            if self._done.is_set():
+                return
+            self.status = status
+            self.video_url = video_url
+            self.error = error
+            self.completed_at = time.monotonic()
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"任务回调执行失败: {str(e)}")
+
+    def __repr__(self) -> str:
+        return f"ClipHandle(provider={self.provider!r}, task_id={self.task_id!r}, status={self.status!r})"
+
+
+class TaskPoller:
+    """
+    多路复用轮询器：单个后台线程负责所有未完成任务的状态查询
+
+    设置了 poll_fn 的任务在常驻线程池中并发查询，其余任务交给轮询器的批量查询函数，
+    因此同一提供商、同一 API Key 的多个生成器可以共用一个轮询器。
+    """
+
+    def __init__(self, poll_fn: Optional[Callable[[List[ClipHandle]], Any]] = None, max_workers: int = 8):
+        """
+        初始化轮询器
+
+        Args:
+            poll_fn: 默认的批量查询函数，接收到期的句柄列表并就地更新其状态
+            max_workers: 状态查询线程池的线程数
+        """
+        self._poll_fn = poll_fn
+        self.max_workers = max_workers
+        self._handles: List[ClipHandle] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """并发查询状态的常驻线程池（延迟创建，各轮询周期复用）"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix='clip-status-poll'
+                    )
+        return self._executor
+
+    @property
+    def outstanding(self) -> int:
+        """当前未完成的任务数量"""
+        with self._cond:
+            return len(self._handles)
+
+    def track(self, handle: ClipHandle) -> None:
+        """
+        将任务加入轮询队列，后台线程按需启动
+
+        Args:
+            handle: 任务句柄
+        """
+        if handle.done or not handle.pollable:
+            return
+        if handle.poll_fn is None and self._poll_fn is None:
+            raise ValueError(f"任务 {handle.task_id} 没有可用的状态查询函数")
+        with self._cond:
+            if handle in self._handles:
+                return
+            self._handles.append(handle)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='clip-task-poller', daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def untrack(self, handle: ClipHandle) -> None:
+        """
+        将任务移出轮询队列（不改变任务状态）
+
+        Args:
+            handle: 任务句柄
+        """
+        with self._cond:
+            if handle in self._handles:
+                self._handles.remove(handle)
+
+    def _run(self) -> None:
+        """后台轮询循环，队列为空时线程退出"""
+        while True:
+            with self._cond:
+                while True:
+                    self._handles = [h for h in self._handles if not h.done]
+                    if not self._handles:
+                        self._thread = None
+                        return
+                    now = time.monotonic()
+                    wake_at = min(min(h.next_poll_at, h.deadline) for h in self._handles)
+                    if wake_at <= now:
+                        break
+                    self._cond.wait(wake_at - now)
+
+                now = time.monotonic()
+                for handle in self._handles:
+                    if now >= handle.deadline:
+                        handle._resolve(
+                            ClipHandle.FAILED,
+                            error=f"任务超时：已等待 {int(handle.elapsed)} 秒"
+                        )
+                due = [h for h in self._handles if not h.done and h.next_poll_at <= now]
+
+            batch = [h for h in due if h.poll_fn is None]
+            if batch:
+                self._poll_batch(batch)
+            single = [h for h in due if h.poll_fn is not None]
+            if len(single) == 1:
+                self._poll_single(single[0])
+            elif single:
+                list(self.executor.map(self._poll_single, single))
+
+    def _poll_batch(self, handles: List[ClipHandle]) -> None:
+        try:
+            self._poll_fn(handles)
+        except Exception as e:
+            print(f"轮询任务状态失败: {str(e)}")
+            retry_at = time.monotonic() + 1.0
+            for handle in handles:
+                handle.next_poll_at = max(handle.next_poll_at, retry_at)
+
+    def _poll_single(self, handle: ClipHandle) -> None:
+        try:
+            handle.poll_fn(handle)
+        except Exception as e:
+            print(f"轮询任务状态失败: {str(e)}")
+            handle.next_poll_at = max(handle.next_poll_at, time.monotonic() + 1.0)
+
+
+_pollers: Dict[Tuple[str, str], TaskPoller] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_task_poller(provider: str, api_key: Optional[str], max_workers: int = 8) -> TaskPoller:
+    """
+    获取进程内共享的轮询器（同一提供商、同一 API Key 共用一个后台线程与查询线程池）
+
+    首次创建时的参数生效，之后同一键的调用直接复用。
+
+    Args:
+        provider: API 提供商
+        api_key: API 密钥（只保存其哈希）
+        max_workers: 状态查询线程池的线程数
+
+    Returns:
+        TaskPoller 实例
+    """
+    key = (provider, hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16])
+    with _pollers_lock:
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = TaskPoller(max_workers=max_workers)
+            _pollers[key] = poller
+        return poller
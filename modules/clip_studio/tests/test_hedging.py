@@ -0,0 +1,52 @@
+"""对冲请求：落败任务的耗时记录与提交窗口内的竞态"""
+
+from clip_studio.hedging import HedgedHandle, get_provider_latency
+from clip_studio.tasks import ClipHandle
+from clip_studio.video_generator import SVDGenerator
+
+
+def make_handle(provider: str, task_id: str, waited: float = 0.0) -> ClipHandle:
+    handle = ClipHandle(task_id=task_id, provider=provider, output_path='/tmp/unused.mp4', timeout=3600)
+    handle.submitted_at -= waited
+    return handle
+
+
+def test_hedged_slow_primary_does_not_lower_p95():
+    provider = 'test-slow-primary'
+    latency = get_provider_latency()
+    for i in range(40):
+        latency.observe(provider, 20.0 + i)
+    generator = SVDGenerator({'api_provider': 'stability', 'api_key': 'test'})
+    before = latency.quantile(provider, 0.95)
+
+    for i in range(20):
+        # 一半任务很快完成，另一半远超阈值后被对冲并落败
+        fast = make_handle(provider, f'fast-{i}', waited=10.0)
+        fast.add_done_callback(generator._observe_latency)
+        fast._resolve(ClipHandle.COMPLETE, video_url='u')
+
+        primary = make_handle(provider, f'slow-{i}', waited=300.0)
+        primary.add_done_callback(generator._observe_latency)
+        handle = HedgedHandle(primary)
+        assert handle.begin_hedge()
+        hedge = make_handle('test-hedge-provider', f'hedge-{i}')
+        hedge.add_done_callback(generator._observe_latency)
+        handle.attach(hedge)
+        hedge._resolve(ClipHandle.COMPLETE, video_url='u')
+        assert primary.cancelled and handle.winner is hedge
+
+    assert latency.quantile(provider, 0.95) >= before
+    assert latency.stats()[provider]['censored'] == 20
+
+
+def test_hedge_submitted_after_primary_won_is_cancelled():
+    primary = make_handle('test-primary', 'p')
+    handle = HedgedHandle(primary)
+    assert handle.begin_hedge()
+    primary._resolve(ClipHandle.COMPLETE, video_url='u')
+    assert handle.done and handle.winner is primary
+
+    hedge = make_handle('test-secondary', 'h')
+    handle.attach(hedge)
+    assert hedge.done and hedge.cancelled
+    assert handle.status == ClipHandle.COMPLETE and handle.task_id == 'p'
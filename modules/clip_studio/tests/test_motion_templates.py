@@ -0,0 +1,21 @@
+"""动效模板：配置文件中的未知字段"""
+
+import json
+
+from clip_studio.motion_templates import MotionTemplateRegistry
+
+
+def test_template_with_unknown_key_loads(tmp_path):
+    config_path = tmp_path / 'motion_config.json'
+    config_path.write_text(json.dumps({
+        'Custom': {
+            'motion_bucket_id': 90,
+            'noise_aug_strength': 0.04,
+            '_comment': '界面排序用',
+            'ui_color': '#ff8800'
+        }
+    }), encoding='utf-8')
+
+    template = MotionTemplateRegistry(str(config_path)).get('custom')
+    assert template['motion_bucket_id'] == 90
+    assert template['ui_color'] == '#ff8800'
@@ -0,0 +1,163 @@
+"""
+上传图片编码
+可配置的编码格式（PNG 压缩等级 / 无损 WebP / 高质量 JPEG），并记录编码耗时与体积
+"""
+
+import io
+import time
+from typing import Optional, Dict, Any, Tuple
+
+from PIL import Image
+
+
+# 编码格式 -> (PIL 格式名, MIME 类型, 文件扩展名)
+UPLOAD_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    'png': ('PNG', 'image/png', 'png'),
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+}
+
+
+class EncodedImage:
+    """已编码的上传图片及其编码统计"""
+
+    def __init__(
+        self,
+        data: bytes,
+        format: str,
+        encode_seconds: float = 0.0,
+        passthrough: bool = False,
+        source_digest: Optional[str] = None
+    ):
+        """
+        Args:
+            data: 编码后的图片字节
+            format: 编码格式（'png'、'webp'、'jpeg'）
+            encode_seconds: 编码耗时（秒）
+            passthrough: 是否为未经重新编码的原始输入
+            source_digest: 源图片的 SHA-256（用于缓存键，不随编码参数变化）
+        """
+        self.data = data
+        self.format = format
+        self.encode_seconds = encode_seconds
+        self.passthrough = passthrough
+        self.source_digest = source_digest
+
+    @property
+    def size(self) -> int:
+        """编码后的字节数"""
+        return len(self.data)
+
+    @property
+    def mime_type(self) -> str:
+        return UPLOAD_FORMATS[self.format][1]
+
+    @property
+    def filename(self) -> str:
+        return f"image.{UPLOAD_FORMATS[self.format][2]}"
+
+    def stats(self) -> Dict[str, Any]:
+        """编码统计信息"""
+        return {
+            'format': self.format,
+            'bytes': self.size,
+            'encode_seconds': self.encode_seconds,
+            'passthrough': self.passthrough
+        }
+
+
+class UploadEncoder:
+    """上传图片编码器"""
+
+    def __init__(
+        self,
+        format: str = 'png',
+        png_compress_level: int = 6,
+        jpeg_quality: int = 95,
+        webp_method: int = 4
+    ):
+        """
+        Args:
+            format: 编码格式，'png'、'webp'（无损）或 'jpeg'
+            png_compress_level: PNG 压缩等级 0-9，越低越快、体积越大
+            jpeg_quality: JPEG 质量 1-100
+            webp_method: WebP 编码速度/体积权衡 0-6，越低越快
+        """
+        if format not in UPLOAD_FORMATS:
+            available = ', '.join(UPLOAD_FORMATS.keys())
+            raise ValueError(f"不支持的上传格式 '{format}'。可用格式: {available}")
+        self.format = format
+        self.png_compress_level = png_compress_level
+        self.jpeg_quality = jpeg_quality
+        self.webp_method = webp_method
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'UploadEncoder':
+        """
+        根据生成器配置创建编码器
+
+        Args:
+            config: 生成器配置字典
+
+        Returns:
+            UploadEncoder 实例
+        """
+        return cls(
+            format=config.get('upload_format', 'png'),
+            png_compress_level=config.get('png_compress_level', 6),
+            jpeg_quality=config.get('jpeg_quality', 95),
+            webp_method=config.get('webp_method', 4)
+        )
+
+    @property
+    def pil_format(self) -> str:
+        return UPLOAD_FORMATS[self.format][0]
+
+    def _save_options(self) -> Dict[str, Any]:
+        if self.format == 'png':
+            return {'compress_level': self.png_compress_level}
+        if self.format == 'webp':
+            return {'lossless': True, 'method': self.webp_method}
+        return {'quality': self.jpeg_quality, 'subsampling': 0}
+
+    def encode(self, image: Image.Image) -> EncodedImage:
+        """
+        编码图片
+
+        Args:
+            image: PIL Image 对象
+
+        Returns:
+            EncodedImage 对象
+        """
+        started = time.perf_counter()
+        buffer = io.BytesIO()
+        image.save(buffer, format=self.pil_format, **self._save_options())
+        return EncodedImage(
+            data=buffer.getvalue(),
+            format=self.format,
+            encode_seconds=time.perf_counter() - started
+        )
+
+    def accepts(self, data: bytes, image_size: Tuple[int, int]) -> bool:
+        """
+        判断已编码的图片是否可以原样上传（格式、尺寸、颜色模式均符合要求）
+
+        只读取文件头，不解码像素。
+
+        Args:
+            data: 已编码的图片字节
+            image_size: 目标尺寸 (宽, 高)
+
+        Returns:
+            是否可以跳过解码与重新编码
+        """
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                return (
+                    image.format == self.pil_format
+                    and image.mode == 'RGB'
+                    and image.size == tuple(image_size)
+                )
+        except Exception:
+            return False
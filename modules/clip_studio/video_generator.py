@@ -4,17 +4,85 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Mapping, Callable, Union, Iterable, Iterator, TYPE_CHECKING
 from pathlib import Path
-import torch
 from PIL import Image
-import numpy as np
 import base64
+import multiprocessing
+import functools
+import hashlib
 import io
+import queue
+import sys
+import threading
 import time
-import requests
 import random
-import json
+import math
+import os
+import shutil
+import uuid
+import weakref
+
+from .models import Script, Scene, ClipResult
+from .tasks import ClipHandle, TaskPoller, get_task_poller
+from .polling import create_polling_strategy, estimate_expected_duration
+from .cache import ClipCache, get_clip_cache, link_or_copy
+from .upload import UploadEncoder, EncodedImage
+from .pipeline_pool import PipelineKey, PooledPipeline, get_pipeline_registry
+from .motion_templates import MotionTemplateRegistry, get_motion_template_registry
+from .journal import JobJournal, get_job_journal
+from .rate_limit import RateLimiter, get_rate_limiter, throttle_delay
+from .singleflight import FileLock, get_single_flight
+from .metrics import Metrics
+from .hedging import HedgeBudget, HedgedHandle, get_hedge_executor, get_hedge_scheduler, get_provider_latency
+
+# torch / numpy / requests 只在实际用到的后端中导入，import clip_studio 保持轻量
+if TYPE_CHECKING:
+    import numpy as np
+    import requests
+    from .download import DownloadStats
+
+
+# 支持的图片输入：文件路径、已编码的图片字节、PIL Image、numpy 数组（HxW 或 HxWxC）
+ImageInput = Union[str, Path, bytes, bytearray, memoryview, Image.Image, 'np.ndarray']
+
+
+def _is_ndarray(value: Any) -> bool:
+    """判断是否为 numpy 数组（numpy 未被导入时不可能是数组，无需导入）"""
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _is_request_error(error: BaseException) -> bool:
+    """判断是否为 requests 的网络异常（requests 未被导入时不会抛出此类异常）"""
+    requests = sys.modules.get('requests')
+    return requests is not None and isinstance(error, requests.exceptions.RequestException)
+
+
+def _throttle_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """
+    判断 SDK 异常是否为限流（HTTP 429）
+    
+    Returns:
+        限流时返回响应头（可能为空，用于读取 Retry-After），否则返回 None
+    """
+    response = getattr(error, 'response', None)
+    status_code = getattr(error, 'status_code', None) or getattr(response, 'status_code', None)
+    if status_code != 429 and type(error).__name__ != 'RateLimitError':
+        return None
+    return getattr(response, 'headers', None) or getattr(error, 'headers', None) or {}
+
+# 可选的缩放滤镜
+RESAMPLE_FILTERS = {
+    'lanczos': Image.Resampling.LANCZOS,
+    'bicubic': Image.Resampling.BICUBIC,
+    'hamming': Image.Resampling.HAMMING,
+    'bilinear': Image.Resampling.BILINEAR,
+    'box': Image.Resampling.BOX,
+    'nearest': Image.Resampling.NEAREST,
+}
 
 
 class BaseVideoGenerator(ABC):
@@ -40,13 +108,29 @@ class BaseVideoGenerator(ABC):
         
         # 默认配置
         self.config.setdefault('model_path', None)
-        self.config.setdefault('device', 'cuda' if torch.cuda.is_available() else 'cpu')
+        self.config.setdefault('device', 'auto')  # 'cuda'、'cpu' 或 'auto'（首次使用本地模型时检测）
         self.config.setdefault('image_size', (1024, 576))  # 16:9 比例
+        self.config.setdefault('resample', 'lanczos')  # 缩放滤镜
+        self.config.setdefault('reducing_gap', 3.0)  # 大幅缩小时的快速降采样系数，None 表示关闭
+        self.config.setdefault('upload_format', 'png')  # 上传编码格式：'png'、'webp'（无损）、'jpeg'
+        self.config.setdefault('png_compress_level', 6)  # PNG 压缩等级 0-9，越低越快
+        self.config.setdefault('jpeg_quality', 95)  # JPEG 质量
+        self.config.setdefault('metrics_hooks', None)  # 指标回调（MetricsHook 列表），也可之后调用 metrics.add_hook 注册
+        self.config.setdefault('preprocess_executor', 'thread')  # 批量预处理方式：'thread'（PIL 解码/缩放/编码时释放 GIL）或 'process'（常驻的 spawn 进程池）
+        self.config.setdefault('preprocess_workers', None)  # 批量预处理并发数，None 时为 CPU 核数
+        self.config.setdefault('preprocess_max_in_flight', None)  # 批量预处理同时处理的图片上限，None 时为并发数的 2 倍
+        
+        self.metrics = Metrics(self.config['metrics_hooks'])
+        
+        # 批量预处理的常驻进程池（延迟创建，close 时关闭）
+        self._preprocess_pool: Optional[ProcessPoolExecutor] = None
+        self._preprocess_pool_workers = 0
+        self._preprocess_pool_lock = threading.Lock()
         
     @abstractmethod
     def generate_clip(
         self,
-        image_path: str,
+        image_path: ImageInput,
         prompt: str,
         output_path: str
     ) -> str:
@@ -54,7 +138,7 @@ class BaseVideoGenerator(ABC):
         生成视频片段的核心函数
         
         Args:
-            image_path: 输入图片路径
+            image_path: 输入图片路径，或内存中的图片（bytes / PIL Image / numpy 数组）
             prompt: 文本提示词
             output_path: 输出视频路径
             
@@ -63,10 +147,40 @@ class BaseVideoGenerator(ABC):
         """
         pass
     
+    @property
+    def device(self) -> str:
+        """
+        推理设备，配置为 'auto' 时在首次访问时检测（需要导入 torch）
+        
+        Returns:
+            'cuda' 或 'cpu' 等设备名
+        """
+        if self.config.get('device', 'auto') == 'auto':
+            import torch
+            self.config['device'] = 'cuda' if torch.cuda.is_available() else 'cpu'
+        return self.config['device']
+    
+    def _resample_filter(self) -> Image.Resampling:
+        """
+        获取配置的缩放滤镜
+        
+        Returns:
+            PIL 缩放滤镜
+        """
+        name = self.config.get('resample', 'lanczos')
+        try:
+            return RESAMPLE_FILTERS[name]
+        except KeyError:
+            available = ', '.join(RESAMPLE_FILTERS.keys())
+            raise ValueError(f"不支持的缩放滤镜 '{name}'。可用滤镜: {available}")
+    
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         预处理图片，确保符合模型比例要求
         
+        先在原图坐标系中计算居中裁剪区域，只对该区域做一次缩放，
+        避免对整张大图做全分辨率缩放后再裁掉多余部分。
+        
         Args:
             image: PIL Image 对象
             
@@ -78,49 +192,324 @@ class BaseVideoGenerator(ABC):
         # 获取当前图片尺寸
         current_width, current_height = image.size
         
+        # 尺寸已经符合要求，无需处理
+        if (current_width, current_height) == (target_width, target_height):
+            return image
+        
         # 计算目标宽高比
         target_ratio = target_width / target_height
         current_ratio = current_width / current_height
         
-        # 调整图片尺寸以匹配目标比例
+        # 在原图中计算与目标比例一致的居中裁剪区域
         if current_ratio > target_ratio:
             # 当前图片更宽，以高度为准
-            new_height = target_height
-            new_width = int(current_width * (target_height / current_height))
+            crop_height = current_height
+            crop_width = current_height * target_ratio
         else:
             # 当前图片更高，以宽度为准
-            new_width = target_width
-            new_height = int(current_height * (target_width / current_width))
+            crop_width = current_width
+            crop_height = current_width / target_ratio
+        
+        left = (current_width - crop_width) / 2
+        top = (current_height - crop_height) / 2
+        box = (left, top, left + crop_width, top + crop_height)
+        
+        # 只缩放裁剪区域；reducing_gap 让大幅缩小时先用 reduce() 快速降采样
+        return image.resize(
+            (target_width, target_height),
+            self._resample_filter(),
+            box=box,
+            reducing_gap=self.config.get('reducing_gap', 3.0)
+        )
+    
+    def _load_image(self, image_path: ImageInput) -> Image.Image:
+        """
+        加载图片
         
-        # 调整大小
-        resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        Args:
+            image_path: 图片路径，或已编码的图片字节、PIL Image、numpy 数组
+            
+        Returns:
+            RGB 模式的 PIL Image 对象
+        """
+        if isinstance(image_path, Image.Image):
+            return image_path if image_path.mode == 'RGB' else image_path.convert('RGB')
+        
+        if _is_ndarray(image_path):
+            import numpy as np
+            array = image_path
+            if array.dtype != np.uint8:
+                # 浮点数组按 0-1 范围处理
+                array = (np.clip(array, 0.0, 1.0) * 255).round().astype(np.uint8)
+            if array.ndim == 3 and array.shape[2] == 1:
+                array = array[:, :, 0]
+            # 连续的 uint8 数组由 PIL 直接引用其内存，不做额外复制
+            image = Image.fromarray(np.ascontiguousarray(array))
+            return image if image.mode == 'RGB' else image.convert('RGB')
+        
+        if isinstance(image_path, (bytes, bytearray, memoryview)):
+            image = Image.open(io.BytesIO(image_path))
+        else:
+            image_path = Path(image_path)
+            if not image_path.exists():
+                raise FileNotFoundError(f"图片文件不存在: {image_path}")
+            image = Image.open(image_path)
+        
+        if image.format == 'JPEG':
+            # JPEG 可在解码时直接按 1/2、1/4、1/8 缩小，只需保证覆盖目标尺寸
+            target_width, target_height = self.config.get('image_size', (1024, 576))
+            scale = max(target_width / image.width, target_height / image.height)
+            if scale < 1:
+                image.draft('RGB', (math.ceil(image.width * scale), math.ceil(image.height * scale)))
         
-        # 居中裁剪到目标尺寸
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
+        return image.convert('RGB')
+    
+    def _upload_encoder(self) -> UploadEncoder:
+        """
+        根据配置创建上传编码器
         
-        cropped_image = resized_image.crop((left, top, right, bottom))
+        Returns:
+            UploadEncoder 实例
+        """
+        return UploadEncoder.from_config(self.config)
+    
+    def _load_and_preprocess(
+        self,
+        image_path: ImageInput,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Image.Image:
+        """
+        加载并预处理图片
         
-        return cropped_image
+        Args:
+            image_path: 图片路径，或内存中的图片
+            timings: 不为 None 时累加 load / preprocess 两个阶段的耗时（秒）
+            
+        Returns:
+            预处理后的 PIL Image
+        """
+        started = time.perf_counter()
+        image = self._load_image(image_path)
+        loaded = time.perf_counter()
+        processed_image = self._preprocess_image(image)
+        if timings is not None:
+            timings['load'] = timings.get('load', 0.0) + loaded - started
+            timings['preprocess'] = time.perf_counter() - loaded
+        return processed_image
     
-    def _load_image(self, image_path: str) -> Image.Image:
+    def _prepare_upload(
+        self,
+        image_path: ImageInput,
+        timings: Optional[Dict[str, float]] = None
+    ) -> EncodedImage:
         """
-        加载图片文件
+        将输入图片转换为待上传的编码图片
+        
+        已编码且符合目标尺寸与格式的输入（文件或 bytes）直接透传，不解码也不重新编码。
         
         Args:
-            image_path: 图片路径
+            image_path: 图片路径，或已编码的图片字节、PIL Image、numpy 数组
+            timings: 不为 None 时记录 load / preprocess / encode 各阶段的耗时（秒）
             
         Returns:
-            PIL Image 对象
+            EncodedImage 对象（包含编码耗时与体积）
+        """
+        encoder = self._upload_encoder()
+        
+        started = time.perf_counter()
+        data = None
+        if isinstance(image_path, (bytes, bytearray, memoryview)):
+            data = bytes(image_path)
+        elif isinstance(image_path, (str, Path)):
+            path = Path(image_path)
+            if not path.exists():
+                raise FileNotFoundError(f"图片文件不存在: {path}")
+            data = path.read_bytes()
+        if timings is not None:
+            timings['load'] = time.perf_counter() - started
+        
+        # 缓存键按源图片计算：已编码的输入取文件摘要，内存中的图片取预处理后的像素
+        source_digest = hashlib.sha256(data).hexdigest() if data is not None else None
+        if data is not None and encoder.accepts(data, self.config.get('image_size', (1024, 576))):
+            return EncodedImage(data, encoder.format, passthrough=True, source_digest=source_digest)
+        
+        processed_image = self._load_and_preprocess(data if data is not None else image_path, timings)
+        upload = encoder.encode(processed_image)
+        upload.source_digest = source_digest or hashlib.sha256(processed_image.tobytes()).hexdigest()
+        if timings is not None:
+            timings['encode'] = upload.encode_seconds
+        return upload
+    
+    def _preprocess_one(self, image_path: ImageInput, encode: bool = True) -> Union[EncodedImage, Image.Image]:
         """
-        image_path = Path(image_path)
-        if not image_path.exists():
-            raise FileNotFoundError(f"图片文件不存在: {image_path}")
+        预处理单张图片（批量预处理的工作单元）
         
-        image = Image.open(image_path).convert('RGB')
+        Args:
+            image_path: 图片路径，或内存中的图片
+            encode: 是否按上传格式编码
+            
+        Returns:
+            encode 为 True 时返回 EncodedImage，否则返回预处理后的 PIL Image
+        """
+        if encode:
+            return self._prepare_upload(image_path)
+        image = self._load_and_preprocess(image_path)
+        # 确保像素已解码，结果可以安全地交给其他线程使用
+        image.load()
         return image
+    
+    def iter_preprocess_batch(
+        self,
+        images: Iterable[ImageInput],
+        encode: bool = True,
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[Union[EncodedImage, Image.Image]]:
+        """
+        并行预处理一批图片，按输入顺序逐个产出结果
+        
+        解码、缩放与编码分散到线程池或进程池中执行；同时处理的图片不超过 max_in_flight 张，
+        输入可以是惰性的迭代器，调用方按顺序消费结果时内存占用有上限。
+        
+        Args:
+            images: 图片路径或内存中的图片（bytes / PIL Image / numpy 数组）
+            encode: 是否按上传格式编码（远程提供商需要编码，本地推理使用预处理后的 PIL Image）
+            executor: 'thread' 或 'process'，None 时使用配置 preprocess_executor
+            max_workers: 并发数，None 时使用配置 preprocess_workers
+            max_in_flight: 同时处理的图片上限，None 时使用配置 preprocess_max_in_flight
+            
+        Returns:
+            与输入顺序一致的 EncodedImage（encode 为 True）或 PIL Image 的迭代器
+        """
+        kind = executor or self.config.get('preprocess_executor', 'thread')
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"不支持的预处理方式 '{kind}'。可用方式: thread, process")
+        workers = max_workers or self.config.get('preprocess_workers') or os.cpu_count() or 1
+        limit = max_in_flight or self.config.get('preprocess_max_in_flight') or workers * 2
+        limit = max(limit, workers)
+        
+        if kind == 'process':
+            # 子进程只需要预处理相关的配置（完整配置中可能有无法序列化的对象，如指标回调）
+            config = {key: self.config[key] for key in _PREPROCESS_CONFIG_KEYS if key in self.config}
+            pool: Executor = self._get_preprocess_pool(workers)
+            submit = functools.partial(pool.submit, _preprocess_in_worker, config)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='clip-preprocess')
+            submit = functools.partial(pool.submit, self._preprocess_one)
+        
+        pending: deque = deque()
+        try:
+            for image_path in images:
+                if isinstance(image_path, Image.Image) and kind == 'thread':
+                    # 惰性加载的 PIL Image 不能被多个线程同时解码，先在调用线程中完成解码
+                    image_path.load()
+                pending.append(submit(image_path, encode))
+                if len(pending) >= limit:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if kind == 'thread':
+                pool.shutdown(wait=True)
+    
+    def _get_preprocess_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        获取批量预处理的常驻进程池（并发数变化时重建）
+        
+        使用 spawn 方式启动子进程：此时进程中通常已有轮询、定时等后台线程，
+        fork 多线程进程可能继承被其他线程持有的锁而死锁；进程池在多批之间复用，启动开销只付一次。
+        spawn 的子进程会重新导入主模块，脚本入口需要放在 if __name__ == '__main__' 之下。
+        
+        Args:
+            workers: 并发数
+            
+        Returns:
+            ProcessPoolExecutor 实例
+        """
+        with self._preprocess_pool_lock:
+            # 子进程异常退出后进程池不可再用，重建
+            broken = getattr(self._preprocess_pool, '_broken', False)
+            if self._preprocess_pool is not None and (broken or self._preprocess_pool_workers != workers):
+                self._preprocess_pool.shutdown(wait=True)
+                self._preprocess_pool = None
+            if self._preprocess_pool is None:
+                self._preprocess_pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                self._preprocess_pool_workers = workers
+            return self._preprocess_pool
+    
+    def close(self):
+        """关闭批量预处理的进程池"""
+        with self._preprocess_pool_lock:
+            if self._preprocess_pool is not None:
+                self._preprocess_pool.shutdown(wait=True)
+                self._preprocess_pool = None
+    
+    def preprocess_batch(
+        self,
+        images: Iterable[ImageInput],
+        encode: bool = True,
+        executor: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> List[Union[EncodedImage, Image.Image]]:
+        """
+        并行预处理一批图片（如资产中心一次下发的整套分镜图）
+        
+        结果可以直接传给 submit_clip：编码结果的 data 已符合目标尺寸与格式，提交时原样透传。
+        参数见 iter_preprocess_batch。
+        
+        Returns:
+            与输入顺序一致的结果列表
+        """
+        return list(self.iter_preprocess_batch(images, encode, executor, max_workers, max_in_flight))
+    
+    def _image_to_bytes(self, image: Image.Image) -> bytes:
+        """
+        将 PIL Image 按配置的上传格式编码为 Bytes
+        
+        Args:
+            image: PIL Image 对象
+            
+        Returns:
+            图片的字节数据
+        """
+        return self._upload_encoder().encode(image).data
+
+
+# 批量预处理子进程需要的配置项
+_PREPROCESS_CONFIG_KEYS = (
+    'image_size', 'resample', 'reducing_gap', 'upload_format',
+    'png_compress_level', 'jpeg_quality', 'webp_method'
+)
+
+
+class _PreprocessWorker(BaseVideoGenerator):
+    """批量预处理子进程中使用的生成器，只提供加载、预处理与编码"""
+    
+    def generate_clip(self, image_path: ImageInput, prompt: str, output_path: str) -> str:
+        raise NotImplementedError("预处理子进程不支持生成视频")
+
+
+# 子进程内按配置复用的预处理器
+_worker_preprocessors: Dict[str, _PreprocessWorker] = {}
+
+
+def _preprocess_in_worker(
+    config: Dict[str, Any],
+    image_path: ImageInput,
+    encode: bool
+) -> Union[EncodedImage, Image.Image]:
+    """在批量预处理子进程中处理单张图片"""
+    key = repr(sorted(config.items()))
+    worker = _worker_preprocessors.get(key)
+    if worker is None:
+        worker = _worker_preprocessors[key] = _PreprocessWorker(dict(config))
+    return worker._preprocess_one(image_path, encode)
 
 
 class SVDGenerator(BaseVideoGenerator):
@@ -147,113 +536,281 @@ class SVDGenerator(BaseVideoGenerator):
         self.config.setdefault('num_frames', 25)  # 生成的帧数
         self.config.setdefault('num_inference_steps', 50)  # 推理步数
         self.config.setdefault('guidance_scale', 7.5)  # 引导强度
+        self.config.setdefault('decode_chunk_size', None)  # 本地推理时 VAE 每次解码的帧数，越小越省内存（None 时为 8）
+        self.config.setdefault('video_writer', 'auto')  # 本地推理的视频写入后端：'auto'、'opencv'、'ffmpeg'
+        self.config.setdefault('segment_dir', None)  # 分段生成的中间文件目录，None 时为输出目录下的 .segments
+        self.config.setdefault('segment_max_retries', 2)  # 单段生成失败时的重试次数
+        self.config.setdefault('keep_segments', False)  # 场景拼接完成后是否保留各段文件
+        self.config.setdefault('interpolation', None)  # 远程视频下载后的 CPU 插帧：None、'blend'（线性混合）或 'flow'（光流）
+        self.config.setdefault('interpolation_factor', None)  # 插帧倍数，None 时插值到 fps
+        self.config.setdefault('interpolation_workers', None)  # 插帧线程数，None 时为 CPU 核数
+        self.config.setdefault('memory_mode', 'auto')  # 'auto'、'full'、'model_offload'、'sequential_offload'
+        self.config.setdefault('attention_slicing', None)  # 注意力切片：None、'auto'、'max' 或整数
+        self.config.setdefault('channels_last', False)  # UNet 使用 channels_last 内存布局
         
         # API 配置
-        self.config.setdefault('api_provider', 'stability')  # 'stability' 或 'runway'
+        self.config.setdefault('api_provider', 'stability')  # 'stability'、'runway' 或 'local'（本地推理）
         self.config.setdefault('api_key', None)  # API 密钥
         self.config.setdefault('api_base_url', 'https://api.stability.ai')  # API 基础 URL
-        self.config.setdefault('polling_interval', 3)  # 轮询间隔（秒）
-        self.config.setdefault('max_polling_attempts', 200)  # 最大轮询次数（10分钟）
+        self.config.setdefault('stability_upload_mode', 'json')  # 'json'（Base64）或 'multipart'（二进制）
+        
+        # 下载配置
+        self.config.setdefault('download_chunk_size', 1024 * 1024)  # 读取块大小（1MB）
+        self.config.setdefault('download_max_retries', 3)  # 断线续传最大重试次数
+        self.config.setdefault('download_parallel_threshold', None)  # 超过该大小（字节）时并行分段下载
+        self.config.setdefault('download_parallel_parts', 4)  # 并行分段数
+        self.config.setdefault('polling_strategy', 'backoff')  # 'backoff'、'fixed' 或自定义工厂
+        self.config.setdefault('polling_interval', 3)  # 固定策略的轮询间隔（秒）
+        self.config.setdefault('max_polling_attempts', 200)  # 最大轮询次数
+        self.config.setdefault('polling_timeout', 600)  # 任务超时时间（秒）
+        self.config.setdefault('polling_initial_delay', 1.0)  # 退避策略的初始等待（秒）
+        self.config.setdefault('polling_max_interval', 15.0)  # 退避策略的最大间隔（秒）
+        self.config.setdefault('expected_seconds_per_frame_step', None)  # 预计耗时系数（秒/帧/步）
+        
+        # 结果缓存配置
+        self.config.setdefault('cache_dir', None)  # 缓存目录，为 None 时不启用缓存
+        self.config.setdefault('cache_max_bytes', 10 * 1024 ** 3)  # 缓存总大小上限（10GB）
+        self.config.setdefault('http_pool_size', 16)  # 每个主机的连接池大小
+        self.config.setdefault('share_http_session', True)  # 是否使用进程内共享连接池
+        self.config.setdefault('single_flight', True)  # 合并相同（图片、参数、seed）的进行中请求
+        self.config.setdefault('single_flight_lock_dir', None)  # 跨进程去重的锁文件目录（需配合共享的 cache_dir）
+        
+        # 限流配置（按提供商 + API Key 在进程内共享，提交与轮询分开计算）
+        self.config.setdefault('submit_rate_limit', 5.0)  # 提交请求每秒上限，None 表示不限速
+        self.config.setdefault('submit_burst', 10)  # 提交请求允许的突发数
+        self.config.setdefault('submit_concurrency', 8)  # 同时进行的提交请求上限
+        self.config.setdefault('poll_rate_limit', 10.0)  # 轮询请求每秒上限，None 表示不限速
+        self.config.setdefault('poll_burst', 20)  # 轮询请求允许的突发数
+        self.config.setdefault('poll_concurrency', None)  # 同时进行的轮询请求上限
+        self.config.setdefault('rate_limit_max_retries', 5)  # 提交遇到 429 时的最大重试次数
+        
+        # 任务日志配置
+        self.config.setdefault('journal_path', None)  # SQLite 任务日志路径，为 None 时不记录
+        self.config.setdefault('journal_resume', True)  # 创建生成器时恢复未完成的任务
+        self.config.setdefault('journal_stale_after', 300)  # 任务多久没有心跳后可被其他进程接管（秒），轮询时每隔其 1/4 刷新一次心跳
+        
+        # 对冲请求配置（主提供商超过耗时分位数仍未完成时向备用提供商重复提交，先完成者胜出）
+        self.config.setdefault('hedge_config', None)  # 备用提供商的配置覆盖，如 {'api_provider': 'runway', 'api_key': ...}，None 表示不对冲
+        self.config.setdefault('hedge_quantile', 0.95)  # 主任务等待超过其提供商耗时的该分位数时触发对冲
+        self.config.setdefault('hedge_delay', 60.0)  # 耗时样本不足时的对冲等待时间（秒）
+        self.config.setdefault('hedge_min_samples', 20)  # 按分位数计算阈值前需要的最少样本数
+        self.config.setdefault('hedge_max_ratio', 0.1)  # 花费上限：对冲请求占主请求的比例
+        self.config.setdefault('hedge_burst', 2)  # 比例上限之外允许的额外对冲数
+        self.config.setdefault('hedge_max_requests', None)  # 花费上限：本生成器的对冲请求总数，None 表示只受比例限制
         
         # 动效模板配置
         self.config.setdefault('motion_config_path', None)  # 动效配置文件路径
-        self._motion_templates: Dict[str, Dict[str, Any]] = {}
+        self._motion_templates: Optional[MotionTemplateRegistry] = None
         self._load_motion_templates()
         
         # 模型相关属性（延迟加载）
         self._model = None
         self._pipe = None
+        self._pipeline_entry: Optional[PooledPipeline] = None
+        self._pipe_finalizer: Optional[weakref.finalize] = None
+        self._model_lock = threading.Lock()
         
-    def _load_motion_templates(self):
-        """加载动效模板配置"""
-        config_path = self.config.get('motion_config_path')
-        
-        # 如果没有指定路径，使用默认路径
-        if config_path is None:
-            # 获取当前文件所在目录
-            current_dir = Path(__file__).parent
-            config_path = current_dir / 'motion_config.json'
-        else:
-            config_path = Path(config_path)
+        # HTTP 会话与 Runway 客户端（延迟创建并复用）
+        self._session: Optional['requests.Session'] = None
+        self._runway_client = None
+        self._runway_client_key: Optional[str] = None
+        self._client_lock = threading.Lock()
         
-        # 加载配置文件
-        if config_path.exists():
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    self._motion_templates = json.load(f)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"动效配置文件格式错误: {str(e)}")
-            except Exception as e:
-                raise RuntimeError(f"加载动效配置文件失败: {str(e)}")
-        else:
-            # 如果文件不存在，使用默认模板
-            self._motion_templates = {
-                "High Action": {
-                    "motion_bucket_id": 127,
-                    "noise_aug_strength": 0.1
-                },
-                "Cinematic Slow": {
-                    "motion_bucket_id": 20,
-                    "noise_aug_strength": 0.02
-                }
-            }
+        # 本地推理线程（延迟创建）
+        self._local_executor: Optional[ThreadPoolExecutor] = None
+        
+        # 恢复任务的后台下载线程（延迟创建）
+        self._resume_executor: Optional[ThreadPoolExecutor] = None
+        
+        # 对冲请求的备用提供商生成器与花费额度（延迟创建）
+        self._hedge_generator: Optional['SVDGenerator'] = None
+        self._hedge_budget: Optional[HedgeBudget] = None
+        
+        if self.config.get('journal_path') and self.config.get('journal_resume', True):
+            self.resume_jobs()
+        
+    def _load_motion_templates(self):
+        """绑定进程内共享的动效模板注册表（每个配置文件只解析一次，修改后自动重新加载）"""
+        self._motion_templates = get_motion_template_registry(self.config.get('motion_config_path'))
     
-    def get_motion_template(self, template_name: str) -> Dict[str, Any]:
+    def get_motion_template(self, template_name: str) -> Mapping[str, Any]:
         """
         获取动效模板配置
         
         Args:
-            template_name: 模板名称
+            template_name: 模板名称或别名（不区分大小写）
             
         Returns:
-            模板配置字典
+            模板配置（只读映射）
         """
-        if template_name not in self._motion_templates:
-            available = ', '.join(self._motion_templates.keys())
-            raise ValueError(
-                f"动效模板 '{template_name}' 不存在。可用模板: {available}"
-            )
-        
-        return self._motion_templates[template_name].copy()
+        return self._motion_templates.get(template_name)
     
-    def list_motion_templates(self) -> Dict[str, Dict[str, Any]]:
+    def list_motion_templates(self) -> Mapping[str, Mapping[str, Any]]:
         """
         列出所有可用的动效模板
         
         Returns:
-            所有模板的字典
+            模板名称到模板配置的只读映射
         """
-        return self._motion_templates.copy()
+        return self._motion_templates.templates
     
-    def _load_model(self):
-        """延迟加载模型"""
-        if self._pipe is not None:
-            return
+    def _pipeline_key(self) -> PipelineKey:
+        """
+        当前配置对应的模型注册表键
         
+        Returns:
+            (model_path, device, dtype, variant, 内存选项)
+        """
+        from .local_backend import resolve_memory_mode
+        
+        device = self.device
+        memory_mode = resolve_memory_mode(self.config.get('memory_mode', 'auto'), device)
+        options = [memory_mode]
+        if self.config.get('attention_slicing') is not None:
+            options.append(f"slicing={self.config['attention_slicing']}")
+        if self.config.get('channels_last'):
+            options.append('channels_last')
+        return (
+            str(self.config['model_path']),
+            device,
+            'float16' if device == 'cuda' else 'float32',
+            'fp16' if device == 'cuda' else None,
+            ','.join(options)
+        )
+    
+    def _build_pipeline(self):
+        """
+        从磁盘加载 SVD pipeline（由注册表调用，每个键只加载一次）
+        
+        Returns:
+            StableVideoDiffusionPipeline 实例
+        """
         try:
             from diffusers import StableVideoDiffusionPipeline
-            from diffusers.utils import load_image, export_to_video
             import torch
+            from .local_backend import resolve_memory_mode, apply_memory_mode
             
-            device = self.config['device']
-            model_path = self.config['model_path']
+            model_path, device, dtype, variant, _ = self._pipeline_key()
             
             # 加载 SVD 模型
-            self._pipe = StableVideoDiffusionPipeline.from_pretrained(
+            pipe = StableVideoDiffusionPipeline.from_pretrained(
                 model_path,
-                torch_dtype=torch.float16 if device == 'cuda' else torch.float32,
-                variant="fp16" if device == 'cuda' else None
+                torch_dtype=getattr(torch, dtype),
+                variant=variant
+            )
+            return apply_memory_mode(
+                pipe,
+                resolve_memory_mode(self.config.get('memory_mode', 'auto'), device),
+                device,
+                attention_slicing=self.config.get('attention_slicing'),
+                channels_last=self.config.get('channels_last', False)
             )
-            self._pipe = self._pipe.to(device)
-            self._pipe.enable_model_cpu_offload()
             
         except ImportError:
             raise ImportError(
                 "请安装 diffusers 库: pip install diffusers accelerate transformers"
             )
+        except ValueError:
+            raise
         except Exception as e:
             raise RuntimeError(f"模型加载失败: {str(e)}")
     
+    def _load_model(self):
+        """延迟加载模型（通过进程级注册表在所有生成器之间共享）"""
+        if self._pipe is not None:
+            return
+        
+        with self._model_lock:
+            if self._pipe is not None:
+                return
+            registry = get_pipeline_registry()
+            key = self._pipeline_key()
+            entry = registry.acquire(key, self._build_pipeline)
+            self._pipeline_entry = entry
+            self._pipe = entry.pipe
+            # 生成器被回收或调用 close() 时归还引用
+            self._pipe_finalizer = weakref.finalize(self, registry.release, key)
+    
+    def warmup(self, pin: bool = False) -> Dict[str, Any]:
+        """
+        预先加载本地模型（服务启动时调用），冷启动开销只需支付一次
+        
+        Args:
+            pin: 是否常驻内存，不参与空闲淘汰
+            
+        Returns:
+            模型注册表统计信息
+        """
+        registry = get_pipeline_registry()
+        registry.warmup(self._pipeline_key(), self._build_pipeline, pin=pin)
+        return registry.stats()
+    
+    def close(self):
+        """归还共享模型引用，关闭本地推理线程与预处理进程池"""
+        if self._pipe_finalizer is not None:
+            self._pipe_finalizer()
+            self._pipe_finalizer = None
+        self._pipe = None
+        self._pipeline_entry = None
+        
+        if self._local_executor is not None:
+            self._local_executor.shutdown(wait=True)
+            self._local_executor = None
+        
+        if self._resume_executor is not None:
+            self._resume_executor.shutdown(wait=True)
+            self._resume_executor = None
+        
+        if self._hedge_generator is not None:
+            self._hedge_generator.close()
+            self._hedge_generator = None
+        
+        super().close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _get_session(self) -> 'requests.Session':
+        """
+        获取复用连接的 HTTP 会话
+        
+        Returns:
+            requests.Session 对象
+        """
+        if self._session is None:
+            from .http_session import create_session, get_shared_session
+            
+            pool_size = self.config.get('http_pool_size', 16)
+            with self._client_lock:
+                if self._session is None:
+                    if self.config.get('share_http_session', True):
+                        self._session = get_shared_session(pool_size)
+                    else:
+                        self._session = create_session(pool_size)
+        return self._session
+    
+    def _get_runway_client(self):
+        """
+        获取缓存的 Runway 客户端（API Key 变化时重建）
+        
+        Returns:
+            Runway 客户端对象
+        """
+        try:
+            from runway import Runway
+        except ImportError:
+            raise ImportError("请安装 runway SDK: pip install runway")
+        
+        api_key = self.config.get('api_key')
+        with self._client_lock:
+            if self._runway_client is None or self._runway_client_key != api_key:
+                self._runway_client = Runway(api_key=api_key)
+                self._runway_client_key = api_key
+            return self._runway_client
+    
     def _image_to_base64(self, image: Image.Image) -> str:
         """
         将 PIL Image 转换为 Base64 字符串
@@ -264,46 +821,116 @@ class SVDGenerator(BaseVideoGenerator):
         Returns:
             Base64 编码的字符串
         """
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-        image_bytes = buffer.getvalue()
+        image_bytes = self._image_to_bytes(image)
         base64_str = base64.b64encode(image_bytes).decode('utf-8')
         return base64_str
     
-    def _image_to_bytes(self, image: Image.Image) -> bytes:
+    def _rate_limiter(self, kind: str) -> RateLimiter:
         """
-        将 PIL Image 转换为 Bytes
+        当前提供商与 API Key 共享的限流器
         
         Args:
-            image: PIL Image 对象
+            kind: 'submit' 或 'poll'
             
         Returns:
-            图片的字节数据
+            RateLimiter 实例
+        """
+        return get_rate_limiter(
+            self.config.get('api_provider', 'stability'),
+            self.config.get('api_key'),
+            kind,
+            rate=self.config.get(f'{kind}_rate_limit'),
+            burst=self.config.get(f'{kind}_burst'),
+            concurrency=self.config.get(f'{kind}_concurrency')
+        )
+    
+    def _send_limited(self, kind: str, send, max_retries: int = 0):
+        """
+        经过限流器发送请求，遇到 429 时暂停该提供商的所有同类请求后重试
+        
+        Args:
+            kind: 'submit' 或 'poll'
+            send: 无参函数，发送请求并返回 requests.Response
+            max_retries: 429 的最大重试次数，用尽后返回最后一次 429 响应
+            
+        Returns:
+            requests.Response 对象
         """
-        buffer = io.BytesIO()
-        image.save(buffer, format='PNG')
-        return buffer.getvalue()
+        limiter = self._rate_limiter(kind)
+        attempt = 0
+        while True:
+            with limiter.slot():
+                response = send()
+            limiter.update_from_headers(response.headers)
+            if response.status_code != 429:
+                return response
+            attempt += 1
+            delay = throttle_delay(response.headers, attempt)
+            limiter.penalize(delay)
+            provider = self.config.get('api_provider', 'stability')
+            self.metrics.increment('throttled', provider=provider, kind=kind)
+            if attempt > max_retries:
+                return response
+            self.metrics.increment('retries', provider=provider, kind=kind)
+            print(f"API 请求被限流（429），{delay:.1f} 秒后重试 ({attempt}/{max_retries})")
+    
+    def _call_limited(self, kind: str, call, max_retries: int = 0):
+        """
+        经过限流器调用 SDK，SDK 抛出 429 异常时与 _send_limited 一样暂停该提供商的同类请求后重试
+        
+        Args:
+            kind: 'submit' 或 'poll'
+            call: 无参函数，执行一次 SDK 调用
+            max_retries: 429 的最大重试次数，用尽后抛出最后一次的异常
+            
+        Returns:
+            call 的返回值
+        """
+        limiter = self._rate_limiter(kind)
+        attempt = 0
+        while True:
+            try:
+                with limiter.slot():
+                    return call()
+            except Exception as e:
+                headers = _throttle_headers(e)
+                if headers is None:
+                    raise
+                attempt += 1
+                delay = throttle_delay(headers, attempt)
+                limiter.penalize(delay)
+                provider = self.config.get('api_provider', 'stability')
+                self.metrics.increment('throttled', provider=provider, kind=kind)
+                if attempt > max_retries:
+                    raise
+                self.metrics.increment('retries', provider=provider, kind=kind)
+                print(f"API 请求被限流（429），{delay:.1f} 秒后重试 ({attempt}/{max_retries})")
     
     def _generate_with_stability_api(
         self,
-        image_base64: str,
+        image_base64: Optional[str],
         motion_bucket_id: int,
         steps: int,
         seed: int,
-        noise_aug_strength: float = 0.05
+        noise_aug_strength: float = 0.05,
+        image_file: Optional[EncodedImage] = None
     ) -> str:
         """
         使用 Stability AI API 生成视频
         
         Args:
-            image_base64: Base64 编码的图片
+            image_base64: Base64 编码的图片（JSON 上传）
             motion_bucket_id: 运动强度
             steps: 推理步数
             seed: 随机种子
+            noise_aug_strength: 噪声增强强度
+            image_file: 已编码的图片，提供时以 multipart 二进制上传，不做 Base64
             
         Returns:
             任务 ID
         """
+        import requests
+        
         api_key = self.config.get('api_key')
         if not api_key:
             raise ValueError("请设置 API Key: config['api_key']")
@@ -311,12 +938,10 @@ class SVDGenerator(BaseVideoGenerator):
         api_url = f"{self.config['api_base_url']}/v2alpha/generation/image-to-video"
         
         headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {api_key}"
         }
         
         payload = {
-            "image": image_base64,
             "motion_bucket_id": motion_bucket_id,
             "seed": seed,
             "cfg_scale": self.config.get('guidance_scale', 7.5),
@@ -324,8 +949,24 @@ class SVDGenerator(BaseVideoGenerator):
             "noise_aug_strength": noise_aug_strength
         }
         
+        if image_file is None:
+            headers["Content-Type"] = "application/json"
+            payload["image"] = image_base64
+        
+        def post():
+            if image_file is not None:
+                # multipart 上传：直接发送二进制图片，避免 Base64 带来的 33% 体积膨胀
+                return self._get_session().post(
+                    api_url,
+                    data={key: str(value) for key, value in payload.items()},
+                    files={"image": (image_file.filename, image_file.data, image_file.mime_type)},
+                    headers=headers,
+                    timeout=30
+                )
+            return self._get_session().post(api_url, json=payload, headers=headers, timeout=30)
+        
         try:
-            response = requests.post(api_url, json=payload, headers=headers, timeout=30)
+            response = self._send_limited('submit', post, self.config.get('rate_limit_max_retries', 5))
             response.raise_for_status()
             
             result = response.json()
@@ -356,6 +997,8 @@ class SVDGenerator(BaseVideoGenerator):
         Returns:
             任务状态信息
         """
+        import requests
+        
         api_key = self.config.get('api_key')
         api_url = f"{self.config['api_base_url']}/v2alpha/generation/image-to-video/result/{task_id}"
         
@@ -364,28 +1007,55 @@ class SVDGenerator(BaseVideoGenerator):
         }
         
         try:
-            response = requests.get(api_url, headers=headers, timeout=30)
+            response = self._send_limited(
+                'poll', lambda: self._get_session().get(api_url, headers=headers, timeout=30)
+            )
+            if response.status_code == 429:
+                # 轮询被限流不代表任务失败，按 Retry-After 稍后再查
+                return {
+                    'status': 'in-progress',
+                    'retry_after': throttle_delay(response.headers, 1)
+                }
             response.raise_for_status()
-            return response.json()
+            status = response.json()
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None:
+                status.setdefault('retry_after', retry_after)
+            return status
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"查询任务状态失败: {str(e)}")
     
-    def _download_video(self, video_url: str, output_path: Path) -> None:
+    def _download_video(
+        self,
+        video_url: str,
+        output_path: Path,
+        expected_sha256: Optional[str] = None
+    ) -> 'DownloadStats':
         """
-        下载视频文件
+        下载视频文件（临时文件 + 原子重命名，断线续传，完成前校验）
         
         Args:
             video_url: 视频下载 URL
             output_path: 输出路径
+            expected_sha256: 期望的 SHA-256（可选）
+            
+        Returns:
+            下载统计（字节数、耗时、吞吐等）
         """
+        import requests
+        from .download import download_file
+        
         try:
-            response = requests.get(video_url, timeout=300, stream=True)
-            response.raise_for_status()
-            
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    
+            return download_file(
+                self._get_session(),
+                video_url,
+                output_path,
+                chunk_size=self.config.get('download_chunk_size', 1024 * 1024),
+                max_retries=self.config.get('download_max_retries', 3),
+                expected_sha256=expected_sha256,
+                parallel_threshold=self.config.get('download_parallel_threshold'),
+                parallel_parts=self.config.get('download_parallel_parts', 4)
+            )
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"视频下载失败: {str(e)}")
     
@@ -409,35 +1079,40 @@ class SVDGenerator(BaseVideoGenerator):
         Returns:
             任务 ID
         """
-        try:
-            from runway import Runway
-        except ImportError:
-            raise ImportError("请安装 runway SDK: pip install runway")
-        
         api_key = self.config.get('api_key')
         if not api_key:
             raise ValueError("请设置 API Key: config['api_key']")
         
-        runway = Runway(api_key=api_key)
+        runway = self._get_runway_client()
+        
+        max_retries = self.config.get('rate_limit_max_retries', 5)
         
         try:
-            # 上传图片
-            image_response = runway.files.upload(image_bytes)
+            # 上传图片（上传与创建任务分别重试，创建被限流时不重复上传）
+            image_response = self._call_limited(
+                'submit', lambda: runway.files.upload(image_bytes), max_retries
+            )
             image_id = image_response['id']
             
             # 创建生成任务
-            task = runway.generate.create(
-                model="svd",
-                image_id=image_id,
-                motion_bucket_id=motion_bucket_id,
-                steps=steps,
-                seed=seed,
-                noise_aug_strength=noise_aug_strength
+            task = self._call_limited(
+                'submit',
+                lambda: runway.generate.create(
+                    model="svd",
+                    image_id=image_id,
+                    motion_bucket_id=motion_bucket_id,
+                    steps=steps,
+                    seed=seed,
+                    noise_aug_strength=noise_aug_strength
+                ),
+                max_retries
             )
             
             return task['id']
             
         except Exception as e:
+            if _throttle_headers(e) is not None:
+                raise RuntimeError("API 请求频率过高，请稍后重试")
             raise RuntimeError(f"Runway API 调用失败: {str(e)}")
     
     def _poll_runway_task(self, task_id: str) -> Dict[str, Any]:
@@ -450,51 +1125,30 @@ class SVDGenerator(BaseVideoGenerator):
         Returns:
             任务状态信息
         """
-        try:
-            from runway import Runway
-        except ImportError:
-            raise ImportError("请安装 runway SDK: pip install runway")
-        
-        api_key = self.config.get('api_key')
-        runway = Runway(api_key=api_key)
+        runway = self._get_runway_client()
         
         try:
-            task = runway.tasks.get(task_id)
-            return task
+            return self._call_limited('poll', lambda: runway.tasks.get(task_id))
         except Exception as e:
+            headers = _throttle_headers(e)
+            if headers is not None:
+                # 轮询被限流不代表任务失败，按 Retry-After 稍后再查（不计为排队结束）
+                return {
+                    'status': 'throttled',
+                    'retry_after': throttle_delay(headers, 1)
+                }
             raise RuntimeError(f"查询任务状态失败: {str(e)}")
     
-    def generate_clip(
-        self,
-        image_path: str,
-        prompt: str,
-        output_path: str,
-        seed: Optional[int] = None,
-        template_name: Optional[str] = None
-    ) -> str:
+    def _resolve_motion_params(self, template_name: Optional[str]) -> Dict[str, Any]:
         """
-        生成视频片段（使用 API）
+        根据模板名称或 motion_score 确定运动参数
         
         Args:
-            image_path: 输入图片路径
-            prompt: 文本提示词（SVD 主要基于图片，prompt 作为辅助）
-            output_path: 输出视频路径
-            seed: 随机种子，如果为 None 则随机生成
-            template_name: 动效模板名称（如 'High Action', 'Cinematic Slow'），
-                          如果提供则使用模板参数，否则使用 motion_score
+            template_name: 动效模板名称，为 None 时使用 motion_score
             
         Returns:
-            输出视频的路径
+            包含 motion_bucket_id 和 noise_aug_strength 的字典
         """
-        # 确保输出目录存在
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # 加载并预处理图片
-        image = self._load_image(image_path)
-        processed_image = self._preprocess_image(image)
-        
-        # 根据模板名称或 motion_score 确定参数
         if template_name:
             # 使用动效模板
             template = self.get_motion_template(template_name)
@@ -506,97 +1160,1332 @@ class SVDGenerator(BaseVideoGenerator):
             motion_bucket_id = int(1 + 254 * self.motion_score)  # 映射到 1-255 范围
             noise_aug_strength = 0.05  # 默认值
         
+        return {
+            'motion_bucket_id': motion_bucket_id,
+            'noise_aug_strength': noise_aug_strength
+        }
+    
+    @property
+    def clip_cache(self) -> Optional[ClipCache]:
+        """结果缓存（未配置 cache_dir 时为 None），stats 属性提供命中统计"""
+        cache_dir = self.config.get('cache_dir')
+        if not cache_dir:
+            return None
+        return get_clip_cache(cache_dir, self.config.get('cache_max_bytes', 10 * 1024 ** 3))
+    
+    @property
+    def journal(self) -> Optional[JobJournal]:
+        """任务日志（未配置 journal_path 时为 None）"""
+        journal_path = self.config.get('journal_path')
+        if not journal_path:
+            return None
+        return get_job_journal(journal_path)
+    
+    @property
+    def poller(self) -> TaskPoller:
+        """进程内共享的后台轮询器（同一提供商、同一 API Key 的生成器共用）"""
+        return get_task_poller(
+            self.config.get('api_provider', 'stability'),
+            self.config.get('api_key'),
+            self.config.get('poll_workers', 8)
+        )
+    
+    def submit_clip(
+        self,
+        image_path: ImageInput,
+        prompt: str,
+        output_path: str,
+        seed: Optional[int] = None,
+        template_name: Optional[str] = None,
+        interpolate: bool = True
+    ) -> ClipHandle:
+        """
+        提交视频生成任务（非阻塞，不等待生成完成）
+        
+        Args:
+            image_path: 输入图片路径，或内存中的图片（bytes / PIL Image / numpy 数组）
+            prompt: 文本提示词（SVD 主要基于图片，prompt 作为辅助）
+            output_path: 输出视频路径
+            seed: 随机种子，如果为 None 则随机生成
+            template_name: 动效模板名称，如果提供则使用模板参数，否则使用 motion_score
+            interpolate: 下载后是否按配置插帧（分段生成时各段保持原始帧率，由场景拼接后统一插帧）
+            
+        Returns:
+            任务句柄，可配合 poll / fetch 或 poller 使用
+        """
+        started = time.monotonic()
+        timings: Dict[str, float] = {}
+        
+        # 确保输出目录存在
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 根据配置选择 API 提供商
+        api_provider = self.config.get('api_provider', 'stability')
+        
+        if api_provider == 'local':
+            # 本地推理直接使用预处理后的像素，无需编码上传
+            upload = None
+            processed_image = self._load_and_preprocess(image_path, timings)
+            image_id = processed_image.tobytes()
+        else:
+            # 加载、预处理并编码图片（符合要求的已编码图片直接透传）
+            upload = self._prepare_upload(image_path, timings)
+            image_id = upload.source_digest.encode('ascii')
+        
+        motion_params = self._resolve_motion_params(template_name)
+        
         # 获取推理步数
         steps = self.config.get('num_inference_steps', 50)
         
+        # 只有显式指定 seed 时结果才可复现，才需要查询缓存或合并重复请求
+        reproducible = seed is not None
+        cache = self.clip_cache if reproducible else None
+        
         # 生成随机种子（如果未提供）
         if seed is None:
             seed = random.randint(0, 2**32 - 1)
         
-        # 根据配置选择 API 提供商
+        params = {'prompt': prompt, 'seed': seed, 'steps': steps, **motion_params}
+        interpolate = interpolate and bool(self.config.get('interpolation')) and api_provider != 'local'
+        if self.config.get('interpolation') and api_provider != 'local' and not interpolate:
+            # 记入任务日志，恢复的任务下载后同样不插帧
+            params['interpolate'] = False
+        
+        cache_key = None
+        if reproducible and (cache is not None or self.config.get('single_flight', True)):
+            key_params = {
+                'provider': api_provider,
+                'image_size': list(self.config.get('image_size', (1024, 576))),
+                'motion_bucket_id': motion_params['motion_bucket_id'],
+                'noise_aug_strength': motion_params['noise_aug_strength'],
+                'steps': steps,
+                'guidance_scale': self.config.get('guidance_scale', 7.5),
+                'seed': seed
+            }
+            if api_provider == 'local':
+                # 本地推理的帧数、帧率、模型权重与解码分块都会改变输出
+                model_path, _, dtype, variant, _ = self._pipeline_key()
+                key_params.update({
+                    'num_frames': self.config.get('num_frames', 25),
+                    'fps': self.fps,
+                    'model_path': model_path,
+                    'dtype': dtype,
+                    'variant': variant,
+                    'decode_chunk_size': self.config.get('decode_chunk_size')
+                })
+            else:
+                # 按源图片计算键时，缩放方式决定上传的像素；PNG 与无损 WebP 的编码参数不改变像素，
+                # 只有重新编码为 JPEG 时质量参数才影响结果
+                key_params['resample'] = self.config.get('resample', 'lanczos')
+                key_params['reducing_gap'] = self.config.get('reducing_gap', 3.0)
+                if upload.format == 'jpeg' and not upload.passthrough:
+                    key_params['jpeg_quality'] = self.config.get('jpeg_quality', 95)
+            if api_provider == 'stability':
+                # 请求发往的服务地址决定实际使用的模型版本
+                key_params['api_base_url'] = self.config.get('api_base_url')
+            if interpolate:
+                # 缓存的是插帧后的视频
+                key_params['interpolation'] = [
+                    self.config['interpolation'], self.config.get('interpolation_factor'), self.fps
+                ]
+            if self.config.get('hedge_config') and api_provider != 'local':
+                # 对冲时结果可能来自备用提供商
+                key_params['hedge'] = self.config['hedge_config'].get('api_provider')
+            cache_key = ClipCache.make_key(image_id, key_params)
+        handle = None
+        if cache is not None:
+            # 跨进程去重时加锁后还会再查询一次，未命中以那次为准，一次未命中不计两次
+            recheck = self.config.get('single_flight', True) and bool(self.config.get('single_flight_lock_dir'))
+            handle = self._cached_handle(cache, cache_key, output_path, params, count_miss=not recheck)
+        
+        if handle is None:
+            if api_provider == 'local':
+                submit = functools.partial(self._submit_local, processed_image, output_path, params, cache_key)
+            elif self.config.get('hedge_config'):
+                submit = functools.partial(self._submit_hedged, upload, output_path, params, cache_key)
+            else:
+                submit = functools.partial(self._submit_remote, upload, output_path, params, cache_key)
+            
+            if cache_key is not None and self.config.get('single_flight', True):
+                handle = self._submit_single_flight(cache_key, submit, output_path, params)
+            else:
+                handle = submit()
+        
+        handle.started_at = started
+        handle.timings.update(timings)
+        handle.interpolate = interpolate
+        if self.metrics.enabled:
+            handle.add_done_callback(self._record_resolved)
+        return handle
+    
+    def _submit_remote(
+        self,
+        upload: EncodedImage,
+        output_path: Path,
+        params: Dict[str, Any],
+        cache_key: Optional[str] = None
+    ) -> ClipHandle:
+        """
+        调用远程 API 提交生成任务
+        
+        Args:
+            upload: 已编码的上传图片
+            output_path: 输出视频路径
+            params: 生成参数（prompt、seed、steps、motion_bucket_id、noise_aug_strength）
+            cache_key: 结果缓存键（可选）
+            
+        Returns:
+            任务句柄
+        """
         api_provider = self.config.get('api_provider', 'stability')
+        image_bytes = upload.data
+        seed = params['seed']
+        steps = params['steps']
+        motion_params = {
+            'motion_bucket_id': params['motion_bucket_id'],
+            'noise_aug_strength': params['noise_aug_strength']
+        }
+        timeout = self.config.get('polling_timeout', 600)
         
+        # 将图片转换为 Base64 或 Bytes，然后调用生成接口
+        upload_stats = upload.stats()
+        submit_started = time.monotonic()
         try:
-            # 1. 读取图片并转换为 Base64 或 Bytes
             if api_provider == 'stability':
-                image_base64 = self._image_to_base64(processed_image)
-                # 2. 调用生成接口
-                task_id = self._generate_with_stability_api(
-                    image_base64=image_base64,
-                    motion_bucket_id=motion_bucket_id,
-                    steps=steps,
-                    seed=seed,
-                    noise_aug_strength=noise_aug_strength
-                )
+                if self.config.get('stability_upload_mode', 'json') == 'multipart':
+                    upload_stats.update(upload_mode='multipart', payload_bytes=upload.size)
+                    task_id = self._generate_with_stability_api(
+                        image_base64=None,
+                        image_file=upload,
+                        steps=steps,
+                        seed=seed,
+                        **motion_params
+                    )
+                else:
+                    image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+                    upload_stats.update(upload_mode='json', payload_bytes=len(image_base64))
+                    task_id = self._generate_with_stability_api(
+                        image_base64=image_base64,
+                        steps=steps,
+                        seed=seed,
+                        **motion_params
+                    )
             elif api_provider == 'runway':
-                image_bytes = self._image_to_bytes(processed_image)
-                # 2. 调用生成接口
+                upload_stats.update(upload_mode='binary', payload_bytes=upload.size)
                 task_id = self._generate_with_runway_sdk(
                     image_bytes=image_bytes,
-                    motion_bucket_id=motion_bucket_id,
                     steps=steps,
                     seed=seed,
-                    noise_aug_strength=noise_aug_strength
+                    **motion_params
                 )
             else:
                 raise ValueError(f"不支持的 API 提供商: {api_provider}")
+        except Exception:
+            self.metrics.increment('errors', provider=api_provider, phase='submit')
+            raise
+        submit_seconds = time.monotonic() - submit_started
+        
+        expected_duration = estimate_expected_duration(
+            steps,
+            self.config.get('num_frames', 25),
+            self.config.get('expected_seconds_per_frame_step')
+        )
+        handle = ClipHandle(
+            task_id=task_id,
+            provider=api_provider,
+            output_path=str(output_path),
+            timeout=timeout,
+            params=params,
+            strategy=create_polling_strategy(self.config, expected_duration)
+        )
+        handle.cache_key = cache_key
+        handle.upload_stats = upload_stats
+        handle.timings['submit'] = submit_seconds
+        handle.poll_fn = self._poll_handle
+        
+        journal = self.journal
+        if journal is not None:
+            journal.record_submit(handle)
+            handle.add_done_callback(journal.record_resolved)
+        handle.add_done_callback(self._observe_latency)
+        return handle
+    
+    def _observe_latency(self, handle: ClipHandle) -> None:
+        """
+        任务结束回调：记录提供商耗时
+        
+        对冲落败被放弃的主任务实际耗时不短于已等待的时间：主任务超过阈值后才会被对冲，
+        丢弃这些样本等于丢掉慢尾，分位数会越估越低，因此按已等待时间记录为删失样本；
+        落败的对冲任务提交得晚，已等待时间不含慢尾信息，不计入。
+        
+        Args:
+            handle: 已结束的任务句柄
+        """
+        latency = get_provider_latency()
+        if handle.status == ClipHandle.COMPLETE and not handle.cancelled:
+            latency.observe(handle.provider, handle.elapsed)
+        elif handle.cancelled and handle.hedged:
+            latency.observe(handle.provider, handle.elapsed, censored=True)
+    
+    @property
+    def hedge_generator(self) -> Optional['SVDGenerator']:
+        """对冲请求使用的备用提供商生成器（未配置 hedge_config 时为 None）"""
+        hedge_config = self.config.get('hedge_config')
+        if not hedge_config:
+            return None
+        with self._client_lock:
+            if self._hedge_generator is None:
+                config = {
+                    **self.config,
+                    **hedge_config,
+                    'hedge_config': None,
+                    'journal_resume': False,
+                    'metrics_hooks': None
+                }
+                if config.get('api_provider') not in ('stability', 'runway'):
+                    raise ValueError(
+                        f"不支持的对冲提供商: {config.get('api_provider')}，可选: stability, runway"
+                    )
+                generator = SVDGenerator(config, self.motion_score, self.fps)
+                # 备用提供商的指标与主生成器一起上报
+                generator.metrics = self.metrics
+                self._hedge_generator = generator
+            return self._hedge_generator
+    
+    @property
+    def hedge_budget(self) -> HedgeBudget:
+        """对冲请求的花费额度，stats() 提供已用额度统计"""
+        with self._client_lock:
+            if self._hedge_budget is None:
+                self._hedge_budget = HedgeBudget(
+                    max_ratio=self.config.get('hedge_max_ratio', 0.1),
+                    burst=self.config.get('hedge_burst', 2),
+                    max_requests=self.config.get('hedge_max_requests')
+                )
+            return self._hedge_budget
+    
+    def _hedge_threshold(self, provider: str) -> float:
+        """
+        对冲阈值：提供商耗时的 hedge_quantile 分位数，样本不足时为 hedge_delay
+        
+        Args:
+            provider: 主任务的提供商
+            
+        Returns:
+            主任务提交后等待多久触发对冲（秒）
+        """
+        threshold = get_provider_latency().quantile(
+            provider,
+            self.config.get('hedge_quantile', 0.95),
+            self.config.get('hedge_min_samples', 20)
+        )
+        return threshold if threshold is not None else self.config.get('hedge_delay', 60.0)
+    
+    def _submit_hedged(
+        self,
+        upload: EncodedImage,
+        output_path: Path,
+        params: Dict[str, Any],
+        cache_key: Optional[str] = None
+    ) -> ClipHandle:
+        """
+        提交主提供商任务，超过对冲阈值仍未完成时再向备用提供商提交同一请求
+        
+        Args:
+            upload: 已编码的上传图片（两个提供商共用）
+            output_path: 输出视频路径
+            params: 生成参数
+            cache_key: 结果缓存键（可选）
+            
+        Returns:
+            对冲任务句柄（由内部任务的轮询器在后台跟踪）
+        """
+        # 提交前创建备用提供商生成器（配置有误时不产生主请求费用）
+        secondary = self.hedge_generator
+        primary = self._submit_remote(upload, output_path, params, cache_key)
+        self.hedge_budget.record_request()
+        handle = HedgedHandle(primary)
+        self.poller.track(primary)
+        
+        threshold = self._hedge_threshold(primary.provider)
+        get_hedge_scheduler().schedule(
+            primary.submitted_at + threshold,
+            functools.partial(self._launch_hedge, secondary, handle, upload, params)
+        )
+        return handle
+    
+    def _launch_hedge(
+        self,
+        secondary: 'SVDGenerator',
+        handle: HedgedHandle,
+        upload: EncodedImage,
+        params: Dict[str, Any]
+    ) -> None:
+        """
+        对冲检查（在调度线程中调用）：主任务仍未完成且额度允许时，在共享线程池中提交对冲请求
+        
+        Args:
+            secondary: 备用提供商生成器
+            handle: 对冲任务句柄
+            upload: 已编码的上传图片
+            params: 生成参数
+        """
+        primary = handle.primary
+        if handle.done or primary.done:
+            return
+        budget = self.hedge_budget
+        if not budget.try_acquire():
+            self.metrics.increment('hedges_rejected', provider=primary.provider)
+            return
+        if not handle.begin_hedge():
+            budget.release()
+            return
+        
+        def run():
+            if handle.done:
+                # 排队等待提交期间主任务已结束，不再提交（不产生费用）
+                budget.release()
+                handle.attach(None)
+                return
+            try:
+                hedge = secondary._submit_remote(upload, Path(handle.output_path), params, handle.cache_key)
+            except Exception as e:
+                # 提交失败不产生费用，退还额度，继续等待主任务
+                budget.release()
+                print(f"对冲请求提交失败: {str(e)}")
+                handle.attach(None)
+                return
+            self.metrics.increment('hedges', provider=hedge.provider)
+            print(
+                f"任务 {primary.task_id} 已等待 {handle.hedged_at:.1f} 秒，"
+                f"向 {hedge.provider} 提交对冲请求 {hedge.task_id}"
+            )
+            # 先加入对冲句柄：提交期间主任务已胜出时对冲任务会被立即放弃，不再加入轮询
+            handle.attach(hedge)
+            secondary.poller.track(hedge)
+        
+        get_hedge_executor().submit(run)
+    
+    def _cached_handle(
+        self,
+        cache: ClipCache,
+        cache_key: str,
+        output_path: Path,
+        params: Dict[str, Any],
+        count_miss: bool = True
+    ) -> Optional[ClipHandle]:
+        """
+        查询结果缓存，命中时把视频放到输出路径并返回已完成的句柄
+        
+        Args:
+            count_miss: 未命中时是否计入缓存的 misses
+        
+        Returns:
+            已完成的任务句柄，未命中返回 None
+        """
+        if cache.materialize(cache_key, str(output_path), count_miss) is None:
+            return None
+        # 缓存命中：返回已完成的句柄，无需调用 API
+        handle = ClipHandle(
+            task_id=f"cache:{cache_key[:16]}",
+            provider=self.config.get('api_provider', 'stability'),
+            output_path=str(output_path),
+            timeout=self.config.get('polling_timeout', 600),
+            params=params
+        )
+        handle.cache_key = cache_key
+        handle.cached = True
+        handle._resolve(ClipHandle.COMPLETE)
+        return handle
+    
+    def _submit_single_flight(
+        self,
+        cache_key: str,
+        submit: Callable[[], ClipHandle],
+        output_path: Path,
+        params: Dict[str, Any]
+    ) -> ClipHandle:
+        """
+        合并相同请求：同一请求哈希同时只提交一个任务，重复的调用跟随它的结果
+        
+        配置 single_flight_lock_dir 时还会用文件锁在进程之间去重：
+        其他进程正在生成相同请求时在此等待，完成后从共享的结果缓存中取得视频。
+        
+        Args:
+            cache_key: 请求哈希（与结果缓存的键相同）
+            submit: 实际提交任务的函数
+            output_path: 输出视频路径
+            params: 生成参数
             
-            # 3. 轮询机制：每隔3秒检查一次任务状态
-            polling_interval = self.config.get('polling_interval', 3)
-            max_attempts = self.config.get('max_polling_attempts', 200)
+        Returns:
+            任务句柄（领头任务或跟随句柄）
+        """
+        flights = get_single_flight()
+        timeout = self.config.get('polling_timeout', 600)
+        while True:
+            leader, flight = flights.claim(cache_key)
+            if leader:
+                break
+            leader_handle = flight.wait(timeout)
+            if leader_handle is not None:
+                return self._follow(leader_handle, output_path, params)
+            # 领头调用提交失败，重新认领
+        
+        lock = None
+        try:
+            lock_dir = self.config.get('single_flight_lock_dir')
+            if lock_dir:
+                lock = FileLock(Path(lock_dir) / f"{cache_key}.lock")
+                lock.acquire(timeout)
+                # 其他进程刚生成过相同请求时结果应已在共享缓存中；
+                # 加锁前的查询未计入未命中，无论是否等待过都在这里做该请求最终的一次查询
+                cache = self.clip_cache
+                handle = self._cached_handle(cache, cache_key, output_path, params) if cache else None
+                if handle is not None:
+                    lock.release()
+                    flights.submitted(cache_key, flight, handle)
+                    return handle
+            handle = submit()
+        except BaseException:
+            if lock is not None:
+                lock.release()
+            flights.failed(cache_key, flight)
+            raise
+        
+        if lock is not None:
+            # 视频写入缓存后（fetch）或任务失败时释放，句柄被回收时兜底释放
+            handle.flight_lock = lock
+            handle.add_done_callback(lambda h: lock.release() if h.status == ClipHandle.FAILED else None)
+            weakref.finalize(handle, lock.release)
+        flights.submitted(cache_key, flight, handle)
+        return handle
+    
+    def _follow(self, leader: ClipHandle, output_path: Path, params: Dict[str, Any]) -> ClipHandle:
+        """
+        创建跟随领头任务的句柄：领头任务结束时一同结束，fetch 时复用其结果
+        
+        Args:
+            leader: 领头任务句柄
+            output_path: 本次调用的输出路径
+            params: 生成参数
+            
+        Returns:
+            跟随句柄（无需轮询）
+        """
+        handle = ClipHandle(
+            task_id=leader.task_id,
+            provider=leader.provider,
+            output_path=str(output_path),
+            timeout=float('inf'),
+            params=params
+        )
+        handle.pollable = False
+        handle.leader = leader
+        handle.cache_key = leader.cache_key
+        leader.add_done_callback(
+            lambda h: handle._resolve(h.status, video_url=h.video_url, error=h.error)
+        )
+        # 领头任务由本生成器的轮询器兜底跟踪，避免其调用方未轮询时跟随者一直等待
+        self.poller.track(leader)
+        return handle
+    
+    def _submit_local(
+        self,
+        image: Image.Image,
+        output_path: Path,
+        params: Dict[str, Any],
+        cache_key: Optional[str] = None
+    ) -> ClipHandle:
+        """
+        在本地推理线程中执行生成，返回的句柄在推理结束后自动完成
+        
+        Args:
+            image: 预处理后的图片
+            output_path: 输出视频路径
+            params: 生成参数（seed、steps、motion_bucket_id、noise_aug_strength）
+            cache_key: 结果缓存键（可选）
             
-            for attempt in range(max_attempts):
-                time.sleep(polling_interval)
+        Returns:
+            任务句柄（无需轮询）
+        """
+        handle = ClipHandle(
+            task_id=f"local:{uuid.uuid4().hex[:16]}",
+            provider='local',
+            output_path=str(output_path),
+            timeout=float('inf'),
+            params=params
+        )
+        handle.pollable = False
+        handle.cache_key = cache_key
+        
+        if self._local_executor is None:
+            with self._client_lock:
+                if self._local_executor is None:
+                    # 同一 pipeline 的推理只能串行（scheduler 状态、VAE 精度切换与 CPU 卸载钩子都不是线程安全的），
+                    # 一个推理线程即可；加载不同模型的生成器之间仍可并行
+                    self._local_executor = ThreadPoolExecutor(
+                        max_workers=1,
+                        thread_name_prefix='clip-local-inference'
+                    )
+        
+        future = self._local_executor.submit(
+            self._generate_locally,
+            image=image,
+            output_path=output_path,
+            seed=params['seed'],
+            steps=params['steps'],
+            motion_bucket_id=params['motion_bucket_id'],
+            noise_aug_strength=params['noise_aug_strength']
+        )
+        
+        def on_done(f):
+            error = f.exception()
+            if error is not None:
+                handle._resolve(ClipHandle.FAILED, error=str(error))
+            else:
+                handle.inference_stats = f.result()
+                handle._resolve(ClipHandle.COMPLETE)
+        
+        future.add_done_callback(on_done)
+        return handle
+    
+    def _generate_locally(
+        self,
+        image: Image.Image,
+        output_path: Path,
+        seed: int,
+        steps: int,
+        motion_bucket_id: int,
+        noise_aug_strength: float
+    ) -> Dict[str, Any]:
+        """
+        使用本地 SVD 模型生成视频
+        
+        Args:
+            image: 预处理后的图片
+            output_path: 输出视频路径
+            seed: 随机种子
+            steps: 推理步数
+            motion_bucket_id: 运动强度
+            noise_aug_strength: 噪声增强强度
+            
+        Returns:
+            推理统计（输出路径、每步耗时、峰值内存等）
+        """
+        self._load_model()
+        # 共享的 pipeline 同一时间只能执行一个推理（多个生成器共用同一模型时也在这里排队）
+        with self._pipeline_entry.lock:
+            from .local_backend import run_local_inference
+            
+            stats = run_local_inference(
+                self._pipe,
+                image,
+                output_path,
+                num_frames=self.config.get('num_frames', 25),
+                num_inference_steps=steps,
+                motion_bucket_id=motion_bucket_id,
+                noise_aug_strength=noise_aug_strength,
+                seed=seed,
+                fps=self.fps,
+                decode_chunk_size=self.config.get('decode_chunk_size'),
+                video_writer=self.config.get('video_writer', 'auto')
+            )
+        stats['memory_mode'] = self._pipeline_key()[4]
+        
+        step_seconds = stats['step_seconds'] or [stats['first_step_seconds'] or 0.0]
+        per_step = sum(step_seconds) / len(step_seconds)
+        message = f"本地推理完成: 总耗时 {stats['total_seconds']:.1f} 秒，每步 {per_step:.2f} 秒"
+        if stats['peak_rss_bytes'] is not None:
+            message += f"，峰值内存 {stats['peak_rss_bytes'] / 1024 ** 2:.0f} MB"
+        if stats['peak_cuda_allocated_bytes'] is not None:
+            message += f"，峰值显存 {stats['peak_cuda_allocated_bytes'] / 1024 ** 2:.0f} MB"
+        print(f"{message} ({stats['memory_mode']})")
+        return stats
+    
+    def _poll_handle(self, handle: ClipHandle) -> None:
+        """
+        查询单个任务状态并就地更新句柄
+        
+        Args:
+            handle: 任务句柄
+        """
+        status: Dict[str, Any] = {}
+        try:
+            if handle.provider == 'stability':
+                status = self._poll_stability_task(handle.task_id)
+                task_status = status.get('status', 'unknown')
+                
+                if task_status == 'complete':
+                    video_url = status.get('video_url')
+                    if not video_url:
+                        handle._resolve(ClipHandle.FAILED, error="任务完成但未返回视频 URL")
+                    else:
+                        handle._resolve(ClipHandle.COMPLETE, video_url=video_url)
+                elif task_status == 'failed':
+                    handle._resolve(ClipHandle.FAILED, error=status.get('error', '未知错误'))
+                # 其他状态（processing, pending）继续轮询
                 
-                # 查询任务状态
-                if api_provider == 'stability':
-                    status = self._poll_stability_task(task_id)
-                    task_status = status.get('status', 'unknown')
-                    
-                    if task_status == 'complete':
-                        # 任务完成，下载视频
-                        video_url = status.get('video_url')
-                        if not video_url:
-                            raise RuntimeError("任务完成但未返回视频 URL")
-                        self._download_video(video_url, output_path)
-                        return str(output_path)
-                    elif task_status == 'failed':
-                        error_msg = status.get('error', '未知错误')
-                        raise RuntimeError(f"视频生成失败: {error_msg}")
-                    # 其他状态（processing, pending）继续轮询
-                    
-                elif api_provider == 'runway':
-                    status = self._poll_runway_task(task_id)
-                    task_status = status.get('status', 'unknown')
-                    
-                    if task_status == 'succeeded':
-                        # 任务完成，下载视频
-                        video_url = status.get('output', {}).get('video_url')
-                        if not video_url:
-                            raise RuntimeError("任务完成但未返回视频 URL")
-                        self._download_video(video_url, output_path)
-                        return str(output_path)
-                    elif task_status == 'failed':
-                        error_msg = status.get('error', '未知错误')
-                        raise RuntimeError(f"视频生成失败: {error_msg}")
-                    # 其他状态继续轮询
+            elif handle.provider == 'runway':
+                status = self._poll_runway_task(handle.task_id)
+                task_status = status.get('status', 'unknown')
+                if task_status not in ('pending', 'throttled') and 'queue' not in handle.timings:
+                    # Runway 区分排队（pending / throttled）与生成中，记录排队耗时
+                    handle.timings['queue'] = handle.elapsed
                 
-                # 显示进度（可选）
-                if attempt % 10 == 0:  # 每30秒显示一次
-                    print(f"任务进行中... (已等待 {attempt * polling_interval} 秒)")
+                if task_status == 'succeeded':
+                    video_url = (status.get('output') or {}).get('video_url')
+                    if not video_url:
+                        handle._resolve(ClipHandle.FAILED, error="任务完成但未返回视频 URL")
+                    else:
+                        handle._resolve(ClipHandle.COMPLETE, video_url=video_url)
+                elif task_status == 'failed':
+                    handle._resolve(ClipHandle.FAILED, error=status.get('error', '未知错误'))
+                # 其他状态继续轮询
+            else:
+                handle._resolve(ClipHandle.FAILED, error=f"不支持的 API 提供商: {handle.provider}")
+        except Exception as e:
+            handle._resolve(ClipHandle.FAILED, error=str(e))
+            return
+        finally:
+            # 由轮询策略决定下一次查询时间（同时累计轮询次数）
+            handle.next_poll_at = time.monotonic() + handle.strategy.next_delay(status)
+            self.metrics.increment('polls', provider=handle.provider)
+        
+        if handle.done:
+            return
+        
+        journal = self.journal
+        if journal is not None:
+            # 心跳：其他进程据此判断该任务仍有人轮询，不会在超时前接管
+            journal.heartbeat([handle], self.config.get('journal_stale_after', 300) / 4)
+        
+        max_attempts = self.config.get('max_polling_attempts', 200)
+        if handle.poll_count >= max_attempts:
+            handle._resolve(
+                ClipHandle.FAILED,
+                error=f"任务超时：已轮询 {handle.poll_count} 次，等待 {int(handle.elapsed)} 秒"
+            )
+        elif handle.poll_count % 10 == 0:
+            # 显示进度（可选）
+            print(f"任务 {handle.task_id} 进行中... (已等待 {int(handle.elapsed)} 秒)")
+    
+    def poll(self, handles: List[ClipHandle]) -> List[ClipHandle]:
+        """
+        对所有未完成的任务各查询一次状态（就地更新句柄）
+        
+        Args:
+            handles: 任务句柄列表
+            
+        Returns:
+            本次查询后已结束的句柄列表
+        """
+        pending = [h for h in handles if not h.done]
+        # 对冲句柄由内部任务的轮询器在后台跟踪，这里只查询普通任务
+        polled = [h for h in pending if not isinstance(h, HedgedHandle)]
+        if len(polled) == 1 or self.config.get('poll_workers', 8) <= 1:
+            for handle in polled:
+                self._poll_handle(handle)
+        elif polled:
+            # 复用共享轮询器的常驻线程池，而不是每个周期新建线程
+            list(self.poller.executor.map(self._poll_handle, polled))
+        
+        return [h for h in pending if h.done]
+    
+    def fetch(self, handle: ClipHandle) -> str:
+        """
+        下载已完成任务的视频
+        
+        Args:
+            handle: 已完成的任务句柄
+            
+        Returns:
+            输出视频的路径
+        """
+        if handle.status == ClipHandle.FAILED:
+            raise RuntimeError(f"视频生成失败: {handle.error}")
+        if handle.status != ClipHandle.COMPLETE:
+            raise RuntimeError(f"任务尚未完成: {handle.task_id}")
+        
+        output_path = Path(handle.output_path)
+        try:
+            if not handle.cached:
+                self._fetch(handle, output_path)
+        except Exception as e:
+            self._record_clip(handle, error=str(e), phase='download')
+            raise
+        finally:
+            if handle.flight_lock is not None:
+                handle.flight_lock.release()
+        self._record_clip(handle)
+        return str(output_path)
+    
+    def _record_resolved(self, handle: ClipHandle) -> None:
+        """任务结束回调：记录生成阶段耗时，失败的任务不会再被下载，直接上报片段记录"""
+        if not handle.cached:
+            handle.timings['generation'] = handle.elapsed - handle.timings.get('queue', 0.0)
+        if handle.status == ClipHandle.FAILED:
+            self._record_clip(handle, error=handle.error, phase='generation')
+    
+    def _record_clip(self, handle: ClipHandle, error: Optional[str] = None, phase: Optional[str] = None) -> None:
+        """
+        上报片段记录（各阶段耗时、轮询与重试次数、下载吞吐）
+        
+        Args:
+            handle: 任务句柄
+            error: 错误信息（片段失败时）
+            phase: 出错的阶段
+        """
+        if not self.metrics.enabled:
+            return
+        phases = dict(handle.timings)
+        download = handle.download_stats
+        if download:
+            phases['download'] = download['seconds']
+        phases['total'] = time.monotonic() - handle.started_at
+        
+        provider = handle.provider
+        if error is not None:
+            self.metrics.increment('errors', provider=provider, phase=phase or 'unknown')
+        if download:
+            self.metrics.increment('download_bytes', download['bytes'], provider=provider)
+            if download.get('resumes'):
+                self.metrics.increment('retries', download['resumes'], provider=provider, kind='download')
+        
+        record = {
+            'task_id': handle.task_id,
+            'provider': provider,
+            'output_path': str(handle.output_path),
+            'status': 'failed' if error is not None else 'fetched',
+            'error': error,
+            'cached': handle.cached,
+            'deduplicated': handle.leader is not None,
+            'polls': handle.poll_count,
+            'phases': phases,
+            'upload_bytes': handle.upload_stats.get('bytes'),
+            'download_bytes': download.get('bytes'),
+            'download_bytes_per_second': download.get('throughput')
+        }
+        if isinstance(handle, HedgedHandle) and handle.hedge is not None:
+            won = handle.winner is handle.hedge
+            if won:
+                self.metrics.increment('hedge_wins', provider=provider)
+            record['hedge'] = {
+                'provider': handle.hedge.provider,
+                'task_id': handle.hedge.task_id,
+                'after_seconds': handle.hedged_at,
+                'won': won
+            }
+        if handle.inference_stats:
+            record['inference'] = {
+                key: value for key, value in handle.inference_stats.items() if key != 'step_seconds'
+            }
+        self.metrics.clip(record)
+    
+    def _fetch(self, handle: ClipHandle, output_path: Path) -> str:
+        """下载或复用已完成任务的视频并写入缓存"""
+        cache = self.clip_cache
+        leader = handle.leader
+        if leader is not None:
+            # 跟随句柄：优先复用缓存或领头任务已有的文件，否则自行下载同一视频（不产生 API 费用）
+            if cache is not None and cache.materialize(handle.cache_key, str(output_path)) is not None:
+                return str(output_path)
+            if leader.provider == 'local' or leader.cached:
+                return link_or_copy(leader.output_path, output_path)
+            download_stats = self._download_video(handle.video_url, output_path)
+            handle.download_stats = download_stats.stats()
+            self._interpolate(handle, output_path)
+            return str(output_path)
+        
+        # 本地推理已直接写入输出路径，远程任务需要下载
+        if handle.provider != 'local':
+            journal = self.journal
+            try:
+                download_stats = self._download_video(handle.video_url, output_path)
+                handle.download_stats = download_stats.stats()
+                self._interpolate(handle, output_path)
+            except Exception as e:
+                if journal is not None:
+                    journal.record_fetch_error(handle, str(e))
+                raise
+            if journal is not None:
+                journal.record_fetched(handle)
+        
+        if cache is not None and handle.cache_key:
+            cache.put(handle.cache_key, str(output_path))
+        return str(output_path)
+    
+    def _interpolate(self, handle: ClipHandle, output_path: Path) -> None:
+        """
+        按配置把下载的视频在 CPU 上插帧到 self.fps（或 interpolation_factor 倍），未启用时直接返回
+        
+        远程只需生成较少的帧，其余帧在本地插值得到。
+        
+        Args:
+            handle: 任务句柄（记录插帧统计）
+            output_path: 已下载的视频，原地替换为插帧后的视频
+        """
+        if not handle.interpolate:
+            return
+        stats = self._interpolate_video(output_path)
+        if stats is None:
+            return
+        handle.interpolation_stats = stats
+        if not stats['skipped']:
+            handle.timings['interpolate'] = stats['seconds']
+    
+    def _interpolate_video(self, path: Path) -> Optional[Dict[str, Any]]:
+        """
+        按配置原地插帧
+        
+        Args:
+            path: 视频路径
+            
+        Returns:
+            插帧统计，未启用插帧时返回 None
+        """
+        method = self.config.get('interpolation')
+        if not method:
+            return None
+        from .interpolation import interpolate_video
+        
+        factor = self.config.get('interpolation_factor')
+        stats = interpolate_video(
+            str(path),
+            str(path),
+            target_fps=None if factor else self.fps,
+            factor=factor,
+            method=method,
+            workers=self.config.get('interpolation_workers'),
+            backend=self.config.get('video_writer', 'auto')
+        )
+        if not stats['skipped']:
+            print(
+                f"插帧完成: {stats['source_fps']:.1f} → {stats['output_fps']:.1f} fps，"
+                f"{stats['frames_in']} → {stats['frames_out']} 帧，{stats['frames_per_second']:.0f} 帧/秒"
+            )
+        return stats
+    
+    def resume_jobs(self, fetch: bool = True) -> List[ClipHandle]:
+        """
+        从任务日志恢复未完成的远程任务（创建生成器时自动调用）
+        
+        已提交但未完成的任务重新加入轮询，已完成但未下载的任务直接下载，
+        不会重新提交生成请求。
+        
+        Args:
+            fetch: 任务完成后是否在后台自动下载
+            
+        Returns:
+            恢复的任务句柄列表
+        """
+        journal = self.journal
+        api_provider = self.config.get('api_provider', 'stability')
+        if journal is None or api_provider == 'local':
+            return []
+        
+        jobs = journal.claim_unfinished(api_provider, self.config.get('journal_stale_after', 300))
+        handles = []
+        for job in jobs:
+            handle = ClipHandle(
+                task_id=job['task_id'],
+                provider=api_provider,
+                output_path=job['output_path'],
+                timeout=self.config.get('polling_timeout', 600),
+                params=job['params'],
+                strategy=create_polling_strategy(self.config)
+            )
+            handle.cache_key = job['cache_key']
+            handle.interpolate = job['params'].get('interpolate', True)
+            handle.poll_fn = self._poll_handle
+            if job['status'] == 'complete' and job['video_url']:
+                handle._resolve(ClipHandle.COMPLETE, video_url=job['video_url'])
+            else:
+                handle.add_done_callback(journal.record_resolved)
+                self.poller.track(handle)
+            if fetch:
+                handle.add_done_callback(self._fetch_in_background)
+            handles.append(handle)
+        
+        if handles:
+            print(f"从任务日志恢复了 {len(handles)} 个未完成的任务")
+        return handles
+    
+    def _fetch_in_background(self, handle: ClipHandle) -> None:
+        """在后台线程中下载恢复任务的视频"""
+        if handle.status != ClipHandle.COMPLETE:
+            print(f"恢复的任务 {handle.task_id} 失败: {handle.error}")
+            return
+        
+        def run():
+            try:
+                output_path = self.fetch(handle)
+                print(f"恢复的任务 {handle.task_id} 已下载: {output_path}")
+            except Exception as e:
+                print(f"恢复的任务 {handle.task_id} 下载失败: {str(e)}")
+        
+        with self._client_lock:
+            if self._resume_executor is None:
+                self._resume_executor = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix='clip-resume-fetch'
+                )
+            executor = self._resume_executor
+        executor.submit(run)
+    
+    def generate_clip(
+        self,
+        image_path: ImageInput,
+        prompt: str,
+        output_path: str,
+        seed: Optional[int] = None,
+        template_name: Optional[str] = None,
+        interpolate: bool = True
+    ) -> str:
+        """
+        生成视频片段（使用 API）
+        
+        Args:
+            image_path: 输入图片路径，或内存中的图片（bytes / PIL Image / numpy 数组）
+            prompt: 文本提示词（SVD 主要基于图片，prompt 作为辅助）
+            output_path: 输出视频路径
+            seed: 随机种子，如果为 None 则随机生成
+            template_name: 动效模板名称（如 'High Action', 'Cinematic Slow'），
+                          如果提供则使用模板参数，否则使用 motion_score
+            interpolate: 下载后是否按配置插帧
+            
+        Returns:
+            输出视频的路径
+        """
+        try:
+            # 1. 提交任务
+            handle = self.submit_clip(
+                image_path=image_path,
+                prompt=prompt,
+                output_path=output_path,
+                seed=seed,
+                template_name=template_name,
+                interpolate=interpolate
+            )
+            
+            # 2. 交由共享轮询器跟踪，等待任务结束
+            self.poller.track(handle)
+            handle.wait()
             
-            # 超时
-            raise RuntimeError(f"任务超时：已等待 {max_attempts * polling_interval} 秒")
+            # 3. 下载视频
+            return self.fetch(handle)
             
         except ValueError as e:
             raise ValueError(f"参数错误: {str(e)}")
         except RuntimeError as e:
             raise RuntimeError(f"视频生成失败: {str(e)}")
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"网络请求失败: {str(e)}")
         except Exception as e:
+            if _is_request_error(e):
+                raise RuntimeError(f"网络请求失败: {str(e)}")
             raise RuntimeError(f"未知错误: {str(e)}")
     
+    def generate_script_clips(
+        self,
+        script: Script,
+        images: Union[Dict[int, ImageInput], List[ImageInput]],
+        output_dir: str,
+        max_concurrency: int = 8,
+        seed: Optional[int] = None,
+        template_names: Optional[Dict[int, str]] = None
+    ) -> Dict[int, ClipResult]:
+        """
+        并发生成整个剧本所有场景的视频片段
+        
+        所有场景同时提交并由同一个轮询器跟踪，总耗时接近最慢的单个片段，
+        而不是所有片段之和。单个场景失败不会中断其他场景，错误记录在对应的 ClipResult 中。
+        
+        Args:
+            script: 剧本对象
+            images: 场景编号到分镜图片（路径或内存图片）的映射，或与 script.scenes 顺序一致的列表
+            output_dir: 输出目录，片段保存为 scene_<编号>.mp4
+            max_concurrency: 提交与下载的最大并发请求数，默认 8
+            seed: 随机种子，所有场景共用；为 None 时每个场景随机生成
+            template_names: 场景编号到动效模板名称的映射（可选）
+            
+        Returns:
+            场景编号到 ClipResult 的映射
+        """
+        if isinstance(images, (list, tuple)):
+            if len(images) != len(script.scenes):
+                raise ValueError(
+                    f"图片数量 ({len(images)}) 与场景数量 ({len(script.scenes)}) 不一致"
+                )
+            images = {
+                scene.scene_number: image
+                for scene, image in zip(script.scenes, images)
+            }
+        
+        template_names = template_names or {}
+        output_dir = Path(output_dir)
+        results: Dict[int, ClipResult] = {}
+        started = time.monotonic()
+        
+        def failed(scene_number: int, error: str) -> ClipResult:
+            return ClipResult(
+                scene_number=scene_number,
+                error=error,
+                elapsed_seconds=time.monotonic() - started
+            )
+        
+        pending = {}
+        for scene in script.scenes:
+            image_path = images.get(scene.scene_number)
+            if image_path is None:
+                results[scene.scene_number] = failed(scene.scene_number, "缺少该场景的分镜图片")
+            else:
+                pending[scene.scene_number] = (image_path, scene.content)
+        
+        if not pending:
+            return dict(sorted(results.items()))
+        
+        finished: "queue.Queue[ClipHandle]" = queue.Queue()
+        workers = max(1, min(max_concurrency, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 1. 并发提交所有场景
+            submit_futures = {
+                executor.submit(
+                    self.submit_clip,
+                    image_path=image_path,
+                    prompt=prompt,
+                    output_path=str(output_dir / f"scene_{scene_number:03d}.mp4"),
+                    seed=seed,
+                    template_name=template_names.get(scene_number)
+                ): scene_number
+                for scene_number, (image_path, prompt) in pending.items()
+            }
+            
+            scene_by_handle: Dict[int, int] = {}
+            for future in as_completed(submit_futures):
+                scene_number = submit_futures[future]
+                try:
+                    handle = future.result()
+                except Exception as e:
+                    results[scene_number] = failed(scene_number, str(e))
+                    continue
+                scene_by_handle[id(handle)] = scene_number
+                handle.add_done_callback(finished.put)
+                self.poller.track(handle)
+            
+            # 2. 共享轮询器完成一个任务就立即下载
+            fetch_futures = {}
+            for _ in range(len(scene_by_handle)):
+                handle = finished.get()
+                scene_number = scene_by_handle[id(handle)]
+                if handle.status == ClipHandle.COMPLETE:
+                    fetch_futures[executor.submit(self.fetch, handle)] = scene_number
+                else:
+                    results[scene_number] = failed(scene_number, f"视频生成失败: {handle.error}")
+            
+            for future in as_completed(fetch_futures):
+                scene_number = fetch_futures[future]
+                try:
+                    results[scene_number] = ClipResult(
+                        scene_number=scene_number,
+                        output_path=future.result(),
+                        elapsed_seconds=time.monotonic() - started
+                    )
+                except Exception as e:
+                    results[scene_number] = failed(scene_number, str(e))
+        
+        return dict(sorted(results.items()))
+    
+    def generate_scene(
+        self,
+        image_path: ImageInput,
+        scene: Scene,
+        output_path: str,
+        seed: Optional[int] = None,
+        template_name: Optional[str] = None
+    ) -> str:
+        """
+        按 Scene.duration 分段生成场景视频
+        
+        单次生成只有 num_frames 帧，场景时长更长时依次生成多段：后一段以前一段的最后一帧为输入，
+        拼接时去掉重复帧并截断到场景时长。已完成的段保存在 segment_dir 中，
+        某一段失败时只重试该段，重新调用本方法也会从第一个未完成的段继续。
+        启用远程插帧时各段不单独插帧，按第一段的实际帧率规划与拼接，整个场景拼接后统一插帧。
+        
+        Args:
+            image_path: 场景分镜图片（路径或内存图片）
+            scene: 场景对象
+            output_path: 输出视频路径
+            seed: 随机种子，第 i 段使用 seed + i；为 None 时每段随机
+            template_name: 动效模板名称（可选）
+            
+        Returns:
+            输出视频的路径
+        """
+        from .segments import plan_segments, chain_key, segment_paths, last_frame, join_segments
+        
+        output_path = Path(output_path)
+        num_frames = self.config.get('num_frames', 25)
+        provider = self.config.get('api_provider', 'stability')
+        # 远程插帧时各段保持原始帧率，拼接后整个场景统一插帧，避免逐段插帧后按 self.fps 截断丢帧
+        interpolate = bool(self.config.get('interpolation')) and provider != 'local'
+        keep = plan_segments(scene.duration, self.fps, num_frames)
+        
+        image = self._load_image(image_path)
+        key = chain_key(image.tobytes(), {
+            'size': image.size,
+            'prompt': scene.content,
+            'seed': seed,
+            'template_name': template_name,
+            'motion_score': self.motion_score,
+            'provider': provider,
+            'image_size': list(self.config.get('image_size', (1024, 576))),
+            'num_frames': num_frames,
+            'steps': self.config.get('num_inference_steps', 50),
+            'fps': None if interpolate else self.fps
+        })
+        segment_dir = Path(self.config.get('segment_dir') or output_path.parent / '.segments')
+        paths = segment_paths(segment_dir, key, len(keep))
+        
+        segment_fps = self.fps
+        if interpolate:
+            # 按第一段的实际帧率规划段数
+            from .interpolation import video_fps
+            if not paths[0].exists():
+                self._generate_segment(
+                    image, scene, paths[0], 0, len(paths), seed, template_name, interpolate=False
+                )
+            segment_fps = video_fps(str(paths[0])) or self.fps
+            keep = plan_segments(scene.duration, segment_fps, num_frames)
+            paths = segment_paths(segment_dir, key, len(keep))
+        
+        current: ImageInput = image
+        for index, path in enumerate(paths):
+            if not path.exists():
+                segment_seed = None if seed is None else (seed + index) % 2 ** 32
+                self._generate_segment(
+                    current, scene, path, index, len(paths), segment_seed, template_name,
+                    interpolate=not interpolate
+                )
+            if index < len(paths) - 1:
+                current = last_frame(str(path))
+        
+        if len(paths) == 1 and scene.duration <= 0:
+            link_or_copy(str(paths[0]), output_path)
+        else:
+            join_segments(
+                [str(path) for path in paths], keep, str(output_path),
+                fps=segment_fps, backend=self.config.get('video_writer', 'auto')
+            )
+        if interpolate:
+            self._interpolate_video(output_path)
+        if not self.config.get('keep_segments', False):
+            shutil.rmtree(paths[0].parent, ignore_errors=True)
+        return str(output_path)
+    
+    def _generate_segment(
+        self,
+        image: ImageInput,
+        scene: Scene,
+        path: Path,
+        index: int,
+        count: int,
+        seed: Optional[int],
+        template_name: Optional[str],
+        interpolate: bool = True
+    ) -> None:
+        """生成场景的一段，失败时只重试这一段"""
+        max_retries = self.config.get('segment_max_retries', 2)
+        for attempt in range(max_retries + 1):
+            try:
+                self.generate_clip(
+                    image, scene.content, str(path), seed=seed, template_name=template_name,
+                    interpolate=interpolate
+                )
+                return
+            except RuntimeError as e:
+                if attempt >= max_retries:
+                    raise RuntimeError(
+                        f"场景 {scene.scene_number} 第 {index + 1}/{count} 段生成失败"
+                        f"（已重试 {max_retries} 次）: {str(e)}"
+                    )
+                print(f"场景 {scene.scene_number} 第 {index + 1}/{count} 段生成失败，重试 "
+                      f"({attempt + 1}/{max_retries}): {str(e)}")
+    
+    def generate_script_scenes(
+        self,
+        script: Script,
+        images: Union[Dict[int, ImageInput], List[ImageInput]],
+        output_dir: str,
+        max_concurrency: int = 8,
+        seed: Optional[int] = None,
+        template_names: Optional[Dict[int, str]] = None
+    ) -> Dict[int, ClipResult]:
+        """
+        按场景时长分段生成整个剧本（见 generate_scene）
+        
+        同一场景的各段必须依次生成，不同场景的分段链并发执行。
+        
+        Args:
+            script: 剧本对象
+            images: 场景编号到分镜图片的映射，或与 script.scenes 顺序一致的列表
+            output_dir: 输出目录，场景视频保存为 scene_<编号>.mp4
+            max_concurrency: 同时生成的场景数，默认 8
+            seed: 随机种子，所有场景共用；为 None 时随机生成
+            template_names: 场景编号到动效模板名称的映射（可选）
+            
+        Returns:
+            场景编号到 ClipResult 的映射
+        """
+        if isinstance(images, (list, tuple)):
+            if len(images) != len(script.scenes):
+                raise ValueError(
+                    f"图片数量 ({len(images)}) 与场景数量 ({len(script.scenes)}) 不一致"
+                )
+            images = {
+                scene.scene_number: image
+                for scene, image in zip(script.scenes, images)
+            }
+        
+        template_names = template_names or {}
+        output_dir = Path(output_dir)
+        results: Dict[int, ClipResult] = {}
+        started = time.monotonic()
+        
+        def run_scene(scene: Scene) -> ClipResult:
+            try:
+                output_path = self.generate_scene(
+                    images[scene.scene_number],
+                    scene,
+                    str(output_dir / f"scene_{scene.scene_number:03d}.mp4"),
+                    seed=seed,
+                    template_name=template_names.get(scene.scene_number)
+                )
+                return ClipResult(
+                    scene_number=scene.scene_number,
+                    output_path=output_path,
+                    elapsed_seconds=time.monotonic() - started
+                )
+            except Exception as e:
+                return ClipResult(
+                    scene_number=scene.scene_number,
+                    error=str(e),
+                    elapsed_seconds=time.monotonic() - started
+                )
+        
+        pending = []
+        for scene in script.scenes:
+            if images.get(scene.scene_number) is None:
+                results[scene.scene_number] = ClipResult(
+                    scene_number=scene.scene_number, error="缺少该场景的分镜图片"
+                )
+            else:
+                pending.append(scene)
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(pending)))) as executor:
+                for result in executor.map(run_scene, pending):
+                    results[result.scene_number] = result
+        
+        return dict(sorted(results.items()))
+    
     def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         预处理图片，确保符合 SVD 模型要求（1024x576）
@@ -628,6 +2517,15 @@ class SVDGenerator(BaseVideoGenerator):
         """
         self.fps = max(1, fps)
     
+    def rate_limit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        当前提供商与 API Key 的限流统计
+        
+        Returns:
+            {'submit': {...}, 'poll': {...}}，包含排队深度、等待耗时、429 次数等
+        """
+        return {kind: self._rate_limiter(kind).stats() for kind in ('submit', 'poll')}
+    
     def get_config(self) -> Dict[str, Any]:
         """
         获取当前配置
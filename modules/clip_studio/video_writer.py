@@ -0,0 +1,202 @@
+"""
+流式视频写入
+逐帧写入 MP4（OpenCV 或 ffmpeg 管道），编码在后台线程中进行，
+不需要把全部帧保存在内存中，写入与解码/后处理可以重叠
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple, Iterable
+
+import numpy as np
+
+
+VIDEO_WRITER_BACKENDS = ('auto', 'opencv', 'ffmpeg')
+
+_SENTINEL = object()
+
+
+class StreamingVideoWriter:
+    """
+    流式 MP4 写入器
+
+    先写入同目录下的临时文件（每个写入器独立命名），close 成功后原子重命名；出错或 abort 时删除临时文件。
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        fps: int,
+        frame_size: Tuple[int, int],
+        backend: str = 'auto',
+        max_pending: int = 8
+    ):
+        """
+        Args:
+            output_path: 输出视频路径
+            fps: 帧率
+            frame_size: 帧尺寸 (宽, 高)
+            backend: 'auto'、'opencv' 或 'ffmpeg'，auto 优先使用 OpenCV
+            max_pending: 等待编码的最大帧数，超过时 write 阻塞，保证内存占用有上限
+        """
+        if backend not in VIDEO_WRITER_BACKENDS:
+            available = ', '.join(VIDEO_WRITER_BACKENDS)
+            raise ValueError(f"不支持的视频写入后端 '{backend}'。可用后端: {available}")
+
+        self.output_path = Path(output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        # 每个写入器独立命名（扩展名放在最后，OpenCV / ffmpeg 据此推断容器格式），
+        # 同一输出路径的并发写入（包括原地重写）互不覆盖临时文件
+        self.tmp_path = self.output_path.with_name(
+            f".{self.output_path.stem}.{os.getpid()}.{uuid.uuid4().hex[:12]}.part{self.output_path.suffix}"
+        )
+        self.fps = fps
+        self.frame_size = tuple(frame_size)
+        self.frames_written = 0
+        self.backend = self._resolve_backend(backend)
+
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._open()
+        self._thread = threading.Thread(target=self._run, name='clip-video-writer', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _resolve_backend(backend: str) -> str:
+        if backend != 'auto':
+            return backend
+        try:
+            import cv2  # noqa: F401
+            return 'opencv'
+        except ImportError:
+            if shutil.which('ffmpeg'):
+                return 'ffmpeg'
+            raise ImportError("请安装 opencv-python 或 ffmpeg 以写入视频: pip install opencv-python")
+
+    def _open(self) -> None:
+        width, height = self.frame_size
+        if self.backend == 'opencv':
+            import cv2
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            self._writer = cv2.VideoWriter(str(self.tmp_path), fourcc, self.fps, (width, height))
+            if not self._writer.isOpened():
+                raise RuntimeError(f"无法创建视频文件: {self.tmp_path}")
+        else:
+            ffmpeg = shutil.which('ffmpeg')
+            if ffmpeg is None:
+                raise RuntimeError("未找到 ffmpeg，可将 video_writer 设为 'opencv'")
+            self._process = subprocess.Popen(
+                [
+                    ffmpeg, '-y', '-loglevel', 'error',
+                    '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                    '-s', f'{width}x{height}', '-r', str(self.fps),
+                    '-i', '-',
+                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-movflags', '+faststart',
+                    '-f', 'mp4', str(self.tmp_path)
+                ],
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+
+    def _encode(self, frame: np.ndarray) -> None:
+        if self.backend == 'opencv':
+            import cv2
+            self._writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        else:
+            self._process.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is _SENTINEL:
+                return
+            if self._error is not None:
+                continue
+            try:
+                self._encode(frame)
+                self.frames_written += 1
+            except BaseException as e:
+                self._error = e
+
+    def write(self, frame: np.ndarray) -> None:
+        """
+        写入一帧
+
+        Args:
+            frame: RGB uint8 数组 (高, 宽, 3)，或 0-1 范围的浮点数组
+        """
+        if self._closed:
+            raise RuntimeError("视频写入器已关闭")
+        if self._error is not None:
+            raise RuntimeError(f"视频编码失败: {str(self._error)}")
+        if frame.dtype != np.uint8:
+            frame = (np.clip(frame, 0.0, 1.0) * 255).round().astype(np.uint8)
+        if (frame.shape[1], frame.shape[0]) != self.frame_size:
+            raise ValueError(
+                f"帧尺寸 {frame.shape[1]}x{frame.shape[0]} 与视频尺寸 "
+                f"{self.frame_size[0]}x{self.frame_size[1]} 不一致"
+            )
+        self._queue.put(frame)
+
+    def write_all(self, frames: Iterable[np.ndarray]) -> None:
+        """
+        依次写入迭代器产生的所有帧
+
+        Args:
+            frames: 帧迭代器
+        """
+        for frame in frames:
+            self.write(frame)
+
+    def _finish(self) -> None:
+        self._closed = True
+        self._queue.put(_SENTINEL)
+        self._thread.join()
+        if self.backend == 'opencv':
+            self._writer.release()
+        else:
+            self._process.stdin.close()
+            stderr = self._process.stderr.read()
+            if self._process.wait() != 0 and self._error is None:
+                self._error = RuntimeError(stderr.decode('utf-8', 'replace').strip())
+
+    def close(self) -> str:
+        """
+        结束写入并把临时文件重命名为输出文件
+
+        Returns:
+            输出视频路径
+        """
+        if self._closed:
+            return str(self.output_path)
+        try:
+            self._finish()
+            if self._error is not None:
+                raise RuntimeError(f"视频编码失败: {str(self._error)}")
+            if self.frames_written == 0:
+                raise RuntimeError("没有写入任何帧")
+            os.replace(self.tmp_path, self.output_path)
+        finally:
+            self.tmp_path.unlink(missing_ok=True)
+        return str(self.output_path)
+
+    def abort(self) -> None:
+        """放弃写入并删除临时文件"""
+        if not self._closed:
+            self._finish()
+        self.tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> 'StreamingVideoWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()